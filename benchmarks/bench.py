@@ -0,0 +1,221 @@
+"""Latency and throughput benchmarks for the human-speak hooks.
+
+Two parts:
+  hooks   end-to-end subprocess latency (p50/p95/p99) of each hook, launched
+          the way hooks.json does (python3 -I -S hooks/run.py <hook>) and
+          fed the same kind of payload Claude Code sends, with its state in
+          a fresh directory. user-prompt-submit runs with the score memo off,
+          so every run scores; user-prompt-submit-memo repeats the same
+          messages with it on, so all but the first runs are memo hits
+  scorer  per-call time of score_message/detect_signals for messages from
+          5 words up to 100 KB
+
+Usage:
+  python3 benchmarks/bench.py --save benchmarks/baseline.json
+  python3 benchmarks/bench.py --compare benchmarks/baseline.json
+
+--compare exits 1 when any hook's p95 exceeds its budget in
+benchmarks/budgets.json, either the absolute limit or the allowed
+regression over the baseline.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+HOOKS_DIR = ROOT / "hooks"
+DEFAULT_BUDGETS = Path(__file__).resolve().parent / "budgets.json"
+
+sys.path.insert(0, str(HOOKS_DIR))
+
+CLEAN_MESSAGE = "Please update the README with the new API docs."
+FLAGGED_MESSAGE = (
+    "you know like i want it to work better and also fix that thing "
+    "and basically look at the other file too"
+)
+SCORER_SIZES = {
+    "5w": 5,
+    "50w": 50,
+    "500w": 500,
+    "5000w": 5000,
+}
+SCORER_SIZE_BYTES = {"100kb": 100 * 1024}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (pct in 0-100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _summarize(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+    }
+
+
+def _time_hook(hook: str, payloads: List[str], env: Dict[str, str], runs: int) -> List[float]:
+    command = [sys.executable, "-I", "-S", str(HOOKS_DIR / "run.py"), hook]
+    samples: List[float] = []
+    for i in range(runs):
+        payload = payloads[i % len(payloads)]
+        started = time.perf_counter()
+        subprocess.run(
+            command,
+            input=payload,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def bench_hooks(runs: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = os.environ.copy()
+        env.pop("HUMAN_SPEAK_DAEMON", None)
+        env.pop("HUMAN_SPEAK_METRICS", None)
+        env["HUMAN_SPEAK_STATE_DIR"] = str(Path(tmpdir) / "state")
+        env["HUMAN_SPEAK_THRESHOLD"] = "0.40"
+        env["CLAUDE_PLUGIN_ROOT"] = str(ROOT)
+        env["CLAUDE_ENV_FILE"] = str(Path(tmpdir) / "claude.env")
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(Path(tmpdir) / "user-speak-profile.md")
+
+        prompts = [
+            json.dumps({"user_message": CLEAN_MESSAGE, "session_id": "bench"}),
+            json.dumps({"user_message": FLAGGED_MESSAGE, "session_id": "bench"}),
+        ]
+        session = [json.dumps({"session_id": "bench"})]
+        results["user-prompt-submit"] = _summarize(
+            _time_hook("user-prompt-submit", prompts, {**env, "HUMAN_SPEAK_MEMO": "0"}, runs))
+        results["user-prompt-submit-memo"] = _summarize(
+            _time_hook("user-prompt-submit", prompts, env, runs))
+        results["session-start"] = _summarize(
+            _time_hook("session-start", session, env, runs))
+        results["session-end"] = _summarize(
+            _time_hook("session-end", session, env, runs))
+    return results
+
+
+def _message_of_words(count: int) -> str:
+    words = (FLAGGED_MESSAGE + ". " + CLEAN_MESSAGE).split()
+    return " ".join(words[i % len(words)] for i in range(count))
+
+
+def _message_of_bytes(size: int) -> str:
+    text = _message_of_words(size // 5 + 1)
+    return text[:size]
+
+
+def _time_call(fn: Callable[[str], object], text: str, budget_s: float = 0.2) -> float:
+    """Median per-call time in microseconds over ~budget_s of calls."""
+    fn(text)  # warm up (pattern compiles, dictionary load)
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn(text)
+        elapsed = time.perf_counter() - started
+        if elapsed >= budget_s / 5 or loops >= 1 << 20:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn(text)
+        samples.append((time.perf_counter() - started) / loops * 1e6)
+    return round(percentile(samples, 50), 3)
+
+
+def bench_scorer() -> Dict[str, Dict[str, float]]:
+    from scorer import detect_signals, score_message
+
+    messages = {name: _message_of_words(n) for name, n in SCORER_SIZES.items()}
+    messages.update({name: _message_of_bytes(n) for name, n in SCORER_SIZE_BYTES.items()})
+    results: Dict[str, Dict[str, float]] = {}
+    for fn in (score_message, detect_signals):
+        results[fn.__name__] = {
+            f"{name}_us": _time_call(fn, text) for name, text in messages.items()
+        }
+    return results
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], budgets: Dict[str, Any]
+) -> List[str]:
+    """Return a failure message for every hook over its p95 budget."""
+    failures: List[str] = []
+    default = budgets.get("default", {})
+    for hook, stats in current.get("hooks", {}).items():
+        budget = {**default, **budgets.get("hooks", {}).get(hook, {})}
+        p95 = float(stats["p95_ms"])
+        limit = budget.get("p95_ms")
+        if limit is not None and p95 > float(limit):
+            failures.append(f"{hook}: p95 {p95:.1f}ms exceeds budget {float(limit):.1f}ms")
+        base = baseline.get("hooks", {}).get(hook)
+        allowed = budget.get("max_regression")
+        if base and allowed is not None:
+            ceiling = float(base["p95_ms"]) * (1 + float(allowed))
+            if p95 > ceiling:
+                failures.append(
+                    f"{hook}: p95 {p95:.1f}ms regressed past {ceiling:.1f}ms "
+                    f"(baseline {float(base['p95_ms']):.1f}ms + {float(allowed):.0%})"
+                )
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark human-speak hooks")
+    parser.add_argument("--runs", type=int, default=30, help="subprocess runs per hook")
+    parser.add_argument("--skip-hooks", action="store_true")
+    parser.add_argument("--skip-scorer", action="store_true")
+    parser.add_argument("--save", type=Path, help="write results to this baseline file")
+    parser.add_argument("--compare", type=Path, help="baseline file to compare against")
+    parser.add_argument("--budgets", type=Path, default=DEFAULT_BUDGETS)
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    if not args.skip_hooks:
+        results["hooks"] = bench_hooks(args.runs)
+    if not args.skip_scorer:
+        results["scorer"] = bench_scorer()
+
+    print(json.dumps(results, indent=2))
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        budgets = json.loads(args.budgets.read_text()) if args.budgets.exists() else {}
+        failures = compare(results, baseline, budgets)
+        for failure in failures:
+            print(f"FAIL {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Concurrent-session stress test for the human-speak hooks.
+
+Runs N sessions in parallel against one shared profile. Each session submits
+an ambiguous prompt, checks that the flag it reads back is its own, confirms
+a phrase unique to it, and ends. Afterwards the profile must hold every
+session's mapping (no lost updates) and no session's state may be left
+behind.
+
+Usage:
+  python3 benchmarks/stress.py --sessions 12
+  python3 benchmarks/stress.py --sessions 12 --rounds 3
+
+Exits 1 on any lost update, foreign flag or leftover state file. Sessions per
+second are reported at concurrency 1 and N so the scaling is visible.
+"""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+HOOKS_DIR = ROOT / "hooks"
+
+sys.path.insert(0, str(HOOKS_DIR))
+
+AMBIGUOUS = (
+    "you know like i want it to work better and also fix that thing "
+    "and basically look at the other file too"
+)
+
+
+def _hook(script: str, payload: Dict[str, Any], env: Dict[str, str]) -> None:
+    subprocess.run(
+        [sys.executable, str(HOOKS_DIR / script)],
+        input=json.dumps(payload),
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+def run_session(session_id: str, env: Dict[str, str]) -> List[str]:
+    """Drive one session through its hooks; return any problems seen."""
+    from state import path_for, session_dir
+
+    problems: List[str] = []
+    message = f"{AMBIGUOUS} for {session_id}"
+    _hook("session-start.py", {"session_id": session_id}, env)
+    _hook("user-prompt-submit.py", {"user_message": message, "session_id": session_id}, env)
+
+    flag_path = Path(path_for("flag", session_id))
+    try:
+        original = json.loads(flag_path.read_text()).get("original")
+    except (OSError, ValueError):
+        original = None
+    if original != message:
+        problems.append(f"{session_id}: flag missing or from another session")
+
+    subprocess.run(
+        [sys.executable, str(HOOKS_DIR / "confirm.py"), "confirmed", f"do {session_id}",
+         "--original", f"phrase {session_id}", "--file", path_for("confirmed", session_id)],
+        capture_output=True,
+        env=env,
+    )
+    _hook("session-end.py", {"session_id": session_id}, env)
+    if os.path.exists(str(session_dir(session_id))):
+        problems.append(f"{session_id}: state left behind after session end")
+    return problems
+
+
+def run(sessions: int, concurrency: int, rounds: int = 1) -> Dict[str, Any]:
+    """Run sessions*rounds sessions, concurrency at a time, on a fresh profile."""
+    from profile_store import MAX_MAPPINGS, load_profile
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = str(Path(tmpdir) / "user-speak-profile.md")
+        env = os.environ.copy()
+        env.pop("HUMAN_SPEAK_DAEMON", None)
+        env.pop("HUMAN_SPEAK_INDEX", None)
+        env["HUMAN_SPEAK_THRESHOLD"] = "0.40"
+        env["HUMAN_SPEAK_PROFILE_PATH"] = profile
+        env["HUMAN_SPEAK_STATE_DIR"] = str(Path(tmpdir) / "state")
+        env["CLAUDE_PLUGIN_ROOT"] = str(ROOT)
+        env["CLAUDE_ENV_FILE"] = str(Path(tmpdir) / "claude.env")
+
+        problems: List[str] = []
+        ids = [f"s{r}-{i}" for r in range(rounds) for i in range(sessions)]
+        # state.path_for() in this process must resolve the same paths
+        previous = os.environ.get("HUMAN_SPEAK_STATE_DIR")
+        os.environ["HUMAN_SPEAK_STATE_DIR"] = env["HUMAN_SPEAK_STATE_DIR"]
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                for found in pool.map(lambda sid: run_session(sid, env), ids):
+                    problems.extend(found)
+            elapsed = time.perf_counter() - started
+        finally:
+            if previous is None:
+                os.environ.pop("HUMAN_SPEAK_STATE_DIR", None)
+            else:
+                os.environ["HUMAN_SPEAK_STATE_DIR"] = previous
+
+        mappings = load_profile(profile).mappings
+        expected = min(len(ids), MAX_MAPPINGS)
+        lost = expected - len(mappings)
+        if lost:
+            problems.append(f"{lost} of {expected} session updates lost")
+    return {
+        "sessions": len(ids),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "sessions_per_s": round(len(ids) / elapsed, 2),
+        "lost_updates": max(0, lost),
+        "problems": problems,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stress concurrent human-speak sessions")
+    parser.add_argument("--sessions", type=int, default=12, help="parallel sessions")
+    parser.add_argument("--rounds", type=int, default=1, help="batches of sessions to run")
+    args = parser.parse_args(argv)
+
+    serial = run(args.sessions, 1, args.rounds)
+    parallel = run(args.sessions, args.sessions, args.rounds)
+    print(json.dumps({"serial": serial, "parallel": parallel}, indent=2))
+    speedup = parallel["sessions_per_s"] / serial["sessions_per_s"]
+    print(f"scaling: {speedup:.2f}x at concurrency {args.sessions}", file=sys.stderr)
+
+    failures = serial["problems"] + parallel["problems"]
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Batch scorer for JSONL corpora of exported prompts.
+
+Streams records from a file or stdin, scores them in chunks across a process
+pool and writes one {"id", "score", "signals"} line per record, in input
+order. At most a few chunks per worker are in flight, so memory stays flat
+however long the corpus is. Throughput and flag rate go to stderr.
+
+With --cascade, records are scored through scorer.cascade at --threshold:
+each line also carries the tier that decided it, and stderr gets the share
+of the corpus each tier settled. Tier-0 lines have no signals and their
+score is only an upper bound.
+
+Usage (from the repository root):
+  PYTHONPATH=hooks python -m batch_score prompts.jsonl > scores.jsonl
+  cat prompts.jsonl | PYTHONPATH=hooks python -m batch_score --workers 8
+  PYTHONPATH=hooks python -m batch_score prompts.jsonl --cascade > tiers.jsonl
+
+Record ids come from "id" or "request_id" (falling back to the line number);
+text comes from --text-field or the first of "user_message", "prompt",
+"text", "body" that is present.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from calibration import is_borderline  # noqa: E402
+from scorer import analyze, cascade as cascade_analyze  # noqa: E402
+
+if TYPE_CHECKING:
+    from typing import IO, Iterator
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_THRESHOLD = 0.40
+TEXT_FIELDS = ("user_message", "prompt", "text", "body")
+ID_FIELDS = ("id", "request_id")
+
+
+def _record_text(record: dict[str, object], text_field: str | None) -> str:
+    fields = (text_field,) if text_field else TEXT_FIELDS
+    for field in fields:
+        value = record.get(field)
+        if isinstance(value, str):
+            return value
+    return ""
+
+
+def _record_id(record: dict[str, object], line_no: int) -> object:
+    for field in ID_FIELDS:
+        if field in record:
+            return record[field]
+    return line_no
+
+
+def score_chunk(
+    start: int,
+    lines: list[str],
+    text_field: str | None,
+    threshold: float,
+    cascade: bool = False,
+) -> tuple[list[str], int, dict[int, int]]:
+    """Score one chunk. Returns (output lines, number flagged, records
+    decided per cascade tier)."""
+    out: list[str] = []
+    flagged = 0
+    tiers: dict[int, int] = {}
+    for offset, line in enumerate(lines):
+        line_no = start + offset
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("record is not an object")
+        except ValueError:
+            out.append(json.dumps({"id": line_no, "error": "invalid record"}))
+            continue
+        text = _record_text(record, text_field)
+        analysis = cascade_analyze(text, threshold) if cascade else analyze(text)
+        # As in the hook, a borderline score is not flagged
+        if analysis.score >= threshold and not is_borderline(analysis.score, threshold):
+            flagged += 1
+        tiers[analysis.tier] = tiers.get(analysis.tier, 0) + 1
+        result: dict[str, object] = {
+            "id": _record_id(record, line_no),
+            "score": round(analysis.score, 4),
+            "signals": analysis.signals,
+        }
+        if cascade:
+            result["tier"] = analysis.tier
+        out.append(json.dumps(result))
+    return out, flagged, tiers
+
+
+def _chunks(stream: IO[str], size: int) -> Iterator[tuple[int, list[str]]]:
+    chunk: list[str] = []
+    start = 1
+    line_no = 0
+    for line in stream:
+        line_no += 1
+        if not line.strip():
+            continue
+        if not chunk:
+            start = line_no
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield start, chunk
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+def run(
+    stream: IO[str],
+    out: IO[str],
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    text_field: str | None = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    cascade: bool = False,
+    tiers: dict[int, int] | None = None,
+) -> tuple[int, int]:
+    """Score every record in stream. Returns (records scored, flagged);
+    records decided per cascade tier are added to tiers if given."""
+    total = 0
+    flagged = 0
+
+    def emit(result: tuple[list[str], int, dict[int, int]]) -> None:
+        nonlocal total, flagged
+        lines, chunk_flagged, chunk_tiers = result
+        if lines:
+            out.write("\n".join(lines) + "\n")
+        total += len(lines)
+        flagged += chunk_flagged
+        if tiers is not None:
+            for tier, count in chunk_tiers.items():
+                tiers[tier] = tiers.get(tier, 0) + count
+
+    if workers <= 1:
+        for start, lines in _chunks(stream, chunk_size):
+            emit(score_chunk(start, lines, text_field, threshold, cascade))
+        return total, flagged
+
+    from collections import deque
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    max_in_flight = workers * 2
+    pending: deque[Future[tuple[list[str], int, dict[int, int]]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for start, lines in _chunks(stream, chunk_size):
+            pending.append(
+                pool.submit(score_chunk, start, lines, text_field, threshold, cascade)
+            )
+            if len(pending) >= max_in_flight:
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+    return total, flagged
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score a JSONL corpus of prompts")
+    parser.add_argument("input", nargs="?", type=Path, default=None,
+                        help="JSONL file to score (default: stdin)")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="write results here (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--text-field", default=None)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="threshold used for the reported flag rate")
+    parser.add_argument("--cascade", action="store_true",
+                        help="decide at --threshold through the scorer cascade and "
+                             "report which tier settled each record")
+    args = parser.parse_args(argv)
+
+    stream = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    started = time.perf_counter()
+    tiers: dict[int, int] = {}
+    try:
+        total, flagged = run(stream, out, args.workers, max(1, args.chunk_size),
+                             args.text_field, args.threshold, args.cascade, tiers)
+    finally:
+        if args.input:
+            stream.close()
+        if args.output:
+            out.close()
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else 0.0
+    share = flagged / total if total else 0.0
+    print(
+        f"scored {total} messages in {elapsed:.2f}s ({rate:,.0f} msg/s); "
+        f"flagged {flagged} ({share:.1%}) at threshold {args.threshold:.2f}",
+        file=sys.stderr,
+    )
+    if args.cascade and total:
+        print("decided at tier: " + ", ".join(
+            f"{tier} {count} ({count / total:.1%})" for tier, count in sorted(tiers.items())
+        ), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Running flag statistics and incremental threshold recalibration.
+
+The UserPromptSubmit hook appends one line per scored message to a session
+stats log:
+
+  {"score": 0.31, "flagged": false, "borderline": false, "key": 123, "features": [...]}
+
+key and features come with a message scored in full (SessionEnd trains on
+them); "bound": true marks a score that is only scorer.cascade's tier-0
+upper bound, kept out of the histogram; "hit" names a confirmed phrase
+applied from the intent index, and "model": true a score from learned
+weights. SessionEnd folds that log and the session's confirmation
+outcomes into CalibrationStats, a fixed-size set of counters kept in the
+profile store:
+
+  raised      flags raised
+  confirmed   flags whose clarification the user engaged with
+  dismissed   flags the user waved off as unnecessary (false positives)
+  histogram   score distribution in HISTOGRAM_BUCKETS fixed-width buckets,
+              fine enough that the BORDERLINE band under a threshold is a
+              whole number of buckets
+
+Older sessions fade by DECAY per session, so the counters track the user's
+current style in constant memory without rescanning history. The threshold
+then moves by at most BORDERLINE per session: up when too many flags are
+dismissed, down when almost none are and there are messages just under it.
+"""
+from __future__ import annotations
+
+HISTOGRAM_BUCKETS = 100
+DECAY = 0.9
+BORDERLINE = 0.02
+MIN_JUDGED = 5.0
+TARGET_FP_HIGH = 0.30
+TARGET_FP_LOW = 0.10
+MIN_THRESHOLD = 0.20
+MAX_THRESHOLD = 0.80
+# The UserPromptSubmit hook's FLAG_ORIGINAL_LIMIT
+KEY_PREFIX = 8 * 1024
+
+
+def bucket(score: float) -> int:
+    # The epsilon keeps 0.29 (0.28999...) in its own bucket
+    return min(HISTOGRAM_BUCKETS - 1, max(0, int(score * HISTOGRAM_BUCKETS + 1e-9)))
+
+
+class CalibrationStats:
+    """Decayed counters of flag outcomes and the score histogram."""
+
+    __slots__ = ("raised", "confirmed", "dismissed", "histogram")
+
+    def __init__(self) -> None:
+        self.raised = 0.0
+        self.confirmed = 0.0
+        self.dismissed = 0.0
+        self.histogram = [0.0] * HISTOGRAM_BUCKETS
+
+    @classmethod
+    def from_record(cls, record: dict[str, object]) -> CalibrationStats:
+        stats = cls()
+        for name in ("raised", "confirmed", "dismissed"):
+            value = record.get(name)
+            if isinstance(value, (int, float)):
+                setattr(stats, name, float(value))
+        histogram = record.get("histogram")
+        if isinstance(histogram, list) and len(histogram) == HISTOGRAM_BUCKETS:
+            stats.histogram = [float(v) for v in histogram]
+        return stats
+
+    def to_record(self) -> dict[str, object]:
+        return {
+            "kind": "stats",
+            "raised": round(self.raised, 4),
+            "confirmed": round(self.confirmed, 4),
+            "dismissed": round(self.dismissed, 4),
+            "histogram": [round(v, 4) for v in self.histogram],
+        }
+
+    def decay(self, factor: float = DECAY) -> None:
+        self.raised *= factor
+        self.confirmed *= factor
+        self.dismissed *= factor
+        self.histogram = [v * factor for v in self.histogram]
+
+    def observe(self, score: float, flagged: bool) -> None:
+        self.histogram[bucket(score)] += 1
+        if flagged:
+            self.raised += 1
+
+    def observe_outcome(self, dismissed: bool) -> None:
+        if dismissed:
+            self.dismissed += 1
+        else:
+            self.confirmed += 1
+
+    def false_positive_rate(self) -> float | None:
+        judged = self.confirmed + self.dismissed
+        if judged < MIN_JUDGED:
+            return None
+        return self.dismissed / judged
+
+    def mass_below(self, threshold: float) -> float:
+        """Messages scored in [threshold - BORDERLINE, threshold), to the
+        hundredth: a score at or above the threshold is never counted."""
+        low = bucket(max(0.0, threshold - BORDERLINE))
+        return sum(self.histogram[low:bucket(threshold)])
+
+
+def recalibrate(threshold: float, stats: CalibrationStats) -> float:
+    """Return the next threshold, at most BORDERLINE away from threshold."""
+    fp_rate = stats.false_positive_rate()
+    if fp_rate is None:
+        return threshold
+    if fp_rate > TARGET_FP_HIGH:
+        threshold += BORDERLINE
+    elif fp_rate < TARGET_FP_LOW and stats.mass_below(threshold) > 0:
+        threshold -= BORDERLINE
+    return round(min(MAX_THRESHOLD, max(MIN_THRESHOLD, threshold)), 2)
+
+
+def is_borderline(score: float, threshold: float) -> bool:
+    return abs(score - threshold) <= BORDERLINE + 1e-9
+
+
+def message_key(message: str) -> int:
+    """Key that ties a stats line to the answer recorded for the same message,
+    which carries at most the flag's first KEY_PREFIX characters."""
+    import zlib
+
+    return zlib.crc32(message[:KEY_PREFIX].encode("utf-8", "surrogatepass"))
+
+
+def settled_below(threshold: float) -> float:
+    """Scores under this are neither borderline nor in the histogram buckets
+    mass_below reads, so their exact value never changes a recalibration."""
+    return bucket(max(0.0, threshold - BORDERLINE)) / HISTOGRAM_BUCKETS
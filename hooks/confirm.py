@@ -0,0 +1,124 @@
+"""Record the user's answer to a flagged message, for SessionEnd to learn from.
+
+The skill runs this once the user has replied to "I think you're asking me
+to X. Is that right?":
+
+  python3 hooks/confirm.py confirmed "run the auth tests"    yes, X
+  python3 hooks/confirm.py corrected "run only the login test"   no, Y instead
+  python3 hooks/confirm.py dismissed                          asking was unnecessary
+
+Each answer becomes one line appended to the session's confirmed file
+($HUMAN_SPEAK_CONFIRMED_FILE, see state.py) with a single O_APPEND write:
+
+  {"original": "...", "interpreted": "...", "outcome": "confirmed", "at": 1760700000.0}
+
+so recording costs the same on the first turn and the hundredth, and
+concurrent writers never interleave. The original message is taken from the
+session's flag file unless --original is given; with --id (the flag's "id")
+it comes from whichever of the flag and the previous flag has that id, since
+the reply being answered may have been flagged as well. SessionEnd reads
+these lines (and, from older sessions, a single JSON array) as its confirmed
+pairs.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+OUTCOMES = ("confirmed", "corrected", "dismissed")
+
+
+def _flag_original(flag_path: str, flag_id: str | None = None) -> str | None:
+    from state import previous_flag_path
+
+    paths = [flag_path] if flag_id is None else [flag_path, previous_flag_path(flag_path)]
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                flag = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(flag, dict) and (flag_id is None or flag.get("id") == flag_id):
+            original = flag.get("original")
+            return original if isinstance(original, str) and original else None
+    return None
+
+
+def record(path: str, original: str, interpreted: str, outcome: str) -> dict[str, object]:
+    """Append one answer to the confirmed file at path and return it."""
+    from state import append_line
+
+    if outcome not in OUTCOMES:
+        raise ValueError(f"unknown outcome: {outcome}")
+    entry: dict[str, object] = {
+        "original": original,
+        "interpreted": interpreted,
+        "outcome": outcome,
+        "at": round(time.time(), 3),
+    }
+    append_line(path, json.dumps(entry, ensure_ascii=False))
+    return entry
+
+
+def read_pairs(text: str) -> list[dict[str, object]]:
+    """Confirmed pairs from a confirmed file: JSONL records, or a legacy
+    JSON array (possibly followed by appended lines)."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    items: list[object] = []
+    if isinstance(data, list):
+        items.append(data)
+    else:
+        for line in text.splitlines():
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                continue  # torn or hand-mangled line
+    pairs: list[dict[str, object]] = []
+    for item in items:
+        for pair in item if isinstance(item, list) else [item]:
+            if isinstance(pair, dict):
+                pairs.append(pair)
+    return pairs
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    from state import LEGACY_PATHS
+
+    parser = argparse.ArgumentParser(description="Record the answer to a human-speak flag")
+    parser.add_argument("outcome", choices=OUTCOMES)
+    parser.add_argument("interpreted", nargs="?", default="",
+                        help="the interpretation the user accepted or gave (not for dismissed)")
+    parser.add_argument("--original", default=None,
+                        help="the flagged message (default: from the session's flag file)")
+    parser.add_argument("--file", default=None,
+                        help="confirmed file (default: $HUMAN_SPEAK_CONFIRMED_FILE)")
+    parser.add_argument("--flag", default=None,
+                        help="flag file (default: $HUMAN_SPEAK_FLAG_FILE)")
+    parser.add_argument("--id", default=None,
+                        help="id of the flag being answered (default: the latest flag)")
+    args = parser.parse_args(argv)
+
+    if args.outcome != "dismissed" and not args.interpreted:
+        parser.error(f"{args.outcome} needs the interpretation")
+    original = args.original or _flag_original(
+        args.flag or os.environ.get("HUMAN_SPEAK_FLAG_FILE") or LEGACY_PATHS["flag"], args.id
+    )
+    if not original:
+        print("confirm: no flagged message to record (pass --original)", file=sys.stderr)
+        return 1
+    path = args.file or os.environ.get("HUMAN_SPEAK_CONFIRMED_FILE") or LEGACY_PATHS["confirmed"]
+    record(path, original, args.interpreted, args.outcome)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
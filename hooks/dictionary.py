@@ -0,0 +1,155 @@
+"""Compact on-disk word set used by the typo-density signal.
+
+A word set is a file of sorted little-endian uint32 CRC32 fingerprints of
+lowercased words, so a file built on one machine reads the same on any other. It is memory-mapped and searched with bisect, so opening it
+costs one mmap call and a lookup is a CRC32 plus ~18 comparisons in C. With
+~160k words, a non-word collides with a real word's fingerprint about once
+per 27k lookups, which is far below the noise of the typo heuristic.
+
+The bundled data/english.u32 is built from every word in the MIT-licensed
+pyspellchecker English frequency list (inflections and technical terms such
+as "retries" or "endpoint" included; the rarest entries are seen 50 times),
+plus data/dev-words.txt. Rebuild with:
+  python3 hooks/dictionary.py build WORDLIST [WORDLIST ...] -o hooks/data/english.u32
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # keep typing off the hook's import path
+    from typing import Iterable, Sequence, Union
+
+    PathArg = Union[str, "os.PathLike[str]"]
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+ENGLISH_PATH = os.path.join(DATA_DIR, "english.u32")
+
+# Word set files are little-endian; big-endian hosts swap on read and write
+_SWAP = sys.byteorder == "big"
+
+
+def fingerprint(word: str) -> int:
+    return zlib.crc32(word.lower().encode("utf-8"))
+
+
+class WordSet:
+    """Read-only set of words backed by a sorted fingerprint array."""
+
+    __slots__ = ("_keys", "_mmap")
+
+    def __init__(self, keys: Sequence[int], backing: mmap.mmap | None = None) -> None:
+        self._keys = keys
+        self._mmap = backing
+
+    def __contains__(self, word: object) -> bool:
+        if not isinstance(word, str):
+            return False
+        key = fingerprint(word)
+        keys = self._keys
+        i = bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def load(path: PathArg) -> WordSet | None:
+    """Memory-map a word set file. Returns None if missing or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            backing = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(backing) % 4:
+        backing.close()
+        return None
+    if _SWAP:
+        keys = array("I")
+        keys.frombytes(backing)
+        backing.close()
+        keys.byteswap()
+        return WordSet(keys)
+    return WordSet(memoryview(backing).cast("I"), backing)
+
+
+def encode(keys: array[int]) -> bytes:
+    """The word set file contents for sorted fingerprints."""
+    if _SWAP:
+        keys = array("I", keys)
+        keys.byteswap()
+    return keys.tobytes()
+
+
+def build(words: Iterable[str], path: PathArg) -> int:
+    """Write the fingerprints of words to path. Returns the number stored."""
+    keys = array("I", sorted({fingerprint(w) for w in words if w.strip()}))
+    target = os.fspath(path)
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    tmp = target + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(encode(keys))
+    os.replace(tmp, target)
+    return len(keys)
+
+
+_english: WordSet | None = None
+_english_loaded = False
+
+
+def english() -> WordSet | None:
+    """Return the bundled English word set, loading it on first use."""
+    global _english, _english_loaded
+    if not _english_loaded:
+        _english = load(ENGLISH_PATH)
+        _english_loaded = True
+    return _english
+
+
+_loaded: dict[str, tuple[tuple[int, int], WordSet | None]] = {}
+
+
+def cached(path: str) -> WordSet | None:
+    """load(path), again only once the file is replaced (a long-lived
+    process such as the scorer daemon sees project_vocab updates)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # os.replace gives the file a new inode even within one mtime tick
+    version = (st.st_mtime_ns, st.st_ino)
+    entry = _loaded.get(path)
+    if entry is None or entry[0] != version:
+        entry = _loaded[path] = (version, load(path))
+    return entry[1]
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a human-speak word set")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="build a word set from word lists")
+    build_cmd.add_argument("wordlists", nargs="+")
+    build_cmd.add_argument("-o", "--output", default=ENGLISH_PATH)
+    args = parser.parse_args(argv)
+
+    words: list[str] = []
+    for wordlist in args.wordlists:
+        with open(wordlist, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        for line in lines:
+            word = line.split("#", 1)[0].strip()
+            if word:
+                words.append(word)
+    count = build(words, args.output)
+    print(f"wrote {count} fingerprints to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
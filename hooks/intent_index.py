@@ -0,0 +1,141 @@
+"""Lookup index over confirmed intent mappings.
+
+Built at SessionStart from the profile and saved as a small JSON file next to
+it, so the UserPromptSubmit hook can check each message against every phrase
+the user has already confirmed:
+
+1. exact: the normalized message (lowercased, punctuation dropped,
+   whitespace collapsed) is a key in a dict.
+2. near: character-trigram Jaccard similarity, computed through an inverted
+   index from trigram to phrases so only phrases sharing a trigram are
+   touched. The mapping set is small and bounded, so exact Jaccard is both
+   cheaper and more accurate here than a MinHash sketch of it.
+
+Only an exact match may stand in for a confirmation. A near match is a hint
+for the question the skill asks, and a near candidate is rejected outright
+when the message negates something the confirmed phrase did not ("don't
+ship it" is not "ship it").
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+
+INDEX_VERSION = 1
+NEAR_MATCH_THRESHOLD = 0.5
+
+_NON_WORD = re.compile(r"[^\w\s']+")
+NEGATIONS = frozenset({"no", "not", "never", "don't", "dont"})
+
+
+def index_path_for(profile_path: str) -> str:
+    root, _ = os.path.splitext(profile_path)
+    return root + ".index.json"
+
+
+def normalize(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def trigrams(normalized: str) -> set[str]:
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def negations(normalized: str) -> set[str]:
+    """Negation tokens in a normalized phrase, including any "-n't" form."""
+    return {w for w in normalized.split() if w in NEGATIONS or w.endswith("n't")}
+
+
+def build(mappings: dict[str, str]) -> dict[str, object]:
+    """Build an index from original phrase -> interpretation mappings."""
+    entries: list[list[object]] = []
+    exact: dict[str, int] = {}
+    grams: dict[str, list[int]] = {}
+    for original, interpreted in mappings.items():
+        key = normalize(original)
+        if not key:
+            continue
+        if key in exact:
+            entries[exact[key]][1] = interpreted  # later mapping wins
+            continue
+        entry_id = len(entries)
+        phrase_grams = trigrams(key)
+        entries.append([original, interpreted, len(phrase_grams)])
+        exact[key] = entry_id
+        for gram in phrase_grams:
+            grams.setdefault(gram, []).append(entry_id)
+    longest = max((len(k) for k in exact), default=0)
+    return {
+        "version": INDEX_VERSION,
+        "entries": entries,
+        "exact": exact,
+        "grams": grams,
+        "longest": longest,
+    }
+
+
+def save(index: dict[str, object], path: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load(path: str) -> dict[str, object] | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def lookup(
+    index: dict[str, object], text: str, threshold: float = NEAR_MATCH_THRESHOLD
+) -> dict[str, object] | None:
+    """Return {"original", "interpretation", "match", "similarity"} for the
+    confirmed phrase text matches, or None."""
+    entries = index["entries"]
+    exact = index["exact"]
+    grams = index["grams"]
+    longest = index["longest"]
+    assert isinstance(entries, list) and isinstance(exact, dict)
+    assert isinstance(grams, dict) and isinstance(longest, int)
+
+    key = normalize(text)
+    if not key:
+        return None
+    entry_id = exact.get(key)
+    if entry_id is not None:
+        original, interpreted, _ = entries[entry_id]
+        return {"original": original, "interpretation": interpreted,
+                "match": "exact", "similarity": 1.0}
+
+    # Jaccard >= threshold bounds the length ratio, so long messages can
+    # never near-match a short confirmed phrase.
+    if len(key) * threshold > longest + 2:
+        return None
+    message_grams = trigrams(key)
+    overlap: dict[int, int] = {}
+    for gram in message_grams:
+        for candidate in grams.get(gram, ()):
+            overlap[candidate] = overlap.get(candidate, 0) + 1
+    negated = negations(key)
+    best_id, best = -1, 0.0
+    for candidate, shared in overlap.items():
+        size = entries[candidate][2]
+        similarity = shared / (len(message_grams) + size - shared)
+        if similarity <= best:
+            continue
+        if negated and not negated <= negations(normalize(entries[candidate][0])):
+            continue
+        best_id, best = candidate, similarity
+    if best_id < 0 or best < threshold:
+        return None
+    original, interpreted, _ = entries[best_id]
+    return {"original": original, "interpretation": interpreted,
+            "match": "near", "similarity": round(best, 3)}
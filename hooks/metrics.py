@@ -0,0 +1,215 @@
+"""Opt-in hook instrumentation.
+
+With HUMAN_SPEAK_METRICS=1 every hook run appends one line to a rotating
+JSONL log: per-stage timings in ms, whether the message was flagged, which
+scorer cascade tier decided it (see scorer.cascade) and the type of any
+exception the hook swallowed.
+
+  {"hook": "user-prompt-submit", "at": 1760700000.0, "total": 4.1,
+   "stages": {"read": 0.02, "parse": 0.03, "score": 3.6, "flag": 0.2},
+   "flagged": true, "tier": 1, "error": null}
+
+The log lives at <state dir>/metrics.jsonl (HUMAN_SPEAK_METRICS_FILE to
+override) and is rotated to metrics.jsonl.1 past MAX_BYTES, so at most two
+files are kept. When disabled, recorder() returns a shared no-op recorder.
+
+  python3 hooks/metrics.py report      p50/p99 per hook and stage, flag rate,
+                                       cascade tiers, errors
+"""
+from __future__ import annotations
+
+import os
+import time
+
+MAX_BYTES = 512 * 1024
+
+
+def enabled() -> bool:
+    return os.environ.get("HUMAN_SPEAK_METRICS") == "1"
+
+
+def metrics_path() -> str:
+    override = os.environ.get("HUMAN_SPEAK_METRICS_FILE")
+    if override:
+        return override
+    from state import state_root
+
+    return os.path.join(state_root(), "metrics.jsonl")
+
+
+class Recorder:
+    """Per-run timings: mark(stage) closes the stage that started at the
+    previous mark (or at construction)."""
+
+    __slots__ = ("hook", "stages", "flagged", "tier", "error", "_started", "_last")
+
+    def __init__(self, hook: str) -> None:
+        self.hook = hook
+        self.stages: dict[str, float] = {}
+        self.flagged: bool | None = None
+        self.tier: int | None = None
+        self.error: str | None = None
+        self._started = self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages[stage] = round((now - self._last) * 1000, 3)
+        self._last = now
+
+    def fail(self, exc: BaseException) -> None:
+        self.error = type(exc).__name__
+
+    def finish(self) -> None:
+        """Append this run to the log; never raises."""
+        try:
+            import json
+
+            from state import append_line
+
+            path = metrics_path()
+            line = json.dumps({
+                "hook": self.hook,
+                "at": round(time.time(), 3),
+                "total": round((time.perf_counter() - self._started) * 1000, 3),
+                "stages": self.stages,
+                "flagged": self.flagged,
+                "tier": self.tier,
+                "error": self.error,
+            })
+            try:
+                if os.path.getsize(path) > MAX_BYTES:
+                    os.replace(path, path + ".1")
+            except OSError:
+                pass
+            append_line(path, line)
+        except Exception:
+            pass
+
+
+class _NullRecorder(Recorder):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        self.hook = ""
+        self.stages = {}
+        self.flagged = None
+        self.tier = None
+        self.error = None
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def fail(self, exc: BaseException) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+_NULL = _NullRecorder()
+
+
+def recorder(hook: str) -> Recorder:
+    return Recorder(hook) if enabled() else _NULL
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile, as in benchmarks/bench.py."""
+    import math
+
+    ordered = sorted(samples)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def read_runs(path: str) -> list[dict[str, object]]:
+    """Runs from the rotated and current logs, oldest first."""
+    import json
+
+    runs: list[dict[str, object]] = []
+    for name in (path + ".1", path):
+        try:
+            with open(name, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(run, dict) and isinstance(run.get("hook"), str):
+                runs.append(run)
+    return runs
+
+
+def report(runs: list[dict[str, object]]) -> str:
+    if not runs:
+        return "no runs recorded (enable with HUMAN_SPEAK_METRICS=1)"
+    by_hook: dict[str, list[dict[str, object]]] = {}
+    for run in runs:
+        by_hook.setdefault(str(run["hook"]), []).append(run)
+
+    lines = [f"{'hook / stage':<28} {'runs':>6} {'p50 ms':>9} {'p99 ms':>9}"]
+    for hook in sorted(by_hook):
+        hook_runs = by_hook[hook]
+        totals = [float(t) for t in (r.get("total") for r in hook_runs)
+                  if isinstance(t, (int, float))]
+        if totals:
+            lines.append(
+                f"{hook:<28} {len(totals):>6} {_percentile(totals, 50):>9.2f} "
+                f"{_percentile(totals, 99):>9.2f}"
+            )
+        stages: dict[str, list[float]] = {}
+        for run in hook_runs:
+            run_stages = run.get("stages")
+            if isinstance(run_stages, dict):
+                for stage, ms in run_stages.items():
+                    if isinstance(ms, (int, float)):
+                        stages.setdefault(stage, []).append(float(ms))
+        for stage, samples in stages.items():
+            lines.append(
+                f"  {stage:<26} {len(samples):>6} {_percentile(samples, 50):>9.2f} "
+                f"{_percentile(samples, 99):>9.2f}"
+            )
+
+        scored = [r for r in hook_runs if isinstance(r.get("flagged"), bool)]
+        if scored:
+            flagged = sum(1 for r in scored if r["flagged"])
+            lines.append(f"  flag rate: {flagged}/{len(scored)} ({flagged / len(scored):.1%})")
+        tiers: dict[int, int] = {}
+        for run in hook_runs:
+            tier = run.get("tier")
+            if isinstance(tier, int):
+                tiers[tier] = tiers.get(tier, 0) + 1
+        if tiers:
+            decided = sum(tiers.values())
+            lines.append("  decided at tier: " + ", ".join(
+                f"{tier} {count} ({count / decided:.1%})" for tier, count in sorted(tiers.items())
+            ))
+        errors: dict[str, int] = {}
+        for run in hook_runs:
+            if run.get("error"):
+                errors[str(run["error"])] = errors.get(str(run["error"]), 0) + 1
+        if errors:
+            lines.append("  errors: " + ", ".join(
+                f"{name} x{count}" for name, count in sorted(errors.items())
+            ))
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="human-speak hook metrics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("report", help="latency, flag rate and errors per hook")
+    show.add_argument("--file", default=None,
+                      help="metrics log (default: HUMAN_SPEAK_METRICS_FILE or <state dir>/metrics.jsonl)")
+    args = parser.parse_args(argv)
+
+    print(report(read_runs(args.file or metrics_path())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compiled snapshot of the user speak profile for the hooks.
+
+SessionStart needs only the threshold and the confirmed-intent index, not
+the markdown or the store log behind them. Both are compiled into a small
+JSON sidecar, user-speak-profile.cache.json, along with the (mtime, size) of
+the files they came from:
+
+  {"version": 3, "source": {"profile": [mtime_ns, size], "store": [...]},
+   "threshold": 0.4, "updated": "2026-02-27", "malformed": false,
+   "index": "/path/user-speak-profile.index.json", "weights": "0.8,1.1,...,-1.2",
+   "model_threshold": 0.55}
+
+weights is the learned scorer model in HUMAN_SPEAK_WEIGHTS form (see
+scorer.Weights), or null until the trainer has produced one; model_threshold
+is the threshold the trainer picked for it, used in place of threshold
+whenever weights are.
+
+load() returns the snapshot with two stat calls and one small read while
+the sources are unchanged; anything else (a hand edit, a SessionEnd that
+wrote the profile, a missing or stale cache) makes it return None, and the
+caller recompiles. SessionEnd recompiles right after it writes, so a
+session start normally never parses the profile at all.
+"""
+from __future__ import annotations
+
+import json
+import os
+
+CACHE_VERSION = 3
+
+
+def cache_path_for(profile_path: str) -> str:
+    root, _ = os.path.splitext(profile_path)
+    return root + ".cache.json"
+
+
+def _stat(path: str) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _source(profile_path: str) -> dict[str, list[int] | None]:
+    root, _ = os.path.splitext(profile_path)
+    return {"profile": _stat(profile_path), "store": _stat(root + ".jsonl")}
+
+
+def load(profile_path: str) -> dict[str, object] | None:
+    """The cached snapshot, or None if it is missing or out of date."""
+    try:
+        with open(cache_path_for(profile_path), encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        return None
+    if cache.get("source") != _source(profile_path):
+        return None
+    return cache
+
+
+def compile_profile(profile_path: str) -> dict[str, object]:
+    """Rebuild the snapshot and intent index from the profile and save them.
+
+    The threshold comes from the markdown view when there is one, so a hand
+    edit applies from the next session start; the mappings come from the
+    store (see profile_store.load_profile).
+    """
+    import intent_index
+    from profile_store import DEFAULT_THRESHOLD, load_profile, records_from_markdown
+
+    state = load_profile(profile_path)
+    threshold = state.threshold
+    malformed = False
+    try:
+        with open(profile_path, encoding="utf-8") as f:
+            content = f.read()
+    except OSError:
+        content = None
+    if content is not None:
+        calibration = [r for r in records_from_markdown(content) if r["kind"] == "calibration"]
+        value = calibration[0]["threshold"] if calibration else None
+        if isinstance(value, float):
+            threshold = value
+        else:
+            threshold, malformed = DEFAULT_THRESHOLD, True
+
+    index_path = intent_index.index_path_for(profile_path)
+    if state.mappings:
+        intent_index.save(intent_index.build(state.mappings), index_path)
+    elif os.path.exists(index_path):
+        os.unlink(index_path)
+
+    weights = None
+    model_threshold = None
+    coefficients = state.weights.get("coefficients")
+    bias = state.weights.get("bias")
+    if isinstance(coefficients, list) and isinstance(bias, (int, float)):
+        from scorer import Weights
+
+        weights = Weights([float(v) for v in coefficients], float(bias)).format()
+        value = state.weights.get("threshold")
+        if isinstance(value, (int, float)):
+            model_threshold = float(value)
+
+    cache: dict[str, object] = {
+        "version": CACHE_VERSION,
+        "source": _source(profile_path),
+        "threshold": threshold,
+        "updated": state.updated,
+        "malformed": malformed,
+        "index": index_path if state.mappings else None,
+        "weights": weights,
+        "model_threshold": model_threshold,
+    }
+    path = cache_path_for(profile_path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"))
+    os.replace(tmp, path)
+    return cache
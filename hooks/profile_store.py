@@ -0,0 +1,408 @@
+"""Append-only store behind the user speak profile.
+
+The profile lives in a JSONL log next to the markdown file
+(user-speak-profile.jsonl beside user-speak-profile.md). Every change is one
+appended record, so recording a session costs a single write regardless of
+profile size. Loading replays the log into a ProfileState (later records win
+per key); once the log holds COMPACT_RATIO times more records than the state
+needs, it is rewritten atomically with one record per live key.
+
+  {"kind": "calibration", "threshold": 0.4, "updated": "2026-02-27"}
+  {"kind": "mapping", "original": "go ahead", "interpreted": "proceed with the plan",
+   "seen": "2026-02-27"}
+  {"kind": "mapping-floor", "floor": 3.0}   (eviction state, see below)
+  {"kind": "patterns", "lines": ["- Often omits subjects"]}   (hand-written)
+  {"kind": "stats", "raised": 3.0, ...}   (see calibration.py)
+  {"kind": "example", "features": [1.0, 0.4, 0.0, 0.0, 0.6], "label": 1}
+  {"kind": "weights", "coefficients": [...], "bias": -1.2, "threshold": 0.55}   (see trainer.py)
+
+Mappings are keyed by their normalized phrase (intent_index.normalize), so
+"Go ahead!" and "go ahead" share one slot; the latest wording and
+interpretation win and their hit counts add up. At most MAX_MAPPINGS are
+kept, evicted LFU with dynamic aging (LFU-DA): each mapping's priority is the
+floor plus its hits, the lowest priority is evicted first (the least
+recently confirmed on a tie), and the floor rises to the evicted priority.
+Phrases that keep recurring stay, and a burst of hits long ago cannot pin a
+phrase forever because newcomers start from the raised floor. Snapshots
+carry each mapping's hits and priority, plus the floor.
+
+user-speak-profile.md is a view rendered from the state. SessionEnd refreshes
+it; `python3 hooks/profile_store.py render [PROFILE.md]` prints it on demand.
+A legacy markdown-only profile is imported the first time the store is
+opened for writing. After that, hand edits to the view are folded back in
+the same way: the threshold, the "Communication Patterns" section (kept
+as written, and only ever edited by hand), and mappings that were added
+or reworded.
+
+Writers hold an exclusive lock (see ProfileLock) around the whole
+load-append-compact-render cycle, so concurrent SessionEnd hooks never lose
+each other's records. Readers need no lock: appends are single writes and
+compaction and rendering replace files atomically.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+
+from intent_index import normalize
+
+DEFAULT_THRESHOLD = 0.40
+MAX_MAPPINGS = 20
+MAX_EXAMPLES = 200
+COMPACT_RATIO = 4
+COMPACT_MIN_RECORDS = 64
+
+_THRESHOLD_LINE = re.compile(r"Ambiguity threshold:\s*([\d.]+)")
+_UPDATED_LINE = re.compile(r"Last updated:\s*(\S+)")
+_MAPPING_LINE = re.compile(r'^- "(.*)" -> interpreted as: "(.*)"$', re.MULTILINE)
+_PATTERNS_HEADING = "## Communication Patterns"
+_PATTERNS_HINT = '<!-- Examples: "Often omits subjects", "Uses voice-style run-ons" -->'
+
+
+def default_profile_path() -> str:
+    """HUMAN_SPEAK_PROFILE_PATH, else memory/user-speak-profile.md in the plugin."""
+    override = os.environ.get("HUMAN_SPEAK_PROFILE_PATH")
+    if override:
+        return override
+    plugin_root = os.environ.get(
+        "CLAUDE_PLUGIN_ROOT", os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return os.path.join(plugin_root, "memory", "user-speak-profile.md")
+
+
+def store_path_for(profile_path: str) -> str:
+    """Return the JSONL log path that backs a markdown profile."""
+    root, _ = os.path.splitext(profile_path)
+    return root + ".jsonl"
+
+
+class ProfileLock:
+    """Exclusive advisory lock on the store behind profile_path.
+
+    A no-op where fcntl is unavailable.
+    """
+
+    def __init__(self, profile_path: str) -> None:
+        self.path = store_path_for(profile_path) + ".lock"
+        self._fd = -1
+
+    def __enter__(self) -> ProfileLock:
+        try:
+            import fcntl
+        except ImportError:
+            return self
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)  # releases the lock
+            self._fd = -1
+
+
+class ProfileState:
+    """Current profile contents, rebuilt by replaying the log."""
+
+    __slots__ = (
+        "threshold", "updated", "mappings", "usage", "mapping_floor", "_phrases",
+        "stats", "examples", "weights", "patterns", "records",
+    )
+
+    def __init__(self) -> None:
+        self.threshold = DEFAULT_THRESHOLD
+        self.updated = ""
+        # original phrase -> interpretation, least recently confirmed first
+        self.mappings: dict[str, str] = {}
+        # original phrase -> (hits, LFU-DA priority, last seen date)
+        self.usage: dict[str, tuple[int, float, str]] = {}
+        self.mapping_floor = 0.0
+        # normalized phrase -> original phrase
+        self._phrases: dict[str, str] = {}
+        # latest calibration counters, as stored
+        self.stats: dict[str, object] = {}
+        # labelled flags for the trainer, oldest first, keep-last MAX_EXAMPLES
+        self.examples: list[tuple[list[float], int]] = []
+        # latest learned weights record, if any
+        self.weights: dict[str, object] = {}
+        # hand-written "Communication Patterns" lines
+        self.patterns: list[str] = []
+        self.records = 0
+
+    def apply(self, record: dict[str, object]) -> None:
+        self.records += 1
+        kind = record.get("kind")
+        if kind == "calibration":
+            threshold = record.get("threshold")
+            if isinstance(threshold, (int, float)):
+                self.threshold = float(threshold)
+            updated = record.get("updated")
+            if isinstance(updated, str):
+                self.updated = updated
+        elif kind == "mapping":
+            original = record.get("original")
+            interpreted = record.get("interpreted")
+            if isinstance(original, str) and isinstance(interpreted, str):
+                self._add_mapping(original, interpreted, record)
+        elif kind == "mapping-floor":
+            floor = record.get("floor")
+            if isinstance(floor, (int, float)):
+                self.mapping_floor = float(floor)
+        elif kind == "stats":
+            self.stats = record
+        elif kind == "example":
+            features = record.get("features")
+            label = record.get("label")
+            if isinstance(features, list) and label in (0, 1):
+                self.examples.append(([float(v) for v in features], int(label)))
+                del self.examples[:-MAX_EXAMPLES]
+        elif kind == "weights":
+            self.weights = record
+        elif kind == "patterns":
+            lines = record.get("lines")
+            if isinstance(lines, list):
+                self.patterns = [str(line) for line in lines]
+
+    def _add_mapping(self, original: str, interpreted: str, record: dict[str, object]) -> None:
+        key = normalize(original) or original
+        hits, seen = 0, ""
+        previous = self._phrases.pop(key, None)
+        if previous is not None:
+            del self.mappings[previous]
+            hits, _, seen = self.usage.pop(previous)
+
+        stored_hits = record.get("hits")
+        priority = record.get("priority")
+        if isinstance(stored_hits, int) and isinstance(priority, (int, float)):
+            hits, priority = stored_hits, float(priority)  # from a snapshot
+        else:
+            hits += 1
+            priority = self.mapping_floor + hits
+        record_seen = record.get("seen")
+        if isinstance(record_seen, str):
+            seen = record_seen
+
+        self.mappings[original] = interpreted
+        self.usage[original] = (hits, priority, seen)
+        self._phrases[key] = original
+        while len(self.mappings) > MAX_MAPPINGS:
+            # min() keeps the first of equal priorities: least recently confirmed
+            victim = min(self.mappings, key=lambda phrase: self.usage[phrase][1])
+            self.mapping_floor = self.usage[victim][1]
+            del self.mappings[victim]
+            del self.usage[victim]
+            del self._phrases[normalize(victim) or victim]
+
+    def interpretation(self, original: str) -> str | None:
+        """The stored interpretation of original, or of a phrase that
+        normalizes the same."""
+        phrase = self._phrases.get(normalize(original) or original)
+        return None if phrase is None else self.mappings[phrase]
+
+    def snapshot(self) -> list[dict[str, object]]:
+        """The minimal records that rebuild this state."""
+        records: list[dict[str, object]] = [
+            {"kind": "calibration", "threshold": self.threshold, "updated": self.updated}
+        ]
+        if self.patterns:
+            records.append({"kind": "patterns", "lines": self.patterns})
+        if self.mapping_floor:
+            records.append({"kind": "mapping-floor", "floor": self.mapping_floor})
+        for original, interpreted in self.mappings.items():
+            hits, priority, seen = self.usage[original]
+            records.append({
+                "kind": "mapping", "original": original, "interpreted": interpreted,
+                "hits": hits, "priority": priority, "seen": seen,
+            })
+        if self.stats:
+            records.append(self.stats)
+        records.extend(
+            {"kind": "example", "features": features, "label": label}
+            for features, label in self.examples
+        )
+        if self.weights:
+            records.append(self.weights)
+        return records
+
+
+class ProfileStore:
+    """JSONL log of profile records with periodic compaction."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> ProfileState:
+        state = ProfileState()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn or hand-mangled line
+                    if isinstance(record, dict):
+                        state.apply(record)
+        except FileNotFoundError:
+            pass
+        return state
+
+    def append(self, records: list[dict[str, object]]) -> None:
+        if not records:
+            return
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def needs_compaction(self, state: ProfileState) -> bool:
+        live = len(state.mappings) + len(state.examples) + 4
+        return state.records >= COMPACT_MIN_RECORDS and state.records > live * COMPACT_RATIO
+
+    def compact(self, state: ProfileState) -> None:
+        """Atomically rewrite the log as a snapshot of state."""
+        records = state.snapshot()
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        os.replace(tmp, self.path)
+        state.records = len(records)
+
+
+def patterns_from_markdown(content: str) -> list[str] | None:
+    """The lines written under "Communication Patterns", or None if the
+    profile has no such section."""
+    lines = content.splitlines()
+    try:
+        start = lines.index(_PATTERNS_HEADING) + 1
+    except ValueError:
+        return None
+    end = start
+    while end < len(lines) and not lines[end].startswith("## "):
+        end += 1
+    section = [line for line in lines[start:end] if line.strip() != _PATTERNS_HINT]
+    while section and not section[0].strip():
+        section.pop(0)
+    while section and not section[-1].strip():
+        section.pop()
+    return section
+
+
+def records_from_markdown(content: str) -> list[dict[str, object]]:
+    """Records equivalent to a markdown profile (legacy profiles, hand edits)."""
+    records: list[dict[str, object]] = []
+    threshold = _THRESHOLD_LINE.search(content)
+    updated = _UPDATED_LINE.search(content)
+    if threshold:
+        try:
+            value = float(threshold.group(1))
+        except ValueError:
+            value = DEFAULT_THRESHOLD
+        records.append({
+            "kind": "calibration",
+            "threshold": value,
+            "updated": updated.group(1) if updated else "",
+        })
+    patterns = patterns_from_markdown(content)
+    if patterns:
+        records.append({"kind": "patterns", "lines": patterns})
+    for original, interpreted in _MAPPING_LINE.findall(content):
+        records.append({"kind": "mapping", "original": original, "interpreted": interpreted})
+    return records
+
+
+def render_markdown(state: ProfileState) -> str:
+    lines = [
+        "# User Speak Profile",
+        "",
+        _PATTERNS_HEADING,
+        _PATTERNS_HINT,
+        *state.patterns,
+        "",
+        "## Calibration",
+        f"Ambiguity threshold: {state.threshold:.2f}",
+        f"Last updated: {state.updated or 'YYYY-MM-DD'}",
+        "",
+        "## Confirmed Intent Mappings",
+        '<!-- Format: - "raw phrase" -> interpreted as: "specific action" -->',
+    ]
+    lines.extend(
+        f'- "{original}" -> interpreted as: "{interpreted}"'
+        for original, interpreted in state.mappings.items()
+    )
+    return "\n".join(lines) + "\n"
+
+
+def load_profile(profile_path: str) -> ProfileState:
+    """Read-only load: the store if there is one, else the markdown profile."""
+    store = ProfileStore(store_path_for(profile_path))
+    if store.exists():
+        return store.load()
+    state = ProfileState()
+    try:
+        with open(profile_path, encoding="utf-8") as f:
+            content = f.read()
+    except OSError:
+        return state
+    for record in records_from_markdown(content):
+        state.apply(record)
+    return state
+
+
+def open_for_update(profile_path: str) -> tuple[ProfileStore, ProfileState]:
+    """Load the store behind profile_path, importing the markdown view first
+    if it is a legacy profile or was edited by hand."""
+    store = ProfileStore(store_path_for(profile_path))
+    state = store.load()
+    try:
+        with open(profile_path, encoding="utf-8") as f:
+            content = f.read()
+    except OSError:
+        return store, state
+    imported = records_from_markdown(content)
+    if store.exists():
+        # The view was rendered from the log: keep only what differs from it
+        imported = [
+            r for r in imported
+            if (r["kind"] == "calibration" and r["threshold"] != state.threshold)
+            or (r["kind"] == "mapping"
+                and state.interpretation(str(r["original"])) != r["interpreted"])
+        ]
+        patterns = patterns_from_markdown(content)
+        if patterns is not None and patterns != state.patterns:
+            imported.append({"kind": "patterns", "lines": patterns})
+    store.append(imported)
+    for record in imported:
+        state.apply(record)
+    return store, state
+
+
+def write_view(profile_path: str, state: ProfileState) -> None:
+    os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+    tmp = f"{profile_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_markdown(state))
+    os.replace(tmp, profile_path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="human-speak profile store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    render = sub.add_parser("render", help="print the markdown view of a profile")
+    render.add_argument("profile", nargs="?", default=None,
+                        help="path to user-speak-profile.md")
+    args = parser.parse_args(argv)
+
+    profile = args.profile or default_profile_path()
+    sys.stdout.write(render_markdown(ProfileStore(store_path_for(profile)).load()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""Identifier index of the working project, so its names are not typos.
+
+Prompts are full of repo-specific names: modules, functions, branches. The
+typo-density signal would count "kubeconfig" or "pyproject" as misspellings,
+so SessionStart indexes the project's identifiers and exports the result as
+HUMAN_SPEAK_VOCAB. The scorer checks it alongside the English word set.
+
+The index lives under <state dir>/vocab/<project>-<crc of its path>/:
+
+  words.u32              sorted fingerprints of every identifier and its
+                         snake_case / camelCase parts (dictionary.WordSet
+                         format, memory-mapped by the scorer)
+  tokens.<gen>.u32       each indexed file's fingerprints, back to back
+  manifest.json          {"version": 1, "root": ..., "generation": 3,
+                          "files": {"src/app.py": [mtime_ns, size, offset, count]}}
+
+Re-indexing walks the tree and stats each source file, but only reads files
+whose (mtime, size) changed; the rest reuse their slice of the previous
+tokens file. Walking and reading share a time budget (SCAN_BUDGET_S), and
+the walk also stops after MAX_ENTRIES directory entries. Files left unread
+are indexed at the next session start, so a large monorepo is covered over
+a few sessions without ever delaying one; files the walk did not reach keep
+their previous words. Local branch names
+from .git are added whenever words.u32 is rewritten.
+
+HUMAN_SPEAK_PROJECT_VOCAB=0 turns indexing off.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+import zlib
+from array import array
+
+VOCAB_VERSION = 1
+SCAN_BUDGET_S = 1.5
+MAX_FILES = 50_000
+MAX_ENTRIES = 200_000
+MAX_FILE_BYTES = 256 * 1024
+MAX_FILE_TOKENS = 4096
+
+SOURCE_EXTENSIONS = frozenset({
+    ".py", ".pyi", ".js", ".jsx", ".ts", ".tsx", ".mjs", ".go", ".rs", ".java", ".kt",
+    ".rb", ".php", ".c", ".h", ".cc", ".cpp", ".hpp", ".cs", ".swift", ".scala", ".sh",
+    ".sql", ".proto", ".toml", ".yaml", ".yml", ".md",
+})
+SKIP_DIRS = frozenset({
+    "node_modules", "__pycache__", "venv", "env", "dist", "build", "target", "vendor",
+    "third_party", "site-packages",
+})
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*[A-Za-z0-9]")
+_PART = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+
+
+def enabled() -> bool:
+    return os.environ.get("HUMAN_SPEAK_PROJECT_VOCAB") != "0"
+
+
+def index_dir(root: str) -> str:
+    from state import state_root
+
+    root = os.path.abspath(root)
+    name = re.sub(r"[^\w.-]", "", os.path.basename(root)) or "root"
+    return os.path.join(state_root(), "vocab", f"{name}-{zlib.crc32(root.encode()):08x}")
+
+
+def fingerprints(text: str) -> set[int]:
+    """Fingerprints (see dictionary.fingerprint) of text's identifiers and of
+    their snake_case and camelCase parts."""
+    from dictionary import fingerprint
+
+    keys: set[int] = set()
+    for identifier in set(_IDENTIFIER.findall(text)):
+        keys.add(fingerprint(identifier))
+        for part in _PART.findall(identifier):
+            if len(part) > 2:
+                keys.add(fingerprint(part))
+        if len(keys) >= MAX_FILE_TOKENS:
+            break
+    return keys
+
+
+def _source_files(root: str, deadline: float) -> tuple[list[tuple[str, os.stat_result]], bool]:
+    """(source files under root with their stat, whether the walk finished
+    before the deadline and the MAX_FILES and MAX_ENTRIES caps)."""
+    found: list[tuple[str, os.stat_result]] = []
+    entries = 0
+    for directory, dirs, files in os.walk(root):
+        entries += len(dirs) + len(files)
+        if entries > MAX_ENTRIES or time.monotonic() >= deadline:
+            return found, False
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in SKIP_DIRS)
+        for name in sorted(files):
+            if os.path.splitext(name)[1] not in SOURCE_EXTENSIONS:
+                continue
+            if time.monotonic() >= deadline:
+                return found, False
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if st.st_size <= MAX_FILE_BYTES:
+                found.append((os.path.relpath(path, root), st))
+                if len(found) >= MAX_FILES:
+                    return found, False
+    return found, True
+
+
+def _branches(root: str) -> set[int]:
+    """Fingerprints of local branch names and their parts."""
+    names: list[str] = []
+    heads = os.path.join(root, ".git", "refs", "heads")
+    for directory, _, files in os.walk(heads):
+        names.extend(os.path.relpath(os.path.join(directory, f), heads) for f in files)
+    try:
+        with open(os.path.join(root, ".git", "packed-refs"), encoding="utf-8") as f:
+            for line in f:
+                _, _, ref = line.strip().partition(" refs/heads/")
+                if ref:
+                    names.append(ref)
+    except OSError:
+        pass
+    return fingerprints(" ".join(names).replace("/", " ").replace("-", " "))
+
+
+def _load_manifest(directory: str, root: str) -> tuple[dict[str, list[int]], array[int], int]:
+    """(files, tokens, generation) of the previous index, or empty ones."""
+    try:
+        with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != VOCAB_VERSION or manifest.get("root") != root:
+            raise ValueError("stale manifest")
+        generation = int(manifest["generation"])
+        tokens = array("I")
+        with open(os.path.join(directory, f"tokens.{generation}.u32"), "rb") as f:
+            tokens.frombytes(f.read())
+        return dict(manifest["files"]), tokens, generation
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}, array("I"), 0
+
+
+def _write(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def update(root: str, budget: float = SCAN_BUDGET_S) -> tuple[str, dict[str, int]]:
+    """Bring root's index up to date. Returns (words.u32 path, counts of
+    files indexed, read, reused and left for later, words, and whether the
+    walk was cut short)."""
+    deadline = time.monotonic() + budget
+    root = os.path.abspath(root)
+    directory = index_dir(root)
+    from dictionary import encode
+    from state import ensure_dir
+
+    ensure_dir(directory)
+    old_files, old_tokens, generation = _load_manifest(directory, root)
+
+    files: dict[str, list[int]] = {}
+    tokens = array("I")
+    counts = {"files": 0, "read": 0, "reused": 0, "pending": 0, "partial": 0}
+    found, complete = _source_files(root, deadline)
+    for rel, st in found:
+        previous = old_files.get(rel)
+        if previous and previous[:2] == [st.st_mtime_ns, st.st_size]:
+            keys = old_tokens[previous[2]:previous[2] + previous[3]]
+            mtime = st.st_mtime_ns
+            counts["reused"] += 1
+        elif time.monotonic() < deadline:
+            try:
+                with open(os.path.join(root, rel), encoding="utf-8", errors="replace") as f:
+                    keys = array("I", sorted(fingerprints(f.read())))
+            except OSError:
+                continue
+            mtime = st.st_mtime_ns
+            counts["read"] += 1
+        else:
+            counts["pending"] += 1
+            if not previous:
+                continue
+            # Out of time: keep the old words, re-read next session
+            keys = old_tokens[previous[2]:previous[2] + previous[3]]
+            mtime = previous[0]
+        files[rel] = [mtime, st.st_size, len(tokens), len(keys)]
+        tokens.extend(keys)
+    if not complete:
+        # Files past where the walk stopped may still exist: keep their words
+        counts["partial"] = 1
+        for rel, previous in old_files.items():
+            if rel not in files:
+                keys = old_tokens[previous[2]:previous[2] + previous[3]]
+                files[rel] = [previous[0], previous[1], len(tokens), len(keys)]
+                tokens.extend(keys)
+    counts["files"] = len(files)
+
+    words_path = os.path.join(directory, "words.u32")
+    if files == old_files and os.path.exists(words_path):
+        counts["words"] = os.path.getsize(words_path) // 4
+        return words_path, counts
+
+    generation += 1
+    _write(os.path.join(directory, f"tokens.{generation}.u32"), tokens.tobytes())
+    _write(os.path.join(directory, "manifest.json"), json.dumps({
+        "version": VOCAB_VERSION, "root": root, "generation": generation, "files": files,
+    }, separators=(",", ":")).encode())
+    words = array("I", sorted(set(tokens) | _branches(root)))
+    _write(words_path, encode(words))
+    try:
+        os.unlink(os.path.join(directory, f"tokens.{generation - 1}.u32"))
+    except OSError:
+        pass
+    counts["words"] = len(words)
+    return words_path, counts
+
+
+def project_root(payload: dict[str, object]) -> str | None:
+    """The directory to index: the session's cwd, unless it is / or $HOME."""
+    cwd = payload.get("cwd") or os.environ.get("CLAUDE_PROJECT_DIR") or os.getcwd()
+    if not isinstance(cwd, str) or not os.path.isdir(cwd):
+        return None
+    root = os.path.abspath(cwd)
+    if root in (os.path.abspath(os.sep), os.path.abspath(os.path.expanduser("~"))):
+        return None
+    return root
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Index a project's identifiers")
+    parser.add_argument("root", nargs="?", default=".")
+    parser.add_argument("--budget", type=float, default=SCAN_BUDGET_S,
+                        help="seconds to spend reading changed files")
+    args = parser.parse_args(argv)
+
+    path, counts = update(args.root, args.budget)
+    print(json.dumps({"index": path, **counts}))
+
+
+if __name__ == "__main__":
+    main()
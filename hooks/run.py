@@ -0,0 +1,122 @@
+"""Fast-start entry point for the human-speak hooks.
+
+  python3 -I -S hooks/run.py <hook-name> < payload.json
+
+Loads hooks/<hook-name>.py as a regular module, so its bytecode is cached in
+__pycache__ and reused on every later run, then calls its main(). Nothing but
+sys and importlib.machinery is imported before the hook itself, and the hooks
+defer their own imports to the code paths that use them. -I -S skip the
+site-packages scan and PYTHON* environment handling, which these stdlib-only
+hooks never need.
+
+  python3 hooks/run.py --compile           precompile every hook module
+  python3 hooks/run.py --report [HOOK ...] time spent before each main()
+"""
+from __future__ import annotations
+
+import sys
+
+HOOKS = ("user-prompt-submit", "session-start", "session-end")
+
+
+def _hooks_dir() -> str:
+    path = __file__
+    cut = max(path.rfind("/"), path.rfind("\\"))
+    return path[:cut] if cut > 0 else "."
+
+
+def load(hook: str) -> object:
+    """Import hooks/<hook>.py under a valid module name and return it."""
+    from importlib.machinery import SourceFileLoader
+
+    if hook not in HOOKS:
+        raise ValueError(f"unknown hook: {hook}")
+    directory = _hooks_dir()
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = "human_speak_" + hook.replace("-", "_")
+    path = f"{directory}/{hook}.py"
+    loader = SourceFileLoader(name, path)
+    module = type(sys)(name)
+    module.__file__ = path
+    module.__loader__ = loader
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def compile_hooks() -> bool:
+    """Write bytecode for every module in the hooks directory."""
+    import compileall
+
+    return bool(compileall.compile_dir(_hooks_dir(), maxlevels=0, quiet=1))
+
+
+def _import_times(stderr: str) -> list[tuple[str, float]]:
+    """Top-level (name, cumulative ms) pairs from -X importtime output."""
+    totals: list[tuple[str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2]
+        stripped = name.strip()
+        if name[1:2] == " ":
+            continue  # nested import
+        try:
+            totals.append((stripped, int(parts[1]) / 1000))
+        except ValueError:
+            continue
+    return totals
+
+
+def report(hooks: list[str], runs: int = 5) -> str:
+    """Median wall time each hook spends before main(), with its imports."""
+    import subprocess
+    import time
+
+    lines = [f"{'hook':<20} {'before main()':>14} {'imports':>9}  slowest imports"]
+    for hook in hooks:
+        command = [sys.executable, "-X", "importtime", "-I", "-S", __file__, "--load-only", hook]
+        walls: list[float] = []
+        stderr = ""
+        for _ in range(runs):
+            started = time.perf_counter()
+            proc = subprocess.run(command, input="", capture_output=True, text=True)
+            walls.append((time.perf_counter() - started) * 1000)
+            stderr = proc.stderr
+        imports = _import_times(stderr)
+        slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:3]
+        lines.append(
+            f"{hook:<20} {sorted(walls)[len(walls) // 2]:>11.1f} ms "
+            f"{sum(ms for _, ms in imports):>6.1f} ms  "
+            + ", ".join(f"{name} {ms:.1f}" for name, ms in slowest)
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> int:
+    if argv[:1] == ["--compile"]:
+        return 0 if compile_hooks() else 1
+    if argv[:1] == ["--report"]:
+        print(report(argv[1:] or list(HOOKS)))
+        return 0
+    if argv[:1] == ["--load-only"] and len(argv) == 2:
+        load(argv[1])
+        return 0
+    if len(argv) != 1:
+        print(__doc__, file=sys.stderr)
+        return 0
+    try:
+        module = load(argv[0])
+        getattr(module, "main")()
+    except Exception:
+        # A hook must never block the session, even if it cannot be loaded
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,176 @@
+"""Persistent score memo shared by UserPromptSubmit runs.
+
+Repeated prompts ("continue", "run the tests", retries) would otherwise be
+re-scored from scratch in a new process every time. The memo is a fixed-size
+table in a memory-mapped file, <state dir>/score-memo.bin, keyed by a 64-bit
+BLAKE2b hash of the stripped message, the threshold, the learned weights and
+the session-context referent (see session_context.py) and the project
+vocabulary in use (see project_vocab.py).
+
+Layout, in native 8-byte words:
+
+  header  MAGIC, stamp, 2 reserved
+  bucket  hand, then WAYS slots of (key, score, meta)      x BUCKETS
+
+meta packs the signals bitmask (bits 0-7), the CLOCK reference bit (bit 8)
+and a 32-bit check of the slot (bits 32-63); a slot with a bad check, such
+as one torn by a concurrent writer, reads as a miss. A bucket evicts with
+CLOCK: the hand skips and clears referenced slots and replaces the first
+unreferenced one.
+
+The stamp is derived from the scorer and dictionary files, so editing the
+scorer or rebuilding the dictionary empties the memo. HUMAN_SPEAK_MEMO=0
+turns it off.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+
+try:
+    from _blake2 import blake2b  # what hashlib re-exports, minus OpenSSL start-up
+except ImportError:  # pragma: no cover
+    from hashlib import blake2b
+
+MEMO_VERSION = 1
+MAGIC = 0x316F6D6550534148  # "HASPeMo1"
+BUCKETS = 256
+WAYS = 4
+SIGNALS = ("run-on", "filler-words", "missing-subject", "typo-density")
+
+_HEADER_WORDS = 4
+_SLOT_WORDS = 3
+_BUCKET_WORDS = 1 + WAYS * _SLOT_WORDS
+_REFERENCED = 1 << 8
+_MASK64 = (1 << 64) - 1
+
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def enabled() -> bool:
+    return os.environ.get("HUMAN_SPEAK_MEMO") != "0"
+
+
+def memo_path() -> str:
+    from state import state_root
+
+    return os.path.join(state_root(), "score-memo.bin")
+
+
+def memo_key(
+    text: str,
+    threshold: float | None,
+    weights: str | None,
+    referent: float = 0.0,
+    vocabulary: str = "",
+) -> int:
+    """vocabulary identifies the project word set, including its version."""
+    data = f"{threshold}\0{weights or ''}\0{referent}\0{vocabulary}\0{text.strip()}".encode(
+        "utf-8", "surrogatepass"
+    )
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little") or 1
+
+
+def _stamp() -> int:
+    stamp = MEMO_VERSION
+    for name in ("scorer.py", os.path.join("data", "english.u32")):
+        try:
+            stamp = (stamp * 1000003) ^ os.stat(os.path.join(HOOKS_DIR, name)).st_mtime_ns
+        except OSError:
+            pass
+    return stamp & _MASK64
+
+
+class ScoreMemo:
+    """Fixed-size, set-associative score table in a memory-mapped file."""
+
+    def __init__(self, path: str, buckets: int = BUCKETS) -> None:
+        self.buckets = buckets
+        size = 8 * (_HEADER_WORDS + buckets * _BUCKET_WORDS)
+        directory = os.path.dirname(path)
+        if directory:
+            from state import ensure_dir
+
+            ensure_dir(directory)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self._words = memoryview(self._map).cast("Q")
+        self._floats = memoryview(self._map).cast("d")
+        stamp = _stamp()
+        if self._words[0] != MAGIC or self._words[1] != stamp:
+            self._map[:] = bytes(size)
+            self._words[1] = stamp
+            self._words[0] = MAGIC
+
+    def close(self) -> None:
+        self._words.release()
+        self._floats.release()
+        self._map.close()
+
+    def _check(self, slot: int) -> int:
+        words = self._words
+        return (words[slot] ^ words[slot + 1] ^ (words[slot + 2] & 0xFF)) & 0xFFFFFFFF
+
+    def _bucket(self, key: int) -> int:
+        return _HEADER_WORDS + (key % self.buckets) * _BUCKET_WORDS
+
+    def get(self, key: int) -> tuple[float, list[str]] | None:
+        words = self._words
+        base = self._bucket(key)
+        for way in range(WAYS):
+            slot = base + 1 + way * _SLOT_WORDS
+            if words[slot] != key:
+                continue
+            meta = words[slot + 2]
+            if meta >> 32 != self._check(slot):
+                return None
+            words[slot + 2] = meta | _REFERENCED
+            return self._floats[slot + 1], [
+                name for bit, name in enumerate(SIGNALS) if meta & (1 << bit)
+            ]
+        return None
+
+    def put(self, key: int, score: float, signals: list[str]) -> None:
+        mask = 0
+        for name in signals:
+            if name not in SIGNALS:
+                return  # a signal this layout cannot store
+            mask |= 1 << SIGNALS.index(name)
+        words = self._words
+        base = self._bucket(key)
+        target = -1
+        for way in range(WAYS):
+            if words[base + 1 + way * _SLOT_WORDS] == key:
+                target = way
+                break
+        if target < 0:
+            hand = words[base] % WAYS
+            for _ in range(2 * WAYS):
+                meta = words[base + 1 + hand * _SLOT_WORDS + 2]
+                if not meta & _REFERENCED:
+                    break
+                words[base + 1 + hand * _SLOT_WORDS + 2] = meta & ~_REFERENCED & _MASK64
+                hand = (hand + 1) % WAYS
+            target = hand
+            words[base] = (hand + 1) % WAYS
+        slot = base + 1 + target * _SLOT_WORDS
+        words[slot + 2] = 0  # invalid while the slot is rewritten
+        words[slot] = key
+        self._floats[slot + 1] = score
+        words[slot + 2] = mask
+        words[slot + 2] = mask | (self._check(slot) << 32)
+
+
+def open_memo() -> ScoreMemo | None:
+    """The shared memo, or None if it is disabled or cannot be opened."""
+    if not enabled():
+        return None
+    try:
+        return ScoreMemo(memo_path())
+    except (OSError, ValueError):
+        return None
@@ -2,65 +2,1034 @@
 
 Scores a message 0.0-1.0 for ambiguity using pure heuristics.
 No external dependencies -- stdlib only.
+
+Only prose is scored. A linear pre-pass (_prose) takes fenced and indented
+code, log and stack-trace lines, inline code, URLs and file paths out of the
+text before the heuristics run, and counts them in Analysis.structure.
+
+Cost is bounded regardless of message size. Messages longer than
+_INSPECT_LIMIT characters are scored from a sample: the head of the message
+plus evenly spaced windows from the rest. The sample is scanned one segment
+at a time, stopping once the score saturates or _TIME_BUDGET_S runs out,
+and the message itself is never copied whole.
+
+When only the decision at a threshold matters, cascade() puts a tier-0
+check in front of analyze(): upper_bound() caps the score from a few scans
+of the raw text, and messages whose cap is below the threshold are never
+split into sentences or words at all.
+
+IncrementalScorer gives analyze()'s result for text that arrives in chunks,
+such as live dictation, keeping running totals so each chunk is read once.
 """
 from __future__ import annotations
 
+import math
 import re
+import time
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # keep typing off the hook's import path
+    from typing import Callable, Container, Sequence
 
 # Filler words that signal casual/verbal input
-_FILLERS = frozenset([
+_FILLERS = (
     "like", "you know", "sort of", "kinda", "basically",
     "i mean", "right", "literally", "actually",
-])
+)
+
+# All fillers in one alternation, longest first, matched on word boundaries
+# so "likely" or "factually" do not count and multi-word fillers may span
+# any whitespace.
+_FILLER_PATTERN = re.compile(
+    r"\b(?:"
+    + "|".join(
+        re.escape(filler).replace(r"\ ", " ").replace(" ", r"\s+")
+        for filler in sorted(_FILLERS, key=len, reverse=True)
+    )
+    + r")\b",
+    re.IGNORECASE,
+)
+
+# Filler density (fillers per word) at which filler-words reaches full weight
+_FILLER_SATURATION_DENSITY = 0.05
 
 # Common imperative verbs at sentence start (missing subject signals)
+_IMPERATIVES = r"(go|fix|do|make|add|run|create|update|remove|check|look|try|get|put|set)\b"
 _IMPERATIVE_PATTERN = re.compile(
-    r"^(go|fix|do|make|add|run|create|update|remove|check|look|try|get|put|set)\b",
+    "^" + _IMPERATIVES + r"(?![(]|[.:/-]\w)",  # not get(...), get.user, set-up
     re.IGNORECASE,
 )
+# Tier 0: an imperative wherever the first sentence could start, after any
+# whitespace and sentence punctuation the sentence split would drop.
+_LEADING_IMPERATIVE = re.compile(r"[\s.!?]*" + _IMPERATIVES, re.IGNORECASE)
 
 
-def detect_signals(text: str) -> list[str]:
-    """Return list of ambiguity signal names present in text."""
-    if not text.strip():
-        return []
+# Sentence ends are punctuation followed by whitespace or the end of text,
+# so "auth.py" or "v1.2" do not end a sentence.
+_SENTENCE_SPLIT = re.compile(r"[.!?]+(?=\s|$)")
+
+# Structure pre-pass. Lines inside ``` / ~~~ fences, indented four spaces or
+# a tab, or shaped like log output or stack frames are not prose.
+_FENCE = re.compile(r"[ \t]*(?:```|~~~)")
+_INDENTED = re.compile(r"(?: {4}|\t)\s*\S")
+_LOG_LINE = re.compile(
+    r"""[ \t]*(?:
+        \d{4}-\d\d-\d\d[ T]\d\d:\d\d          # 2026-10-17 12:00 timestamps
+      | \[?\d\d:\d\d:\d\d                       # 12:00:01 / [12:00:01]
+      | \[?(?:DEBUG|INFO|WARN(?:ING)?|ERROR|FATAL|TRACE|CRITICAL)\b
+      | Traceback\ \(most\ recent\ call\ last\)
+      | File\ ".*",\ line\ \d+                    # Python frames
+      | at\ [\w$.<>]+\ ?\(.*\)\s*$                # Java / JavaScript frames
+      | [\w.]+(?:Error|Exception):                  # TypeError: ...
+    )""",
+    re.VERBOSE,
+)
+# Inside prose lines: inline code, URLs and file paths. The alternation is
+# slow on plain prose, so it only runs when a backtick, a slash or a file
+# extension (_FILE_EXTENSION, which starts with a literal and is cheap to
+# search for) is present.
+_FILE_EXTENSIONS = (
+    r"(?:py|js|ts|tsx|jsx|json|md|txt|yml|yaml|toml|sh|go|rs|java|rb"
+    r"|c|h|cpp|css|html|log|cfg|ini|lock)\b"
+)
+_FILE_EXTENSION = re.compile(r"\." + _FILE_EXTENSIONS)
+# A URL or path match may only start where a run of the characters it scans
+# starts: retried at every position inside a long run that turns out not to
+# be one ("a-a-a-..."), each attempt would rescan the rest of it.
+_INLINE_STRUCTURE = re.compile(
+    r"(?P<code>`[^`\n]*`)"
+    r"|(?P<url>(?<![\w+.-])[a-z][a-z0-9+.-]*://\S+)"
+    r"|(?P<path>(?:(?<![\w/])~|(?<![\w./-])\.{0,2})/?(?:[\w.-]+/)+(?:[\w.-]*[\w-])?"
+    r"|(?<![\w-])-*\w[\w-]*\." + _FILE_EXTENSIONS + ")"
+)
+
+# IncrementalScorer: a line is known to be prose once it is this long (no
+# log-line pattern needs more, bar the two that can match anywhere along the
+# line), and the imperative check needs this much of the first sentence.
+_LOG_PREFIX = 40
+_FRAME_HEAD = re.compile(r"at [\w$.<>]+ ?")
+_FIRST_RUN_ENDED = re.compile(r"[\w.]*[^\w.]")
+_FIRST_SENTENCE_HEAD = 16
+# Prose is folded up to the last whitespace, unless the word before it may
+# be the first half of a two-word filler ("you" / "know").
+_LAST_SPACE = re.compile(r".*\s", re.DOTALL)
+_OPEN_FILLER = re.compile(
+    r"\b(?:" + "|".join(sorted({f.split()[0] for f in _FILLERS if " " in f})) + r")\s+\Z",
+    re.IGNORECASE,
+)
+
+# missing-subject strength is cut by up to this share when the session has
+# a likely referent for the unstated target (see session_context.py)
+_REFERENT_RELIEF = 0.75
+
+# Run-on cutoff: average words per sentence above which a message is run-on
+_RUN_ON_WORDS_PER_SENTENCE = 20
+
+# Prose words checked for typos: lowercase or capitalised words that are not
+# part of a path, identifier or file name.
+_DICTIONARY_TOKEN = re.compile(
+    r"(?<![\w./\\-])[A-Za-z]+(?:'[A-Za-z]+)?(?![\w/\\-]|\.\w)"
+)
+
+# typo-density needs this many checkable words and unknown words, fires at
+# _TYPO_SIGNAL_DENSITY unknown words per checked word and reaches full weight
+# at saturation. One unknown word in a short prompt is usually a term the
+# dictionary lacks, not a slip.
+_TYPO_MIN_WORDS = 4
+_TYPO_MIN_UNKNOWN = 2
+_TYPO_SIGNAL_DENSITY = 0.10
+_TYPO_SATURATION_DENSITY = 0.30
+_TYPO_EVIDENCE_LIMIT = 5
+
+# Messages longer than this many characters are sampled: the first half of
+# the limit plus _SAMPLE_WINDOWS evenly spaced windows covering the rest.
+_INSPECT_LIMIT = 64 * 1024
+_SAMPLE_WINDOWS = 16
+
+# Wall-clock budget for one analysis, well below the 5 s hook timeout
+_TIME_BUDGET_S = 0.5
+
+# Weighted signal contributions
+_WEIGHTS: dict[str, float] = {
+    "run-on": 0.35,
+    "filler-words": 0.35,
+    "missing-subject": 0.30,
+    "typo-density": 0.30,
+}
+
+# Feature vector layout: the four signal strengths, then average sentence
+# length scaled so twice the run-on cutoff is 1.0. A learned model can weigh
+# sentence length directly instead of relying on the fixed cutoff.
+FEATURES = ("run-on", "filler-words", "missing-subject", "typo-density", "sentence-length")
+
+
+class Weights:
+    """Per-user logistic model over FEATURES (see trainer.py).
+
+    score = sigmoid(bias + coefficients . features), so inference is one
+    dot product. Serialized as "c1,...,cN,bias" for HUMAN_SPEAK_WEIGHTS.
+    """
+
+    __slots__ = ("coefficients", "bias")
+
+    def __init__(self, coefficients: list[float], bias: float) -> None:
+        self.coefficients = coefficients
+        self.bias = bias
+
+    def score(self, vector: list[float]) -> float:
+        z = self.bias
+        for coefficient, value in zip(self.coefficients, vector):
+            z += coefficient * value
+        return 1.0 / (1.0 + math.exp(-max(-500.0, min(500.0, z))))
+
+    def format(self) -> str:
+        return ",".join(f"{v:.6g}" for v in [*self.coefficients, self.bias])
+
+    @classmethod
+    def parse(cls, text: str | None) -> Weights | None:
+        """Weights from format() output, or None if text is empty or stale."""
+        if not text:
+            return None
+        try:
+            values = [float(v) for v in text.split(",")]
+        except ValueError:
+            return None
+        if len(values) != len(FEATURES) + 1:
+            return None
+        return cls(values[:-1], values[-1])
+
+
+class Analysis:
+    """Result of one pass over a message.
+
+    evidence maps each detected signal to what triggered it: the average
+    words per sentence for run-on, per-filler counts and filler density for
+    filler-words, the leading verb for missing-subject and the first unknown
+    words with their density for typo-density.
+
+    sampled is True when only part of the message was inspected; word_count
+    is then extrapolated to the whole message and the rest describes the part
+    that was read.
+
+    features is the message's vector in FEATURES order. structure counts
+    what the pre-pass took out of the prose: code_blocks, code_lines,
+    log_lines, inline_code, urls and paths (only the kinds that were found).
+    word_count and sentence_count are prose-only.
+
+    tier is the cascade stage that decided the result: 0 when upper_bound()
+    alone put the message below the threshold (score is then that bound and
+    nothing else was computed), 1 when the structural signals did and 2 when
+    the dictionary was consulted as well.
+    """
+
+    __slots__ = (
+        "score", "signals", "word_count", "sentence_count", "evidence", "sampled", "features",
+        "structure", "tier",
+    )
+
+    def __init__(
+        self,
+        score: float,
+        signals: list[str],
+        word_count: int,
+        sentence_count: int,
+        evidence: dict[str, object],
+        sampled: bool = False,
+        features: list[float] | None = None,
+        structure: dict[str, int] | None = None,
+        tier: int = 1,
+    ) -> None:
+        self.score = score
+        self.signals = signals
+        self.word_count = word_count
+        self.sentence_count = sentence_count
+        self.evidence = evidence
+        self.sampled = sampled
+        self.features = features if features is not None else [0.0] * len(FEATURES)
+        self.structure = structure if structure is not None else {}
+        self.tier = tier
+
+    def __repr__(self) -> str:
+        return (
+            f"Analysis(score={self.score:.4f}, signals={self.signals!r}, "
+            f"word_count={self.word_count}, sentence_count={self.sentence_count}"
+            + (", sampled=True)" if self.sampled else ")")
+        )
+
+
+def analyze(
+    text: str,
+    threshold: float | None = None,
+    time_budget: float = _TIME_BUDGET_S,
+    weights: Weights | None = None,
+    referent: float = 0.0,
+    vocabulary: str | None = None,
+) -> Analysis:
+    """Score text and collect its signals in a single pass.
+
+    The score is the fixed weighted sum of signal strengths, or with weights
+    the learned model's probability that the message needs clarifying.
+
+    referent (0.0-1.0) is how likely the recent conversation supplies the
+    target of a bare imperative; it weakens missing-subject accordingly.
+
+    vocabulary is the path of a project word set (see project_vocab.py);
+    words in it are not typos.
+
+    The dictionary behind typo-density is only consulted while it can still
+    change the outcome: never once the other signals saturate the score, and,
+    when threshold is given, not once they alone settle which side of it the
+    message falls on.
+
+    Long messages are sampled (see _segments). Segments are scanned in order
+    until the score saturates or time_budget seconds have passed; whatever
+    was read by then decides the result.
+    """
+    if not text or text.isspace():
+        return Analysis(0.0, [], 0, 0, {})
+    return _analyze_segments(
+        _segments(text), len(text), threshold, time_budget, weights, referent, vocabulary
+    )
+
+
+def _analyze_segments(
+    segments: Sequence[str | _Segment],
+    length: int,
+    threshold: float | None,
+    time_budget: float,
+    weights: Weights | None,
+    referent: float,
+    vocabulary: str | None,
+) -> Analysis:
+    """analyze() over segments of a text of length characters: all of it, or
+    a sample (more than one segment). A segment may be given already read
+    (see _Segment), as IncrementalScorer does with the parts of its sample
+    that no longer change."""
+    deadline = time.monotonic() + time_budget
+    sampled = len(segments) > 1
+    structure: dict[str, int] = {}
+    parts: list[_Segment] = []
+
+    word_count = 0
+    sentence_count = 0
+    inspected = 0
+    first_sentence = ""
+    counts: dict[str, int] = {}
+    score = 0.0
+    signals: list[str] = []
+    strengths: dict[str, float] = {}
+    evidence: dict[str, object] = {}
+    for read, segment in enumerate(segments, 1):
+        part = segment if isinstance(segment, _Segment) else _Segment(segment)
+        parts.append(part)
+        inspected += part.length
+        for kind, count in part.structure.items():
+            structure[kind] = structure.get(kind, 0) + count
+        if read == 1:
+            first_sentence = part.first_sentence
+        sentence_count += part.sentence_count
+        word_count += part.word_count
+        for filler, count in part.fillers.items():
+            counts[filler] = counts.get(filler, 0) + count
+        if not word_count:
+            continue
+
+        signals, strengths, evidence = _signals(
+            word_count, sentence_count, first_sentence, counts, referent
+        )
+        score = sum(_WEIGHTS.get(s, 0.0) * strengths.get(s, 1.0) for s in signals)
+        if score >= 1.0 or time.monotonic() > deadline:
+            break
+
+    if not word_count:
+        return Analysis(0.0, [], 0, 0, {}, sampled, structure=structure)
+
+    score, vector, tier = _conclude(
+        score, signals, strengths, evidence, word_count, sentence_count, threshold, weights,
+        lambda: _typo_density(parts, deadline, vocabulary),
+    )
+    if sampled:
+        word_count = round(word_count * length / inspected)
+    return Analysis(
+        min(1.0, max(0.0, score)), signals, word_count, sentence_count, evidence, sampled,
+        vector, structure, tier,
+    )
+
+
+class _Segment:
+    """What _analyze_segments reads from one segment: its prose (after the
+    pre-pass, whose removals are counted in structure), sentences, words and
+    fillers, and once asked for, its typo tally."""
+
+    __slots__ = (
+        "length", "prose", "structure", "first_sentence", "sentence_count", "word_count",
+        "fillers", "_typos",
+    )
+
+    def __init__(self, segment: str) -> None:
+        self.length = len(segment)
+        self.structure: dict[str, int] = {}
+        self.prose = _prose(segment, self.structure)
+        sentences = [s for s in (p.strip() for p in _SENTENCE_SPLIT.split(self.prose)) if s]
+        self.first_sentence = sentences[0] if sentences else ""
+        self.sentence_count = len(sentences)
+        self.word_count = len(self.prose.split())
+        self.fillers = count_fillers(self.prose)
+        # (project word set, words checked, unknown words) of the last tally
+        self._typos: tuple[object, int, list[str]] | None = None
+
+    def typos(self, words: Container[str], project: Container[str] | None,
+              unknown: list[str]) -> int:
+        """_typo_tally of the prose, worked out once per project word set."""
+        if self._typos is None or self._typos[0] is not project:
+            found: list[str] = []
+            self._typos = (project, _typo_tally(self.prose, words, project, found), found)
+        unknown.extend(self._typos[2])
+        return self._typos[1]
+
+
+def _conclude(
+    score: float,
+    signals: list[str],
+    strengths: dict[str, float],
+    evidence: dict[str, object],
+    word_count: int,
+    sentence_count: int,
+    threshold: float | None,
+    weights: Weights | None,
+    typos: Callable[[], tuple[float, list[str]] | None],
+) -> tuple[float, list[float], int]:
+    """Feature vector, model score and typo-density stage of an analysis.
+
+    typos is called only if typo-density can still matter (see analyze) and
+    returns what _typo_density does; typo-density is added to signals and
+    evidence if it fires. Returns (score, feature vector, tier).
+    """
+    vector = [strengths.get(name, 1.0) if name in signals else 0.0 for name in FEATURES[:4]]
+    vector.append(min(1.0, word_count / max(sentence_count, 1) / (2 * _RUN_ON_WORDS_PER_SENTENCE)))
+    typo = FEATURES.index("typo-density")
+    if weights is None:
+        with_typos = score + _WEIGHTS["typo-density"]
+    else:
+        score = weights.score(vector)
+        with_typos = weights.score(vector[:typo] + [1.0] + vector[typo + 1:])
+
+    # Signal: typo-density (share of prose words not in the dictionary)
+    if not _typo_can_matter(score, with_typos, threshold):
+        return score, vector, 1
+    found = typos()
+    if (
+        found is not None
+        and found[0] >= _TYPO_SIGNAL_DENSITY
+        and len(found[1]) >= _TYPO_MIN_UNKNOWN
+    ):
+        density, unknown = found
+        strength = min(1.0, density / _TYPO_SATURATION_DENSITY)
+        signals.append("typo-density")
+        evidence["typo-density"] = {
+            "unknown": unknown[:_TYPO_EVIDENCE_LIMIT],
+            "density": round(density, 4),
+        }
+        vector[typo] = strength
+        if weights is None:
+            score += _WEIGHTS["typo-density"] * strength
+        else:
+            score = weights.score(vector)
+    return score, vector, 2
+
+
+def cascade(
+    text: str,
+    threshold: float,
+    time_budget: float = _TIME_BUDGET_S,
+    weights: Weights | None = None,
+    referent: float = 0.0,
+    vocabulary: str | None = None,
+    floor: float | None = None,
+) -> Analysis:
+    """analyze() behind the tier-0 check, for callers that act on the
+    decision at threshold.
+
+    A message whose upper_bound() is below floor (threshold by default) is
+    rejected without further work: Analysis.tier is 0 and score holds the
+    bound. Everything else is analyzed in full. Either way the result is on
+    the same side of threshold as analyze() would put it. Pass a lower floor
+    to get exact scores for messages just under threshold.
+    """
+    bound = upper_bound(text, weights, referent)
+    if bound < (threshold if floor is None else min(floor, threshold)):
+        return Analysis(bound, [], 0, 0, {}, tier=0)
+    return analyze(text, threshold, time_budget, weights, referent, vocabulary)
 
+
+def upper_bound(text: str, weights: Weights | None = None, referent: float = 0.0) -> float:
+    """A ceiling on analyze(text).score, whatever the dictionary says.
+
+    This is tier 0 of cascade(): a few scans of text that allocate nothing.
+    Plain text -- printable, so one line whose only whitespace is spaces,
+    with no inline code, URL or file path -- is its own prose, has at most
+    one word more than it has spaces, and can only show:
+
+      run-on           with more than _RUN_ON_WORDS_PER_SENTENCE words
+      filler-words     with a filler in it
+      missing-subject  with an imperative after any leading punctuation
+      typo-density     with room for _TYPO_MIN_WORDS dictionary tokens,
+                       which punctuation separates as well as spaces
+
+    Any other text may show every signal at full strength.
+    """
+    if not text or text.isspace():
+        return 0.0
+    subject = 1.0 - _REFERENT_RELIEF * min(1.0, referent) if referent > 0.0 else 1.0
+    if (
+        len(text) > _INSPECT_LIMIT
+        or not text.isprintable()
+        or "`" in text
+        or "/" in text
+        or _FILE_EXTENSION.search(text)
+    ):
+        possible = [1.0, 1.0, subject, 1.0, 1.0]
+    else:
+        words = text.count(" ") + 1
+        possible = [
+            1.0 if words > _RUN_ON_WORDS_PER_SENTENCE else 0.0,
+            1.0 if _FILLER_PATTERN.search(text) else 0.0,
+            subject if _LEADING_IMPERATIVE.match(text) else 0.0,
+            1.0 if len(text) >= 2 * _TYPO_MIN_WORDS - 1 else 0.0,
+            min(1.0, words / (2 * _RUN_ON_WORDS_PER_SENTENCE)),
+        ]
+    if weights is None:
+        return min(1.0, sum(_WEIGHTS[name] * v for name, v in zip(FEATURES[:4], possible)))
+    # Each feature at whichever end of its range raises the score
+    return weights.score([v if c > 0.0 else 0.0 for c, v in zip(weights.coefficients, possible)])
+
+
+class IncrementalScorer:
+    """Scores a message that arrives in pieces, such as live dictation.
+
+    feed() appends a chunk; analysis() (or score() and signals()) is what
+    analyze() returns for everything fed so far, with the same threshold,
+    weights, referent and vocabulary. An update costs time in proportion to
+    the chunk: finished words are folded into running totals (words,
+    sentences, fillers, dictionary lookups, what the pre-pass took out)
+    and only the unfinished tail is re-read for a result.
+
+    A line is folded once it is known to be prose: after _LOG_PREFIX
+    characters, at the first character that rules out a stack frame for
+    lines starting "at ", or at its end for a frame that reached its "(" and
+    for a "File" line that has not matched yet. Until then its text is only
+    collected, and checked again each time it doubles in length. Text after
+    an unclosed backtick waits for the closing one.
+
+    Past _INSPECT_LIMIT characters the message is sampled, as analyze()
+    samples it, but without keeping the text: the first half of the limit,
+    then windows every _stride characters, the stride doubling (and every
+    other window dropped) whenever 2 * _SAMPLE_WINDOWS windows are kept.
+    The windows stay evenly spaced over the text, though not at the offsets
+    analyze() picks for the finished text, which it cannot know in advance.
+    The head and each finished window are read once (see _Segment), so a
+    result there costs one window's reading plus a sum over the sample:
+    more than below the limit, but still not in proportion to the text.
+    """
+
+    __slots__ = (
+        "threshold", "weights", "referent", "vocabulary", "_english", "_project", "_chunks",
+        "_length", "_in_fence", "_kind", "_line", "_parts", "_unjoined", "_recheck",
+        "_pending", "_tally", "_result", "_head", "_windows", "_capture", "_next", "_stride",
+    )
+
+    def __init__(
+        self,
+        threshold: float | None = None,
+        weights: Weights | None = None,
+        referent: float = 0.0,
+        vocabulary: str | None = None,
+    ) -> None:
+        from dictionary import cached, english
+
+        self.threshold = threshold
+        self.weights = weights
+        self.referent = referent
+        self.vocabulary = vocabulary
+        self._english = english()
+        self._project = cached(vocabulary) if vocabulary else None
+        self._chunks: list[str] = []
+        self._length = 0
+        self._in_fence = False
+        # The current line's kind once known, its unread text (with the
+        # pieces not joined to it yet while the kind is unknown, and the
+        # length at which to look again), and prose read but not folded yet
+        self._kind: str | None = None
+        self._line = ""
+        self._parts: list[str] = []
+        self._unjoined = 0
+        self._recheck = 0
+        self._pending = ""
+        self._tally = _Tally()
+        self._result: Analysis | None = None
+        # Past _INSPECT_LIMIT: the head, finished windows, the window being
+        # captured, where the next one starts and the distance between them
+        self._head: _Segment | None = None
+        self._windows: list[_Segment] = []
+        self._capture: str | None = None
+        self._next = 0
+        self._stride = 0
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        self._result = None
+        if self._head is not None:
+            self._sample(chunk, self._length)
+            self._length += len(chunk)
+            return
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        if self._length > _INSPECT_LIMIT:
+            self._start_sampling()
+            return
+        *lines, rest = chunk.split("\n")
+        for line in lines:
+            self._end_line(line)
+        if self._kind is None:
+            self._parts.append(rest)
+            self._unjoined += len(rest)
+        elif self._kind == "prose":
+            self._line += rest
+        self._read()
+        self._fold()
+
+    def analysis(self) -> Analysis:
+        if self._result is None:
+            self._result = self._analyze()
+        return self._result
+
+    def score(self) -> float:
+        return self.analysis().score
+
+    def signals(self) -> list[str]:
+        return self.analysis().signals
+
+    def _decide(self, line: str) -> str:
+        """Classify the current line and count it if it is not prose."""
+        kind = _line_kind(line, self._in_fence)
+        structure = self._tally.structure
+        if kind == "fence":
+            if not self._in_fence:
+                structure["code_blocks"] = structure.get("code_blocks", 0) + 1
+            self._in_fence = not self._in_fence
+        elif kind != "prose":
+            structure[kind] = structure.get(kind, 0) + 1
+        return kind
+
+    def _join(self) -> str:
+        """The current line, with any pieces collected since the last check."""
+        if self._parts:
+            self._line += "".join(self._parts)
+            self._parts = []
+            self._unjoined = 0
+        return self._line
+
+    def _end_line(self, part: str) -> None:
+        line = self._join() + part if self._kind in (None, "prose") else ""
+        kind = self._kind or self._decide(line)
+        if kind == "prose":
+            self._pending += _inline(line, self._tally.structure) + "\n"
+        self._kind = None
+        self._line = ""
+        self._recheck = 0
+
+    def _read(self) -> None:
+        """Move the current line's finished words to _pending."""
+        if self._kind is None:
+            if len(self._line) + self._unjoined < self._recheck:
+                return
+            line = self._join()
+            if not _line_decided(line, self._in_fence):
+                self._recheck = 2 * len(line)
+                return
+            self._kind = self._decide(line)
+            if self._kind != "prose":
+                self._line = ""
+                return
+        match = _LAST_SPACE.match(self._line)
+        if match is None:
+            return
+        structure: dict[str, int] = {}
+        prose = _inline(self._line[:match.end()], structure)
+        if "`" in prose:
+            return  # a backtick may open inline code that is not closed yet
+        for kind, count in structure.items():
+            self._tally.structure[kind] = self._tally.structure.get(kind, 0) + count
+        self._pending += prose
+        self._line = self._line[match.end():]
+
+    def _fold(self) -> None:
+        end = len(self._pending)
+        while True:
+            match = _LAST_SPACE.match(self._pending, 0, end)
+            if match is None:
+                return
+            end = match.end()
+            opening = _OPEN_FILLER.search(self._pending, 0, end)
+            if opening is None:
+                break
+            end = opening.start()
+        self._tally.fold(self._pending[:end], self._english, self._project)
+        self._pending = self._pending[end:]
+
+    def _start_sampling(self) -> None:
+        """Keep the head of everything fed so far and sample the rest."""
+        text = "".join(self._chunks)
+        head = _INSPECT_LIMIT // 2
+        self._head = _Segment(_trim_words(text[:head], keep_start=True))
+        self._chunks = []
+        self._line, self._parts, self._pending = "", [], ""
+        self._stride = (_INSPECT_LIMIT - head) // _SAMPLE_WINDOWS
+        self._next = head
+        self._sample(text[head:], head)
+
+    def _sample(self, text: str, offset: int) -> None:
+        """Capture the windows text (starting offset characters in) overlaps."""
+        window = (_INSPECT_LIMIT - _INSPECT_LIMIT // 2) // _SAMPLE_WINDOWS
+        pos = 0
+        while pos < len(text):
+            if self._capture is None:
+                skip = self._next - (offset + pos)
+                if skip >= len(text) - pos:
+                    return
+                pos += max(0, skip)
+                self._capture = ""
+            take = text[pos:pos + window - len(self._capture)]
+            self._capture += take
+            pos += len(take)
+            if len(self._capture) == window:
+                self._windows.append(_Segment(_trim_words(self._capture, keep_start=False)))
+                self._capture = None
+                self._next += self._stride
+                if len(self._windows) == 2 * _SAMPLE_WINDOWS:
+                    # Keep every other window, at twice the distance
+                    del self._windows[1::2]
+                    self._stride *= 2
+                    self._next = _INSPECT_LIMIT // 2 + len(self._windows) * self._stride
+
+    def _analyze(self) -> Analysis:
+        if self._head is not None:
+            # Only the window being captured has to be read again
+            segments: list[str | _Segment] = [self._head, *self._windows]
+            if self._capture:
+                segments.append(_trim_words(self._capture, keep_start=False))
+            return _analyze_segments(segments, self._length, self.threshold, _TIME_BUDGET_S,
+                                     self.weights, self.referent, self.vocabulary)
+        tally = self._tally.copy()
+        tail = self._pending
+        # The text ends here, and so does the current line
+        kind = self._kind
+        line = "".join([self._line, *self._parts])
+        if kind is None:
+            kind = _line_kind(line, self._in_fence)
+            if kind == "fence":
+                if not self._in_fence:
+                    tally.structure["code_blocks"] = tally.structure.get("code_blocks", 0) + 1
+            elif kind != "prose":
+                tally.structure[kind] = tally.structure.get(kind, 0) + 1
+        if kind == "prose":
+            tail += _inline(line, tally.structure)
+        tally.fold(tail, self._english, self._project)
+        return tally.analysis(self.threshold, self.weights, self.referent, self._english)
+
+
+class _Tally:
+    """Running totals over the prose folded so far. A fold must end in
+    whitespace, so no word or sentence break straddles two folds."""
+
+    __slots__ = (
+        "words", "sentences", "open", "head", "head_done", "counts", "checked", "unknown",
+        "unknown_head", "structure",
+    )
+
+    def __init__(self) -> None:
+        self.words = 0
+        self.sentences = 0  # closed sentences
+        self.open = False  # the sentence being read has words
+        self.head = ""  # start of the first sentence, for the imperative check
+        self.head_done = False
+        self.counts: dict[str, int] = {}
+        self.checked = 0
+        self.unknown = 0
+        self.unknown_head: list[str] = []
+        self.structure: dict[str, int] = {}
+
+    def copy(self) -> _Tally:
+        other = _Tally()
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
+        other.counts = dict(self.counts)
+        other.unknown_head = list(self.unknown_head)
+        other.structure = dict(self.structure)
+        return other
+
+    def fold(
+        self, prose: str, words: Container[str] | None, project: Container[str] | None
+    ) -> None:
+        if not prose:
+            return
+        self.words += len(prose.split())
+        for i, piece in enumerate(_SENTENCE_SPLIT.split(prose)):
+            if i:
+                self.sentences += self.open
+                self.open = False
+                self.head_done = self.head_done or bool(self.head)
+            if not self.head_done and len(self.head) < _FIRST_SENTENCE_HEAD:
+                self.head = (self.head + piece if self.head else piece.lstrip())[
+                    :_FIRST_SENTENCE_HEAD
+                ]
+            if piece and not piece.isspace():
+                self.open = True
+        for filler, count in count_fillers(prose).items():
+            self.counts[filler] = self.counts.get(filler, 0) + count
+        if words is not None:
+            unknown: list[str] = []
+            self.checked += _typo_tally(prose, words, project, unknown)
+            self.unknown += len(unknown)
+            self.unknown_head.extend(unknown[:_TYPO_EVIDENCE_LIMIT - len(self.unknown_head)])
+
+    def analysis(
+        self,
+        threshold: float | None,
+        weights: Weights | None,
+        referent: float,
+        words: Container[str] | None,
+    ) -> Analysis:
+        if not self.words:
+            return Analysis(0.0, [], 0, 0, {}, structure=self.structure)
+        sentence_count = self.sentences + self.open
+        signals, strengths, evidence = _signals(
+            self.words, sentence_count, self.head.rstrip(), self.counts, referent
+        )
+        score = sum(_WEIGHTS.get(s, 0.0) * strengths.get(s, 1.0) for s in signals)
+
+        def typos() -> tuple[float, list[str]] | None:
+            if words is None or self.checked < _TYPO_MIN_WORDS:
+                return None
+            return self.unknown / self.checked, self.unknown_head
+
+        score, vector, tier = _conclude(
+            score, signals, strengths, evidence, self.words, sentence_count, threshold,
+            weights, typos,
+        )
+        return Analysis(
+            min(1.0, max(0.0, score)), signals, self.words, sentence_count, evidence, False,
+            vector, self.structure, tier,
+        )
+
+
+def _line_decided(line: str, in_fence: bool) -> bool:
+    """Whether what _line_kind makes of line is settled, however it goes on.
+    A pattern that matches a line's start keeps matching as it grows, apart
+    from the stack-frame one, which is anchored at the end of the line."""
+    if _FENCE.match(line):
+        return True
+    rest = line.lstrip(" \t")
+    if len(rest) < 3:
+        return False  # may still become a fence
+    if in_fence or _INDENTED.match(line):
+        return True
+    if line.startswith(("    ", "\t")):
+        return False
+    if rest.startswith('File "'):
+        return _LOG_LINE.match(line) is not None  # a frame, however it goes on
+    if rest.startswith("at "):
+        # Only the stack-frame pattern can match, and it needs "(" right
+        # after the frame's name and one optional space. Any other character
+        # there rules it out; from the "(" on, only the line's end decides.
+        head = _FRAME_HEAD.match(rest)
+        if head is None:
+            return len(rest) > 3
+        return head.end() < len(rest) and rest[head.end()] != "("
+    match = _LOG_LINE.match(line)
+    if match:
+        return match.end() < len(line)  # a level name's \b needs the next character
+    return len(rest) >= _LOG_PREFIX and _FIRST_RUN_ENDED.match(rest) is not None
+
+
+def _signals(
+    word_count: int,
+    sentence_count: int,
+    first_sentence: str,
+    counts: dict[str, int],
+    referent: float = 0.0,
+) -> tuple[list[str], dict[str, float], dict[str, object]]:
+    """Run-on, filler-words and missing-subject from the totals read so far."""
     signals: list[str] = []
+    strengths: dict[str, float] = {}
+    evidence: dict[str, object] = {}
 
     # Signal: run-on (many words, few sentences)
-    sentences = [s.strip() for s in re.split(r"[.!?]+", text) if s.strip()]
-    words = text.split()
-    sentence_count = max(len(sentences), 1)
-    words_per_sentence = len(words) / sentence_count
-    if words_per_sentence > 20:
+    words_per_sentence = word_count / max(sentence_count, 1)
+    if words_per_sentence > _RUN_ON_WORDS_PER_SENTENCE:
         signals.append("run-on")
+        evidence["run-on"] = round(words_per_sentence, 2)
 
-    # Signal: filler-words
-    text_lower = text.lower()
-    if any(filler in text_lower for filler in _FILLERS):
+    # Signal: filler-words, weighted by density rather than presence
+    if counts:
+        density = sum(counts.values()) / word_count
         signals.append("filler-words")
+        strengths["filler-words"] = min(1.0, density / _FILLER_SATURATION_DENSITY)
+        evidence["filler-words"] = {"counts": dict(counts), "density": round(density, 4)}
 
     # Signal: missing-subject (first sentence starts with imperative verb)
-    first_sentence = sentences[0] if sentences else ""
-    if _IMPERATIVE_PATTERN.match(first_sentence.strip()):
+    match = _IMPERATIVE_PATTERN.match(first_sentence)
+    if match:
         signals.append("missing-subject")
+        evidence["missing-subject"] = match.group(1).lower()
+        if referent > 0.0:
+            strengths["missing-subject"] = 1.0 - _REFERENT_RELIEF * min(1.0, referent)
 
-    return signals
+    return signals, strengths, evidence
 
 
-def score_message(text: str) -> float:
-    """Score a message for ambiguity. Returns float 0.0-1.0."""
-    if not text.strip():
-        return 0.0
+_INLINE_KINDS = {"code": "inline_code", "url": "urls", "path": "paths"}
+
+
+def _prose(segment: str, structure: dict[str, int]) -> str:
+    """segment without its code, log lines, URLs and paths, counting what was
+    taken out into structure. One pass over the lines, one over the rest."""
+    kept: list[str] = []
+    in_fence = False
+    for line in segment.split("\n"):
+        kind = _line_kind(line, in_fence)
+        if kind == "prose":
+            kept.append(line)
+        elif kind == "fence":
+            if not in_fence:
+                structure["code_blocks"] = structure.get("code_blocks", 0) + 1
+            in_fence = not in_fence
+        else:
+            structure[kind] = structure.get(kind, 0) + 1
+    return _inline("\n".join(kept), structure)
+
+
+def _line_kind(line: str, in_fence: bool) -> str:
+    """"fence", "code_lines", "log_lines" or "prose": what the pre-pass
+    makes of line."""
+    if _FENCE.match(line):
+        return "fence"
+    if in_fence or _INDENTED.match(line):
+        return "code_lines"
+    if _LOG_LINE.match(line):
+        return "log_lines"
+    return "prose"
+
+
+def _inline(prose: str, structure: dict[str, int]) -> str:
+    """prose with inline code, URLs and paths blanked out and counted."""
+    if "`" not in prose and "/" not in prose and not _FILE_EXTENSION.search(prose):
+        return prose
+
+    def count(match: re.Match[str]) -> str:
+        kind = _INLINE_KINDS[match.lastgroup or "code"]
+        structure[kind] = structure.get(kind, 0) + 1
+        return " "
+
+    return _INLINE_STRUCTURE.sub(count, prose)
+
+
+def _segments(text: str) -> list[str]:
+    """The parts of text to inspect: all of it, or a bounded sample.
+
+    Windows start at the next line, or failing that the next word, so no
+    partial line or word is miscounted, and end at a word boundary.
+    """
+    if len(text) <= _INSPECT_LIMIT:
+        return [text]
+    head = _INSPECT_LIMIT // 2
+    window = (_INSPECT_LIMIT - head) // _SAMPLE_WINDOWS
+    stride = (len(text) - head) // _SAMPLE_WINDOWS
+    segments = [_trim_words(text[:head], keep_start=True)]
+    for i in range(_SAMPLE_WINDOWS):
+        start = head + i * stride
+        segments.append(_trim_words(text[start:start + window], keep_start=False))
+    return segments
+
+
+def _trim_words(segment: str, keep_start: bool) -> str:
+    start = 0 if keep_start else (segment.find("\n") + 1 or segment.find(" ") + 1)
+    end = segment.rfind(" ")
+    return segment[start:end] if end > start else segment[start:]
 
-    signals = detect_signals(text)
 
-    # Weighted signal contributions
-    weights: dict[str, float] = {
-        "run-on": 0.35,
-        "filler-words": 0.35,
-        "missing-subject": 0.30,
-    }
+def _typo_can_matter(score: float, with_typos: float, threshold: float | None) -> bool:
+    """Whether typo-density could move score, up to with_typos at full
+    strength, at all or across threshold."""
+    if score >= 1.0:
+        return False
+    if threshold is None:
+        return True
+    return min(score, with_typos) < threshold <= max(score, with_typos)
 
-    score = sum(weights.get(s, 0.0) for s in signals)
-    return min(1.0, max(0.0, score))
+
+def _typo_density(
+    segments: list[_Segment], deadline: float = float("inf"), vocabulary: str | None = None
+) -> tuple[float, list[str]] | None:
+    """Return (unknown words / checked words, unknown words), or None if the
+    dictionary is unavailable or there are too few words to judge.
+
+    Words in neither the English set nor the vocabulary word set are unknown.
+    Stops at the deadline and judges the words checked by then.
+    """
+    from dictionary import cached, english
+
+    words = english()
+    if words is None:
+        return None
+    project = cached(vocabulary) if vocabulary else None
+    checked = 0
+    unknown: list[str] = []
+    for segment in segments:
+        if checked and time.monotonic() > deadline:
+            break
+        checked += segment.typos(words, project, unknown)
+    if checked < _TYPO_MIN_WORDS:
+        return None
+    return len(unknown) / checked, unknown
+
+
+def _typo_tally(
+    segment: str, words: Container[str], project: Container[str] | None, unknown: list[str]
+) -> int:
+    """Check segment's prose words, appending unknown ones to unknown.
+    Returns how many were checked."""
+    checked = 0
+    for match in _DICTIONARY_TOKEN.finditer(segment):
+        token = match.group()
+        if len(token) > 1 and not token[1:].islower():
+            continue  # acronyms and camelCase identifiers
+        checked += 1
+        if token not in words and (project is None or token not in project):
+            unknown.append(token)
+    return checked
+
+
+def count_fillers(text: str) -> dict[str, int]:
+    """Return occurrences of each filler in text, found in one linear scan."""
+    counts: dict[str, int] = {}
+    for match in _FILLER_PATTERN.finditer(text):
+        filler = " ".join(match.group().lower().split())
+        counts[filler] = counts.get(filler, 0) + 1
+    return counts
+
+
+def signal_weights() -> dict[str, float]:
+    """The fixed weight of each signal in the default score."""
+    return dict(_WEIGHTS)
+
+
+def detect_signals(text: str) -> list[str]:
+    """Return list of ambiguity signal names present in text."""
+    return analyze(text).signals
+
+
+def score_message(text: str) -> float:
+    """Score a message for ambiguity. Returns float 0.0-1.0."""
+    return analyze(text).score
@@ -0,0 +1,221 @@
+"""Optional long-lived scorer server for the UserPromptSubmit hook.
+
+Keeps scorer imported and its patterns compiled in one warm process so each
+hook invocation only has to open a unix socket, send the message and read
+the result back. Enabled with HUMAN_SPEAK_DAEMON=1; the hook falls back to
+in-process scoring whenever the daemon is unreachable.
+
+Protocol: one JSON line per connection in each direction.
+  request:  {"text": "...", "threshold": 0.4, "weights": "...", "referent": 0.5,
+             "vocabulary": "/path/words.u32"}   (all but text optional)
+  response: {"score": 0.7, "signals": ["run-on", ...]}
+
+The socket lives in the per-user state root (see state.py), which is a
+0700 directory owned by this user, so no one else can bind it first. The
+client also refuses a socket owned by anyone else, which covers a socket
+moved with HUMAN_SPEAK_SOCKET.
+
+Run directly to serve in the foreground:
+  python3 hooks/scorer_daemon.py [--socket PATH] [--idle SECONDS]
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # keep typing off the hook's import path
+    from typing import Any
+
+IDLE_TIMEOUT = 1800.0
+CLIENT_TIMEOUT = 0.25
+MAX_REQUEST_BYTES = 8 * 1024 * 1024
+
+
+def daemon_enabled() -> bool:
+    return os.environ.get("HUMAN_SPEAK_DAEMON") == "1"
+
+
+def socket_path() -> Path:
+    override = os.environ.get("HUMAN_SPEAK_SOCKET")
+    if override:
+        return Path(override)
+    from state import state_root
+
+    return Path(state_root()) / "scorer.sock"
+
+
+def _owned(path: Path) -> bool:
+    """Whether path is a socket owned by this user (see the module docstring)."""
+    import stat
+
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode):
+        return False
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def _idle_timeout() -> float:
+    try:
+        return float(os.environ.get("HUMAN_SPEAK_DAEMON_IDLE", IDLE_TIMEOUT))
+    except ValueError:
+        return IDLE_TIMEOUT
+
+
+def request(text: str, path: Path | None = None,
+            timeout: float = CLIENT_TIMEOUT,
+            threshold: float | None = None,
+            weights: str | None = None,
+            referent: float = 0.0,
+            vocabulary: str | None = None) -> dict[str, Any] | None:
+    """Score text via the daemon. Returns None if it cannot be reached.
+
+    weights is a serialized scorer.Weights model, as in HUMAN_SPEAK_WEIGHTS;
+    referent and vocabulary are passed through to scorer.analyze.
+    """
+    import socket
+
+    target = path or socket_path()
+    if not _owned(target):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(target))
+            message: dict[str, Any] = {"text": text}
+            if threshold is not None:
+                message["threshold"] = threshold
+            if weights:
+                message["weights"] = weights
+            if referent:
+                message["referent"] = referent
+            if vocabulary:
+                message["vocabulary"] = vocabulary
+            sock.sendall(json.dumps(message).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        reply = json.loads(b"".join(chunks))
+    except (OSError, AttributeError, ValueError):
+        return None
+    if not isinstance(reply, dict) or "score" not in reply:
+        return None
+    return reply
+
+
+def spawn(path: Path | None = None) -> None:
+    """Start a detached daemon process. Never raises."""
+    import subprocess
+
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()),
+             "--socket", str(path or socket_path())],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def serve(path: Path | None = None, idle_timeout: float | None = None) -> None:
+    """Serve scoring requests until idle for idle_timeout seconds."""
+    import socketserver
+    import time
+
+    sys.path.insert(0, str(Path(__file__).parent))
+    from scorer import Weights, analyze
+    from state import ensure_dir
+
+    target = path or socket_path()
+    idle = _idle_timeout() if idle_timeout is None else idle_timeout
+
+    try:
+        ensure_dir(str(target.parent))
+        if os.path.lexists(target):
+            if not _owned(target):
+                return  # not ours to replace
+            if request("", target) is not None:
+                return  # another daemon already owns the socket
+            target.unlink()
+    except OSError:
+        return
+
+    class Handler(socketserver.StreamRequestHandler):
+        timeout = 1.0
+
+        def handle(self) -> None:
+            reply: dict[str, Any]
+            try:
+                payload = json.loads(self.rfile.readline(MAX_REQUEST_BYTES))
+                threshold = payload.get("threshold")
+                analysis = analyze(
+                    str(payload.get("text", "")),
+                    None if threshold is None else float(threshold),
+                    weights=Weights.parse(payload.get("weights")),
+                    referent=float(payload.get("referent", 0.0)),
+                    vocabulary=payload.get("vocabulary") or None,
+                )
+                reply = {
+                    "score": round(analysis.score, 4),
+                    "signals": analysis.signals,
+                    "tier": analysis.tier,
+                    "features": [round(v, 4) for v in analysis.features],
+                }
+            except (ValueError, TypeError, AttributeError):
+                reply = {"error": "bad request"}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        timed_out = False
+
+        def handle_timeout(self) -> None:
+            self.timed_out = True
+
+    try:
+        server = Server(str(target), Handler)
+    except OSError:
+        return  # lost a startup race to another daemon
+    os.chmod(target, 0o600)
+    server.timeout = min(1.0, idle)
+    last_activity = time.monotonic()
+    try:
+        while time.monotonic() - last_activity < idle:
+            server.timed_out = False
+            server.handle_request()
+            if not server.timed_out:
+                last_activity = time.monotonic()
+    finally:
+        server.server_close()
+        try:
+            target.unlink()
+        except OSError:
+            pass
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="human-speak scorer daemon")
+    parser.add_argument("--socket", type=Path, default=None)
+    parser.add_argument("--idle", type=float, default=None,
+                        help="exit after this many idle seconds")
+    args = parser.parse_args(argv)
+    serve(args.socket, args.idle)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,194 @@
-"""SessionEnd hook: persists confirmed intent patterns to user profile."""
+"""SessionEnd hook: persists confirmed intent patterns to user profile.
+
+Changes are appended to the profile store (see profile_store.py) and the
+markdown profile is re-rendered from it. The session's flag statistics and
+confirmation outcomes are folded into the calibration counters, which may
+nudge the ambiguity threshold (see calibration.py). Answered flags also
+become labelled examples, along with a few messages the session let
+through, and once there are enough the per-user scorer weights and their
+own threshold are retrained (see trainer.py). Examples use the features the
+UserPromptSubmit hook logged for the message; only an answer with no
+logged line is scored again here.
+
+A session scored by learned weights leaves the calibration counters alone:
+those track the fixed score, and the model's threshold is refit with it.
+
+The profile's compiled cache (see profile_cache.py) is rebuilt right after,
+so the next session start can use it as is.
+
+Confirmed pairs are the lines hooks/confirm.py appended as the user answered
+flags; a single JSON array, as older sessions wrote, is read as well. A
+confirmed phrase the hook applied straight from the intent index (a stats
+line with "hit") counts as one more hit for that mapping.
+
+Only this session's state files are read and removed (see state.py), and the
+profile update runs under the store lock so concurrent sessions ending at
+the same time never drop each other's records.
+"""
 from __future__ import annotations
 
 import json
 import os
 import sys
-from datetime import date
-from pathlib import Path
-from typing import Dict, List, Optional
 
-CONFIRMED_FILE = Path("/tmp/human-speak-confirmed.json")
-FLAG_FILE = Path("/tmp/human-speak-flag.json")
-MAX_MAPPINGS = 20
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Add hooks directory to path for profile_store import
+sys.path.insert(0, HOOKS_DIR)
+
+
+def _read_text(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def _session_stats(path: str) -> list[dict[str, object]]:
+    lines: list[dict[str, object]] = []
+    for line in _read_text(path).splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict):
+            lines.append(entry)
+    return lines
+
+
+def _update_profile(pairs: list[dict[str, object]], scored: list[dict[str, object]]) -> None:
+    from datetime import date
+
+    import trainer
+    from calibration import CalibrationStats, message_key, recalibrate
+    from profile_cache import compile_profile
+    from profile_store import ProfileLock, default_profile_path, open_for_update, write_view
+    from scorer import FEATURES, analyze
+
+    profile_path = default_profile_path()
+    with ProfileLock(profile_path):
+        store, state = open_for_update(profile_path)
+
+        model = any(entry.get("model") for entry in scored)
+        stats = CalibrationStats.from_record(state.stats)
+        logged: dict[object, list[float]] = {}
+        unflagged: list[tuple[object, list[float]]] = []
+        if not model:
+            stats.decay()
+        for entry in scored:
+            score = entry.get("score")
+            # A tier-0 bound only caps the score, and would fill the
+            # histogram buckets recalibrate reads with scores never given
+            if isinstance(score, (int, float)) and not model and not entry.get("bound"):
+                stats.observe(float(score), bool(entry.get("flagged")))
+            features = entry.get("features")
+            if (
+                isinstance(features, list)
+                and len(features) == len(FEATURES)
+                and all(isinstance(v, (int, float)) for v in features)
+            ):
+                logged[entry.get("key")] = features
+                if not entry.get("flagged") and not entry.get("borderline"):
+                    unflagged.append((entry.get("key"), features))
+        mappings: list[dict[str, object]] = []
+        for entry in scored:
+            # A phrase the hook applied from the index is used again: one more hit
+            phrase = entry.get("hit")
+            if isinstance(phrase, str) and phrase in state.mappings:
+                mappings.append({
+                    "kind": "mapping",
+                    "original": phrase,
+                    "interpreted": state.mappings[phrase],
+                    "seen": date.today().isoformat(),
+                })
+        labelled: list[tuple[list[float], int]] = []
+        answered: set[object] = set()
+        vocabulary = os.environ.get("HUMAN_SPEAK_VOCAB")
+        for pair in pairs:
+            dismissed = pair.get("outcome") == "dismissed"
+            if not model:
+                stats.observe_outcome(dismissed)
+            original = pair.get("original", "")
+            interpreted = pair.get("interpreted", "")
+            if isinstance(original, str) and original:
+                key = message_key(original)
+                answered.add(key)
+                features = logged.get(key) or analyze(original, vocabulary=vocabulary).features
+                labelled.append((features, 0 if dismissed else 1))
+            if original and interpreted and not dismissed:
+                mappings.append({
+                    "kind": "mapping",
+                    "original": original,
+                    "interpreted": interpreted,
+                    "seen": date.today().isoformat(),
+                })
+
+        records: list[dict[str, object]] = [{
+            "kind": "calibration",
+            "threshold": state.threshold if model else recalibrate(state.threshold, stats),
+            "updated": date.today().isoformat(),
+        }, stats.to_record()]
+        records.extend(mappings)
+        labelled.extend(trainer.sample_negatives(
+            [features for key, features in unflagged if key not in answered]))
+        records.extend({
+            "kind": "example",
+            "features": [round(v, 4) for v in features],
+            "label": label,
+        } for features, label in labelled)
+        for record in records:
+            state.apply(record)
+        if labelled and trainer.ready(state.examples):
+            weights = trainer.train(state.examples)
+            records.append({
+                "kind": "weights",
+                "coefficients": [round(v, 6) for v in weights.coefficients],
+                "bias": round(weights.bias, 6),
+                "threshold": trainer.pick_threshold(weights, state.examples),
+            })
+            state.apply(records[-1])
+
+        store.append(records)
+        if store.needs_compaction(state):
+            store.compact(state)
+        write_view(profile_path, state)
+        compile_profile(profile_path)
 
 
-def _get_profile_path() -> Path:
-    override = os.environ.get("HUMAN_SPEAK_PROFILE_PATH")
-    if override:
-        return Path(override)
-    plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", str(Path(__file__).parent.parent))
-    return Path(plugin_root) / "memory" / "user-speak-profile.md"
+def main() -> None:
+    from metrics import recorder
 
+    metrics = recorder("session-end")
+    try:
+        from state import cleanup, path_for
 
-def _get_template_path() -> Path:
-    plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", str(Path(__file__).parent.parent))
-    return Path(plugin_root) / "memory" / "user-speak-profile.template.md"
+        try:
+            session_id = json.loads(sys.stdin.read() or "{}").get("session_id")
+        except (ValueError, AttributeError):
+            session_id = None
 
+        # Read confirmed pairs (may not exist)
+        pairs: list[dict[str, object]] = []
+        confirmed_file = path_for("confirmed", session_id)
+        if os.path.exists(confirmed_file):
+            from confirm import read_pairs
 
-def _initialize_profile() -> str:
-    template = _get_template_path()
-    if template.exists():
-        return template.read_text()
-    return (
-        "# User Speak Profile\n\n"
-        "## Calibration\n"
-        "Ambiguity threshold: 0.40\n"
-        f"Last updated: {date.today().isoformat()}\n\n"
-        "## Confirmed Intent Mappings\n"
-    )
+            pairs = read_pairs(_read_text(confirmed_file))
+        stats_file = path_for("stats", session_id)
+        scored = _session_stats(stats_file) if os.path.exists(stats_file) else []
+        metrics.mark("read")
 
+        if pairs or scored:
+            _update_profile(pairs, scored)
+            metrics.mark("profile")
 
-def main() -> None:
-    try:
-        # Read confirmed pairs (may not exist)
-        pairs: List[Dict[str, object]] = []
-        if CONFIRMED_FILE.exists():
-            try:
-                pairs = json.loads(CONFIRMED_FILE.read_text())
-            except (json.JSONDecodeError, ValueError):
-                pairs = []
-
-        if pairs:
-            profile_path = _get_profile_path()
-
-            if profile_path.exists():
-                content = profile_path.read_text()
-            else:
-                content = _initialize_profile()
-
-            # Update date
-            today = date.today().isoformat()
-            if "Last updated:" in content:
-                lines = content.splitlines()
-                content = "\n".join(
-                    f"Last updated: {today}" if line.startswith("Last updated:") else line
-                    for line in lines
-                )
-
-            # Append new mappings under Confirmed Intent Mappings section
-            new_lines = []
-            for pair in pairs:
-                original = pair.get("original", "")
-                interpreted = pair.get("interpreted", "")
-                if original and interpreted:
-                    new_lines.append(f'- "{original}" -> interpreted as: "{interpreted}"')
-
-            if new_lines:
-                if "## Confirmed Intent Mappings" in content:
-                    content = content + "\n" + "\n".join(new_lines)
-                else:
-                    content = content + "\n## Confirmed Intent Mappings\n" + "\n".join(new_lines)
-
-            # Enforce max mappings: keep last MAX_MAPPINGS entries
-            mapping_lines = [ln for ln in content.splitlines() if ln.startswith('- "')]
-            if len(mapping_lines) > MAX_MAPPINGS:
-                excess = len(mapping_lines) - MAX_MAPPINGS
-                for old_line in mapping_lines[:excess]:
-                    content = content.replace(old_line + "\n", "")
-
-            profile_path.parent.mkdir(parents=True, exist_ok=True)
-            profile_path.write_text(content)
-
-        # Clean up temp files
-        for f in [CONFIRMED_FILE, FLAG_FILE]:
-            if f.exists():
-                f.unlink()
-
-    except Exception:
+        # Clean up this session's temp files
+        cleanup(session_id)
+        metrics.mark("cleanup")
+
+    except Exception as exc:
         # Never crash on session end
-        pass
+        metrics.fail(exc)
+    finally:
+        metrics.finish()
 
 
 if __name__ == "__main__":
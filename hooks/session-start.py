@@ -1,53 +1,131 @@
-"""SessionStart hook: loads user speak profile and exports threshold."""
+"""SessionStart hook: loads user speak profile and exports threshold.
+
+The profile is read through its compiled cache (see profile_cache.py), which
+is only rebuilt when the profile changed since it was last compiled. The
+cache also points at the confirmed-intent lookup index (see intent_index.py),
+exported as HUMAN_SPEAK_INDEX for the UserPromptSubmit hook, and the
+learned scorer weights, exported as HUMAN_SPEAK_WEIGHTS; with weights the
+exported threshold is the one the trainer picked for them. The hook also
+exports this session's flag and confirmed-pairs paths (see state.py) as
+HUMAN_SPEAK_FLAG_FILE and HUMAN_SPEAK_CONFIRMED_FILE for the skill.
+
+The working project's identifiers are indexed incrementally (see
+project_vocab.py) and the index exported as HUMAN_SPEAK_VOCAB.
+"""
 from __future__ import annotations
 
 import os
-import re
 import sys
-from pathlib import Path
 
+HOOKS_DIR = os.path.dirname(os.path.abspath(__file__))
 DEFAULT_THRESHOLD = 0.40
-THRESHOLD_PATTERN = re.compile(r"Ambiguity threshold:\s*([\d.]+)")
-
 
-def _find_profile() -> Path:
-    plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", str(Path(__file__).parent.parent))
-    return Path(plugin_root) / "memory" / "user-speak-profile.md"
 
+def _find_profile() -> str:
+    override = os.environ.get("HUMAN_SPEAK_PROFILE_PATH")
+    if override:
+        return override
+    plugin_root = os.environ.get("CLAUDE_PLUGIN_ROOT", os.path.dirname(HOOKS_DIR))
+    return os.path.join(plugin_root, "memory", "user-speak-profile.md")
 
-def _parse_threshold(content: str) -> float:
-    match = THRESHOLD_PATTERN.search(content)
-    if match:
-        return float(match.group(1))
-    raise ValueError("Threshold not found in profile")
 
-
-def _export_threshold(value: float) -> None:
+def _export(name: str, value: str) -> None:
     env_file = os.environ.get("CLAUDE_ENV_FILE")
-    line = f"HUMAN_SPEAK_THRESHOLD={value:.2f}\n"
     if env_file:
         with open(env_file, "a") as f:
-            f.write(line)
+            f.write(f"{name}={value}\n")
     else:
-        os.environ["HUMAN_SPEAK_THRESHOLD"] = f"{value:.2f}"
+        os.environ[name] = value
+
+
+def _export_threshold(value: float) -> None:
+    _export("HUMAN_SPEAK_THRESHOLD", f"{value:.2f}")
+
+
+def _profile_cache(profile: str) -> dict[str, object]:
+    sys.path.insert(0, HOOKS_DIR)
+    import profile_cache
+
+    return profile_cache.load(profile) or profile_cache.compile_profile(profile)
+
+
+def _export_session_files(session_id: object) -> None:
+    sys.path.insert(0, HOOKS_DIR)
+    from state import path_for
+
+    _export("HUMAN_SPEAK_FLAG_FILE", path_for("flag", session_id))
+    _export("HUMAN_SPEAK_CONFIRMED_FILE", path_for("confirmed", session_id))
+
+
+def _export_vocabulary(payload: dict[str, object]) -> None:
+    sys.path.insert(0, HOOKS_DIR)
+    import project_vocab
+
+    if not project_vocab.enabled():
+        return
+    root = project_vocab.project_root(payload)
+    if root is not None:
+        path, _ = project_vocab.update(root)
+        _export("HUMAN_SPEAK_VOCAB", path)
+
+
+def _warm_daemon() -> None:
+    # Same check as scorer_daemon.daemon_enabled(), without importing it
+    if os.environ.get("HUMAN_SPEAK_DAEMON") != "1":
+        return
+    sys.path.insert(0, HOOKS_DIR)
+    from scorer_daemon import request, spawn
+
+    if request("") is None:
+        spawn()
 
 
 def main() -> None:
+    sys.path.insert(0, HOOKS_DIR)
+    from metrics import recorder
+
+    metrics = recorder("session-start")
     try:
+        import json
+
+        try:
+            payload = json.loads(sys.stdin.read() or "{}")
+            session_id = payload.get("session_id")
+        except (ValueError, AttributeError):
+            payload, session_id = {}, None
+        metrics.mark("read")
+
         profile = _find_profile()
-        if profile.exists():
-            content = profile.read_text()
-            try:
-                threshold = _parse_threshold(content)
-            except (ValueError, AttributeError):
-                print("human-speak: malformed profile, using default threshold", file=sys.stderr)
-                threshold = DEFAULT_THRESHOLD
-        else:
-            threshold = DEFAULT_THRESHOLD
-        _export_threshold(threshold)
-    except Exception:
+        try:
+            cache = _profile_cache(profile)
+        except Exception as exc:
+            metrics.fail(exc)
+            print("human-speak: could not load profile, using default threshold", file=sys.stderr)
+            cache = {}
+        metrics.mark("profile")
+        if cache.get("malformed"):
+            print("human-speak: malformed profile, using default threshold", file=sys.stderr)
+        threshold = cache.get("threshold")
+        if cache.get("weights") and isinstance(cache.get("model_threshold"), (int, float)):
+            threshold = cache["model_threshold"]
+        _export_threshold(float(threshold) if isinstance(threshold, (int, float)) else DEFAULT_THRESHOLD)
+        _export_session_files(session_id)
+        if cache.get("index"):
+            _export("HUMAN_SPEAK_INDEX", str(cache["index"]))
+        if cache.get("weights"):
+            _export("HUMAN_SPEAK_WEIGHTS", str(cache["weights"]))
+        metrics.mark("export")
+        try:
+            _export_vocabulary(payload)
+        except Exception as exc:
+            metrics.fail(exc)
+        metrics.mark("vocab")
+        _warm_daemon()
+    except Exception as exc:
         # Never crash the session
-        pass
+        metrics.fail(exc)
+    finally:
+        metrics.finish()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+"""Rolling per-session context for resolving "fix it" / "do it".
+
+missing-subject fires on a message that opens with a bare imperative. Right
+after "the login test in auth_test.py fails", "fix it" has an obvious target,
+and asking the user to confirm it is a wasted round trip. UserPromptSubmit
+therefore keeps the likely referents of the last MAX_TURNS messages -- file
+paths, inline code, identifiers and nouns after a determiner -- in the
+session's context.json:
+
+  {"version": 1, "turns": [["auth_test.py", "login"], [], ["parse_args"]]}
+
+Each message costs one small read and one atomic write: its terms are pushed
+onto a bounded deque and the oldest turn falls off. Only the head of a long
+message is scanned for terms.
+
+referent() is the resolver: 1.0 when the previous message named something,
+halving with every turn since, 0.0 when nothing recent did. The scorer lowers
+the missing-subject strength in proportion (see scorer.analyze).
+"""
+from __future__ import annotations
+
+import json
+import re
+from collections import deque
+
+CONTEXT_VERSION = 1
+MAX_TURNS = 5
+MAX_TERMS = 8
+# Terms are taken from this many leading characters of a message
+_SCAN_LIMIT = 4096
+
+# The path alternatives only start where a run of path characters starts, as
+# in scorer._INLINE_STRUCTURE: starting again inside a long run that turns
+# out not to be a path re-reads the whole run each time.
+_TERM = re.compile(
+    r"`(?P<code>[^`\n]{1,80})`"
+    r"|(?P<path>(?:(?<![\w/])~|(?<![\w./-])\.{0,2})/?(?:[\w.-]+/)+[\w.-]*\w"
+    r"|(?<![\w-])-*\w[\w-]*\.[a-z]{1,5}\b)"
+    r"|(?P<identifier>\b[A-Za-z_]\w*(?:_\w+|[a-z][A-Z]\w*|\(\)))"
+    r"|\b(?i:the|this|that|these|those|my|our|your)\s+(?P<noun>[a-z][a-z-]{2,})\b"
+)
+# Nouns that do not pin anything down on their own
+_VAGUE = frozenset({
+    "thing", "things", "stuff", "one", "ones", "other", "others", "same", "way",
+    "rest", "issue", "problem", "part", "bit", "end", "first", "last", "next",
+})
+
+
+def terms(text: str) -> list[str]:
+    """Likely referents named in text, first mention first, at most MAX_TERMS."""
+    found: list[str] = []
+    for match in _TERM.finditer(text[:_SCAN_LIMIT]):
+        term = match.group(match.lastgroup or "code")
+        if match.lastgroup == "noun" and term.lower() in _VAGUE:
+            continue
+        if term not in found:
+            found.append(term)
+            if len(found) == MAX_TERMS:
+                break
+    return found
+
+
+class SessionContext:
+    """The last MAX_TURNS messages' terms, newest last."""
+
+    __slots__ = ("turns",)
+
+    def __init__(self, turns: list[list[str]] | None = None) -> None:
+        self.turns: deque[list[str]] = deque(turns or (), maxlen=MAX_TURNS)
+
+    def push(self, text: str) -> None:
+        self.turns.append(terms(text))
+
+    def referent(self) -> float:
+        """How likely an unstated target refers to something recent, 0.0-1.0."""
+        for age, turn in enumerate(reversed(self.turns)):
+            if turn:
+                return 0.5 ** age
+        return 0.0
+
+    def recent(self) -> list[str]:
+        """Terms of the most recent turn that named any."""
+        for turn in reversed(self.turns):
+            if turn:
+                return turn
+        return []
+
+    def dumps(self) -> str:
+        return json.dumps({"version": CONTEXT_VERSION, "turns": list(self.turns)})
+
+
+def load(path: str) -> SessionContext:
+    """The saved context, or an empty one if it is missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return SessionContext()
+    if not isinstance(data, dict) or data.get("version") != CONTEXT_VERSION:
+        return SessionContext()
+    turns = data.get("turns")
+    if not isinstance(turns, list):
+        return SessionContext()
+    return SessionContext([
+        [str(t) for t in turn][:MAX_TERMS] for turn in turns[-MAX_TURNS:] if isinstance(turn, list)
+    ])
@@ -0,0 +1,161 @@
+"""Per-session state files shared by the hooks.
+
+Each session keeps its flag, confirmed pairs and stats log in its own
+directory, keyed by the session_id from the hook payload:
+
+  /tmp/human-speak-<uid>/<session_id>/flag.json
+  /tmp/human-speak-<uid>/<session_id>/flag.previous.json
+  /tmp/human-speak-<uid>/<session_id>/confirmed.json
+  /tmp/human-speak-<uid>/<session_id>/stats.jsonl
+  /tmp/human-speak-<uid>/<session_id>/context.json
+
+so concurrent sessions never see or delete each other's files. The root can
+be moved with HUMAN_SPEAK_STATE_DIR. Payloads without a session_id fall back
+to the original global /tmp/human-speak-*.json paths.
+
+Whole files are replaced atomically (temp file + rename) and log lines are
+appended with a single O_APPEND write, so readers never see a torn file.
+
+/tmp is shared with every other user, who could create the state root first
+or plant a symlink where a file is about to be written. So every directory
+from the root down must be a real directory owned by this user, or the
+write fails with PermissionError, and is closed to everyone else (mode
+0700) before it is used. Files are never opened through a symlink, and
+temp files are created exclusively.
+"""
+from __future__ import annotations
+
+import os
+import stat
+
+LEGACY_PATHS = {
+    "flag": "/tmp/human-speak-flag.json",
+    "previous-flag": "/tmp/human-speak-flag.previous.json",
+    "confirmed": "/tmp/human-speak-confirmed.json",
+    "stats": "/tmp/human-speak-stats.jsonl",
+    "context": "/tmp/human-speak-context.json",
+}
+FILE_NAMES = {
+    "flag": "flag.json",
+    "previous-flag": "flag.previous.json",
+    "confirmed": "confirmed.json",
+    "stats": "stats.jsonl",
+    "context": "context.json",
+}
+
+
+def state_root() -> str:
+    override = os.environ.get("HUMAN_SPEAK_STATE_DIR")
+    if override:
+        return override
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return f"/tmp/human-speak-{uid}"
+
+
+def _safe_id(session_id: object) -> str:
+    if not isinstance(session_id, str):
+        return ""
+    return "".join(c for c in session_id if c.isalnum() or c in "-_")[:128]
+
+
+def session_dir(session_id: object) -> str | None:
+    """Directory holding this session's files, or None without a session id."""
+    safe = _safe_id(session_id)
+    return os.path.join(state_root(), safe) if safe else None
+
+
+def path_for(name: str, session_id: object) -> str:
+    """Path of the named state file (a FILE_NAMES key)."""
+    directory = session_dir(session_id)
+    if directory is None:
+        return LEGACY_PATHS[name]
+    return os.path.join(directory, FILE_NAMES[name])
+
+
+_NOFOLLOW = getattr(os, "O_NOFOLLOW", 0)
+
+
+def _private(directory: str) -> None:
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    foreign = hasattr(os, "getuid") and st.st_uid != os.getuid()
+    if not stat.S_ISDIR(st.st_mode) or foreign:
+        raise PermissionError(f"{directory} is not a directory owned by this user")
+    if st.st_mode & 0o077:
+        # Ours, but opened up (older versions let makedirs apply the umask)
+        os.chmod(directory, 0o700)
+
+
+def ensure_dir(directory: str) -> None:
+    """Create directory if needed, checking every level inside the state root
+    (see the module docstring). Directories elsewhere are only created."""
+    root = state_root()
+    rel = os.path.relpath(directory, root)
+    if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        return
+    parent = os.path.dirname(root)
+    if parent and not os.path.isdir(parent):
+        os.makedirs(parent, exist_ok=True)
+    _private(root)
+    if rel != os.curdir:
+        for part in rel.split(os.sep):
+            root = os.path.join(root, part)
+            _private(root)
+
+
+def previous_flag_path(flag_path: str) -> str:
+    """Where the flag before the one at flag_path is kept until it is
+    answered: a reply that is flagged in turn replaces flag.json."""
+    root, ext = os.path.splitext(flag_path)
+    return root + ".previous" + ext
+
+
+def _ensure_parent(path: str) -> None:
+    parent = os.path.dirname(path)
+    if parent:
+        ensure_dir(parent)
+
+
+def write_atomic(path: str, data: str) -> None:
+    _ensure_parent(path)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | _NOFOLLOW
+    try:
+        fd = os.open(tmp, flags, 0o600)
+    except FileExistsError:
+        # Left behind by a crashed run with our pid; unlink drops a symlink too
+        os.unlink(tmp)
+        fd = os.open(tmp, flags, 0o600)
+    with open(fd, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def append_line(path: str, line: str) -> None:
+    """Append one line with a single write, so concurrent appends never interleave."""
+    _ensure_parent(path)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | _NOFOLLOW, 0o600)
+    try:
+        os.write(fd, (line + "\n").encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def cleanup(session_id: object) -> None:
+    """Remove this session's state files, leaving other sessions alone."""
+    for name in FILE_NAMES:
+        try:
+            os.unlink(path_for(name, session_id))
+        except FileNotFoundError:
+            pass
+    directory = session_dir(session_id)
+    if directory is not None:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
@@ -0,0 +1,133 @@
+"""Logistic-regression trainer for per-user scorer weights.
+
+Examples are (feature vector, label) pairs collected at SessionEnd from
+flags the user answered: label 1 when the clarification was needed
+(confirmed), 0 when it was dismissed. Answered flags alone only ever show
+the model messages the old scorer already flagged, so each session also
+adds a few label-0 examples sampled from the messages it let through.
+Features are the ones the UserPromptSubmit hook computed, with the
+session's vocabulary and referent, so the model learns from exactly what
+it will see.
+
+Training is full-batch gradient descent with L2 regularisation on the
+coefficients, vectorised with NumPy when it is installed and in plain
+Python otherwise; both run the same updates, so they learn the same
+weights up to rounding.
+
+The result is a scorer.Weights, used by analyze() as one dot product. Its
+output is a probability, not the fixed weighted sum the calibrated
+threshold was tuned for, so pick_threshold() gives it a threshold of its
+own from the same examples.
+"""
+from __future__ import annotations
+
+import math
+
+from scorer import FEATURES, Weights
+
+MIN_EXAMPLES = 20
+EPOCHS = 300
+LEARNING_RATE = 1.0
+L2 = 0.01
+# Unflagged messages taken as label-0 examples per session
+NEGATIVES_PER_SESSION = 3
+# Candidate model thresholds: MIN_THRESHOLD to MAX_THRESHOLD (see
+# calibration.py) in steps of THRESHOLD_STEP
+THRESHOLD_STEP = 0.05
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # keep typing off the hook's import path
+    from typing import List, Tuple
+
+    Example = Tuple[List[float], int]
+
+
+def ready(examples: list[Example]) -> bool:
+    """Whether there is enough labelled data, of both kinds, to train on."""
+    labels = {label for _, label in examples}
+    return len(examples) >= MIN_EXAMPLES and labels == {0, 1}
+
+
+def sample_negatives(unflagged: list[list[float]], limit: int = NEGATIVES_PER_SESSION) -> list[Example]:
+    """Up to limit evenly spaced feature vectors from unflagged, as label 0."""
+    if len(unflagged) <= limit:
+        return [(features, 0) for features in unflagged]
+    step = len(unflagged) / limit
+    return [(unflagged[int(i * step)], 0) for i in range(limit)]
+
+
+def pick_threshold(weights: Weights, examples: list[Example]) -> float:
+    """The candidate threshold with the best balanced accuracy on examples
+    (ties go to the one nearest 0.5)."""
+    from calibration import MAX_THRESHOLD, MIN_THRESHOLD
+
+    scored = [(weights.score(features), label) for features, label in examples]
+    positives = sum(label for _, label in scored) or 1
+    negatives = (len(scored) - sum(label for _, label in scored)) or 1
+    best, best_key = 0.5, (-1.0, 0.0)
+    steps = round((MAX_THRESHOLD - MIN_THRESHOLD) / THRESHOLD_STEP)
+    for i in range(steps + 1):
+        threshold = round(MIN_THRESHOLD + i * THRESHOLD_STEP, 2)
+        hits = sum(1 for p, label in scored if label and p >= threshold)
+        passes = sum(1 for p, label in scored if not label and p < threshold)
+        key = (round(hits / positives + passes / negatives, 9), -abs(threshold - 0.5))
+        if key > best_key:
+            best, best_key = threshold, key
+    return best
+
+
+def train(
+    examples: list[Example],
+    epochs: int = EPOCHS,
+    rate: float = LEARNING_RATE,
+    l2: float = L2,
+    use_numpy: bool | None = None,
+) -> Weights:
+    """Fit Weights to examples. use_numpy=None picks NumPy when importable."""
+    if use_numpy is None or use_numpy:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            if use_numpy:
+                raise
+        else:
+            return _train_numpy(examples, epochs, rate, l2)
+    return _train_python(examples, epochs, rate, l2)
+
+
+def _train_numpy(examples: list[Example], epochs: int, rate: float, l2: float) -> Weights:
+    import numpy as np
+
+    x = np.array([features for features, _ in examples], dtype=float)
+    y = np.array([label for _, label in examples], dtype=float)
+    n = len(examples)
+    w = np.zeros(x.shape[1])
+    b = 0.0
+    for _ in range(epochs):
+        z = np.clip(x @ w + b, -500.0, 500.0)
+        error = 1.0 / (1.0 + np.exp(-z)) - y
+        w -= rate * (x.T @ error / n + l2 * w)
+        b -= rate * float(error.sum()) / n
+    return Weights([float(v) for v in w], float(b))
+
+
+def _train_python(examples: list[Example], epochs: int, rate: float, l2: float) -> Weights:
+    n = len(examples)
+    width = len(FEATURES)
+    w = [0.0] * width
+    b = 0.0
+    for _ in range(epochs):
+        grad = [0.0] * width
+        grad_b = 0.0
+        for features, label in examples:
+            z = b
+            for i in range(width):
+                z += w[i] * features[i]
+            error = 1.0 / (1.0 + math.exp(-max(-500.0, min(500.0, z)))) - label
+            for i in range(width):
+                grad[i] += error * features[i]
+            grad_b += error
+        for i in range(width):
+            w[i] -= rate * (grad[i] / n + l2 * w[i])
+        b -= rate * grad_b / n
+    return Weights(w, b)
@@ -1,46 +1,252 @@
 """UserPromptSubmit hook: scores user messages for ambiguity.
 
-Reads JSON payload from stdin. Writes a flag file if score >= threshold.
+Reads JSON payload from stdin. A message scoring past the threshold (and
+not within calibration.BORDERLINE of it), or that is exactly a phrase the
+user already confirmed (see intent_index.py), is flagged: the flag goes
+back to Claude Code on stdout as additionalContext for the turn, and to the
+session's flag file (see state.py and confirm.py). Every scored message
+appends a line to the session stats log (see calibration.py).
 Never modifies the user's message. Exits 0 on any error.
+
+Scoring goes through the score memo (score_memo.py), the warm daemon with
+HUMAN_SPEAK_DAEMON=1 (scorer_daemon.py) and scorer.cascade, with the
+session's recent referents (session_context.py) and the variables
+SessionStart exported (session-start.py).
 """
 from __future__ import annotations
 
 import json
 import os
 import sys
-from pathlib import Path
 
 # Add hooks directory to path for scorer import
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-FLAG_FILE = Path("/tmp/human-speak-flag.json")
 DEFAULT_THRESHOLD = 0.4
+# The flag carries at most this much of the message; the skill only needs
+# enough to interpret it.
+FLAG_ORIGINAL_LIMIT = 8 * 1024
+# Share of messages scored without features (tier-0 rejects, memo hits) that
+# are scored again in full, so the trainer also sees clean messages
+FEATURE_SAMPLE_RATE = 0.1
+
+
+def _score(
+    message: str, threshold: float, referent: float = 0.0
+) -> tuple[float, list[str], int | None, list[float] | None]:
+    """(score, signals, cascade tier, feature vector), with no tier or
+    features for a memo hit and no features for a tier-0 reject."""
+    weights = os.environ.get("HUMAN_SPEAK_WEIGHTS")
+    vocabulary = os.environ.get("HUMAN_SPEAK_VOCAB")
+    from score_memo import memo_key, open_memo
+
+    memo = open_memo()
+    if memo is None:
+        return _analyze(message, threshold, weights, referent, vocabulary)
+    try:
+        version = ""
+        if vocabulary:
+            try:
+                version = f"{vocabulary}@{os.stat(vocabulary).st_mtime_ns}"
+            except OSError:
+                vocabulary = None
+        key = memo_key(message, threshold, weights, referent, version)
+        hit = memo.get(key)
+        if hit is not None:
+            return hit[0], hit[1], None, None
+        score, signals, tier, features = _analyze(message, threshold, weights, referent, vocabulary)
+        if tier != 0:
+            # A tier-0 score is only an upper bound; a hit must be a score
+            memo.put(key, score, signals)
+        return score, signals, tier, features
+    finally:
+        memo.close()
+
+
+def _analyze(
+    message: str,
+    threshold: float,
+    weights: str | None,
+    referent: float,
+    vocabulary: str | None,
+) -> tuple[float, list[str], int | None, list[float] | None]:
+    # Same check as scorer_daemon.daemon_enabled(), without importing it
+    if os.environ.get("HUMAN_SPEAK_DAEMON") == "1":
+        from scorer_daemon import request, spawn
+
+        reply = request(message, threshold=threshold, weights=weights, referent=referent,
+                        vocabulary=vocabulary)
+        if reply is not None:
+            return (float(reply["score"]), list(reply.get("signals", [])), reply.get("tier"),
+                    reply.get("features"))
+        spawn()
+
+    from calibration import settled_below
+    from scorer import Weights, cascade
+    analysis = cascade(message, threshold, weights=Weights.parse(weights), referent=referent,
+                       vocabulary=vocabulary, floor=settled_below(threshold))
+    features = analysis.features if analysis.tier else None
+    return analysis.score, analysis.signals, analysis.tier, features
+
+
+def _rescore(
+    message: str, threshold: float, referent: float
+) -> tuple[float, list[str], int | None, list[float] | None]:
+    from scorer import Weights, analyze
+
+    weights = Weights.parse(os.environ.get("HUMAN_SPEAK_WEIGHTS"))
+    vocabulary = os.environ.get("HUMAN_SPEAK_VOCAB") or None
+    analysis = analyze(message, threshold, weights=weights, referent=referent, vocabulary=vocabulary)
+    return analysis.score, analysis.signals, analysis.tier, analysis.features
+
+
+def _sampled() -> bool:
+    try:
+        rate = float(os.environ.get("HUMAN_SPEAK_FEATURE_SAMPLE", FEATURE_SAMPLE_RATE))
+    except ValueError:
+        rate = FEATURE_SAMPLE_RATE
+    return int.from_bytes(os.urandom(2), "big") < rate * 0x10000
+
+
+def _additional_context(flag: dict[str, object]) -> str:
+    """The hook output that inlines flag; the model already has the message."""
+    inline = {k: v for k, v in flag.items() if k not in ("original", "truncated")}
+    return json.dumps({
+        "hookSpecificOutput": {
+            "hookEventName": "UserPromptSubmit",
+            "additionalContext": (
+                "human-speak flag: " + json.dumps(inline)
+                + " Use the human-speak skill before acting on this message."
+            ),
+        }
+    })
+
+
+def _known_interpretation(message: str) -> dict[str, object] | None:
+    index_path = os.environ.get("HUMAN_SPEAK_INDEX")
+    if not index_path:
+        return None
+    from intent_index import load, lookup
+
+    index = load(index_path)
+    return lookup(index, message) if index else None
+
+
+def _record_stats(
+    path: str,
+    score: float,
+    threshold: float,
+    flagged: bool,
+    message: str,
+    features: list[float] | None,
+    hit: object = None,
+    bound: bool = False,
+) -> None:
+    from calibration import is_borderline, message_key
+    from state import append_line
+
+    entry: dict[str, object] = {
+        "score": round(score, 4),
+        "flagged": flagged,
+        "borderline": is_borderline(score, threshold),
+    }
+    if bound:
+        entry["bound"] = True
+    if features is not None:
+        # SessionEnd trains on these, as scored here with the session's
+        # vocabulary and referent
+        entry["key"] = message_key(message)
+        entry["features"] = [round(v, 4) for v in features]
+    if os.environ.get("HUMAN_SPEAK_WEIGHTS"):
+        entry["model"] = True
+    if hit is not None:
+        # The confirmed phrase applied without asking; SessionEnd counts it
+        entry["hit"] = hit
+    append_line(path, json.dumps(entry))
 
 
 def main() -> None:
+    from metrics import recorder
+
+    metrics = recorder("user-prompt-submit")
     try:
+        from state import path_for, previous_flag_path, write_atomic
+
         raw = sys.stdin.read()
+        metrics.mark("read")
         payload = json.loads(raw)
+        metrics.mark("parse")
 
         message: str = payload.get("user_message", "")
-        if not message.strip():
+        if not message or message.isspace():
             return
+        session_id = payload.get("session_id")
 
         threshold = float(os.environ.get("HUMAN_SPEAK_THRESHOLD", DEFAULT_THRESHOLD))
 
-        from scorer import detect_signals, score_message
-        score = score_message(message)
-        signals = detect_signals(message)
+        from session_context import load
+
+        context_path = path_for("context", session_id)
+        context = load(context_path)
+        referent = context.referent()
+        referents = context.recent()
+        context.push(message)
+        write_atomic(context_path, context.dumps())
+        metrics.mark("context")
+
+        score, signals, tier, features = _score(message, threshold, referent)
+        metrics.mark("score")
+        known = _known_interpretation(message)
+        metrics.mark("lookup")
+        from calibration import is_borderline
+
+        # A borderline score is logged for calibration, not acted on
+        flagged = score >= threshold and not is_borderline(score, threshold)
+        exact = known is not None and known["match"] == "exact"
+        if (exact and not tier) or (features is None and _sampled()):
+            # The flag needs the real score and signals, not a cascade bound
+            # (tier 0) or a memo entry that may hold one from an older version.
+            # A sample of the rest is scored in full for the trainer: most
+            # clean messages stop at tier 0, and it needs them as negatives.
+            score, signals, tier, features = _rescore(message, threshold, referent)
+            metrics.mark("rescore")
+        _record_stats(path_for("stats", session_id), score, threshold, flagged, message, features,
+                      known["original"] if known and exact else None, tier == 0)
+        metrics.mark("stats")
+        metrics.tier = tier
+        metrics.flagged = flagged
+
+        if flagged or exact:
+            from calibration import message_key
 
-        if score >= threshold:
-            FLAG_FILE.write_text(json.dumps({
-                "original": message,
+            flag: dict[str, object] = {
+                "id": f"{message_key(message):08x}",
+                "original": message[:FLAG_ORIGINAL_LIMIT],
                 "score": round(score, 4),
                 "signals": signals,
-            }))
-    except Exception:
+            }
+            if len(message) > FLAG_ORIGINAL_LIMIT:
+                flag["truncated"] = True
+            if "missing-subject" in signals and referents:
+                flag["referents"] = referents
+            if known:
+                flag["interpretation" if exact else "hint"] = known["interpretation"]
+                flag["confirmed_phrase"] = known["original"]
+                flag["match"] = known["match"]
+            sys.stdout.write(_additional_context(flag))
+            sys.stdout.flush()
+            flag_path = path_for("flag", session_id)
+            try:
+                os.replace(flag_path, previous_flag_path(flag_path))
+            except FileNotFoundError:
+                pass
+            write_atomic(flag_path, json.dumps(flag))
+            metrics.mark("flag")
+    except Exception as exc:
         # Never block the user -- fail silently
-        pass
+        metrics.fail(exc)
+    finally:
+        metrics.finish()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,385 @@
+"""Calibration workbench: threshold and weight sweeps over a labeled corpus.
+
+Scoring is the slow part, so every message is scored exactly once. Its
+signal strengths (the first four scorer.FEATURES) are stored in a columnar
+FeatureMatrix, and identical rows are collapsed into one row with positive
+and negative counts. The default score is a weighted sum of those
+strengths, clipped at 1.0, so a sweep needs only the matrix. Each weight
+combination is one vectorised pass over the matrix. Binning the scores against the sorted
+thresholds and taking suffix sums gives the counts at every threshold at
+once. NumPy does this in blocks of configurations; without it the same
+counts come from plain Python over the deduplicated rows, which is slower.
+
+Corpus records are JSONL with the text in --text-field (or the first of
+"user_message", "prompt", "text", "body") and a 0/1 or boolean label in
+--label-field (default "label": 1 = needed clarification). Unlabeled records
+are skipped.
+
+Usage (from the repository root):
+  PYTHONPATH=hooks python -m workbench labeled.jsonl --save-features features.json
+  PYTHONPATH=hooks python -m workbench --features features.json --grid 0,0.15,0.3,0.45
+  PYTHONPATH=hooks python -m workbench labeled.jsonl --json > sweep.json
+
+The report shows precision, recall and flag rate against the threshold for
+the shipped weights. It recommends the "Ambiguity threshold:" value that
+maximises F-beta (--beta, default 1), and names the best weights on the grid.
+
+Typo-density is not measured for a message whose other signals already
+saturate the default score (see scorer.analyze), so such rows carry 0 for
+it; they are rare.
+"""
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import TYPE_CHECKING, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from calibration import BORDERLINE, MAX_THRESHOLD, MIN_THRESHOLD  # noqa: E402
+from scorer import FEATURES, analyze, signal_weights  # noqa: E402
+
+if TYPE_CHECKING:
+    from typing import Iterable
+
+SIGNALS = FEATURES[:4]
+TEXT_FIELDS = ("user_message", "prompt", "text", "body")
+DEFAULT_GRID = (0.0, 0.1, 0.2, 0.3, 0.4, 0.5)
+THRESHOLD_STEP = 0.01
+# Scores computed per NumPy block, to bound memory on large corpora
+_BLOCK_CELLS = 4_000_000
+
+Config = Tuple[float, ...]
+
+
+def thresholds(low: float = MIN_THRESHOLD, high: float = MAX_THRESHOLD,
+               step: float = THRESHOLD_STEP) -> list[float]:
+    """Candidate thresholds, ascending, rounded as the profile stores them."""
+    count = int(round((high - low) / step))
+    return [round(low + i * step, 2) for i in range(count + 1)]
+
+
+class FeatureMatrix:
+    """Distinct signal-strength rows, one array per signal, with how many
+    positive and negative messages share each row."""
+
+    __slots__ = ("columns", "positives", "negatives", "_rows")
+
+    def __init__(self) -> None:
+        self.columns = [array("d") for _ in SIGNALS]
+        self.positives = array("l")
+        self.negatives = array("l")
+        self._rows: dict[tuple[float, ...], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.positives)
+
+    def messages(self) -> int:
+        return sum(self.positives) + sum(self.negatives)
+
+    def add(self, strengths: list[float], label: int, count: int = 1) -> None:
+        key = tuple(round(v, 4) for v in strengths[:len(SIGNALS)])
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = len(self.positives)
+            for column, value in zip(self.columns, key):
+                column.append(value)
+            self.positives.append(0)
+            self.negatives.append(0)
+        if label:
+            self.positives[row] += count
+        else:
+            self.negatives[row] += count
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "signals": list(SIGNALS),
+            "columns": [list(c) for c in self.columns],
+            "positives": list(self.positives),
+            "negatives": list(self.negatives),
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: str) -> FeatureMatrix:
+        data = json.loads(text)
+        if data.get("signals") != list(SIGNALS):
+            raise ValueError("feature file was extracted for different signals")
+        matrix = cls()
+        for i, (pos, neg) in enumerate(zip(data["positives"], data["negatives"])):
+            row = [float(c[i]) for c in data["columns"]]
+            if pos:
+                matrix.add(row, 1, int(pos))
+            if neg:
+                matrix.add(row, 0, int(neg))
+        return matrix
+
+
+def _label(value: object) -> int | None:
+    if isinstance(value, int) and value in (0, 1):  # bools included
+        return int(value)
+    return None
+
+
+def extract(lines: Iterable[str], text_field: str | None = None,
+            label_field: str = "label") -> tuple[FeatureMatrix, int]:
+    """Score each labeled record once. Returns (matrix, records skipped)."""
+    matrix = FeatureMatrix()
+    skipped = 0
+    fields = (text_field,) if text_field else TEXT_FIELDS
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            skipped += 1
+            continue
+        if not isinstance(record, dict):
+            skipped += 1
+            continue
+        label = _label(record.get(label_field))
+        texts = [record[f] for f in fields if isinstance(record.get(f), str)]
+        if label is None or not texts:
+            skipped += 1
+            continue
+        matrix.add(analyze(texts[0]).features, label)
+    return matrix, skipped
+
+
+def weight_grid(values: Iterable[float] = DEFAULT_GRID) -> list[Config]:
+    """Every combination of values as per-signal weights."""
+    from itertools import product
+
+    return list(product(sorted(set(values)), repeat=len(SIGNALS)))
+
+
+def sweep(
+    matrix: FeatureMatrix,
+    configs: list[Config],
+    cutoffs: list[float],
+    use_numpy: bool | None = None,
+) -> tuple[list[list[int]], list[list[int]]]:
+    """(true positives, flagged) per config and cutoff: a score above the
+    cutoff and not within BORDERLINE of it (calibration.is_borderline)
+    flags a message, as in the hook. use_numpy=None picks NumPy when
+    importable."""
+    if use_numpy is None or use_numpy:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            if use_numpy:
+                raise
+        else:
+            return _sweep_numpy(matrix, configs, _flag_bounds(cutoffs))
+    return _sweep_python(matrix, configs, _flag_bounds(cutoffs))
+
+
+def _flag_bounds(cutoffs: list[float]) -> list[float]:
+    """The score each cutoff's flags must exceed: past the borderline band."""
+    return [cut + BORDERLINE + 1e-9 for cut in cutoffs]
+
+
+def _sweep_numpy(
+    matrix: FeatureMatrix, configs: list[Config], bounds: list[float]
+) -> tuple[list[list[int]], list[list[int]]]:
+    import numpy as np
+
+    x = np.column_stack([np.frombuffer(c, dtype=float) for c in matrix.columns]) \
+        if len(matrix) else np.zeros((0, len(SIGNALS)))
+    pos = np.asarray(matrix.positives, dtype=float)
+    total = pos + np.asarray(matrix.negatives, dtype=float)
+    cuts = np.asarray(bounds)
+    bins = len(bounds) + 1
+    block = max(1, _BLOCK_CELLS // max(len(matrix), 1))
+    tp_rows: list[list[int]] = []
+    flagged_rows: list[list[int]] = []
+    for start in range(0, len(configs), block):
+        w = np.asarray(configs[start:start + block], dtype=float)
+        # Summed signal by signal, in the scorer's order, rather than with
+        # x @ w.T: a score landing exactly on a threshold must round the
+        # way it does in the hook
+        scores = np.zeros((len(matrix), len(w)))
+        for k in range(len(SIGNALS)):
+            scores += np.outer(x[:, k], w[:, k])
+        np.minimum(scores, 1.0, out=scores)
+        # Bin b holds scores with exactly b bounds < score
+        binned = np.searchsorted(cuts, scores, side="left")
+        binned += np.arange(len(w)) * bins
+        pos_counts = np.bincount(binned.ravel(), np.repeat(pos, len(w)), len(w) * bins)
+        all_counts = np.bincount(binned.ravel(), np.repeat(total, len(w)), len(w) * bins)
+        for counts, rows in ((pos_counts, tp_rows), (all_counts, flagged_rows)):
+            # Flagged at cutoff j: every bin above j
+            suffix = counts.reshape(len(w), bins)[:, ::-1].cumsum(axis=1)[:, ::-1]
+            rows.extend(suffix[:, 1:].round().astype(int).tolist())
+    return tp_rows, flagged_rows
+
+
+def _sweep_python(
+    matrix: FeatureMatrix, configs: list[Config], bounds: list[float]
+) -> tuple[list[list[int]], list[list[int]]]:
+    rows = list(zip(*matrix.columns, matrix.positives, matrix.negatives))
+    bins = len(bounds) + 1
+    tp_rows: list[list[int]] = []
+    flagged_rows: list[list[int]] = []
+    for config in configs:
+        pos_counts = [0] * bins
+        all_counts = [0] * bins
+        for *strengths, pos, neg in rows:
+            score = 0.0
+            for weight, strength in zip(config, strengths):
+                score += weight * strength
+            b = bisect_left(bounds, min(1.0, score))
+            pos_counts[b] += pos
+            all_counts[b] += pos + neg
+        for counts, out in ((pos_counts, tp_rows), (all_counts, flagged_rows)):
+            suffix = [0] * len(bounds)
+            running = 0
+            for j in range(len(bounds) - 1, -1, -1):
+                running += counts[j + 1]
+                suffix[j] = running
+            out.append(suffix)
+    return tp_rows, flagged_rows
+
+
+def curve(tp: list[int], flagged: list[int], positives: int, messages: int,
+          cutoffs: list[float]) -> list[dict[str, float]]:
+    """Precision, recall and flag rate at each cutoff."""
+    return [{
+        "threshold": cut,
+        "precision": round(t / f, 4) if f else 1.0,
+        "recall": round(t / positives, 4) if positives else 0.0,
+        "flag_rate": round(f / messages, 4) if messages else 0.0,
+    } for cut, t, f in zip(cutoffs, tp, flagged)]
+
+
+def f_beta(tp: int, flagged: int, positives: int, beta: float = 1.0) -> float:
+    """F-beta from counts: (1 + b^2) tp / (flagged + b^2 positives)."""
+    denominator = flagged + beta * beta * positives
+    return (1 + beta * beta) * tp / denominator if denominator else 0.0
+
+
+def _best(tp: list[int], flagged: list[int], positives: int, beta: float) -> tuple[float, int]:
+    """(F-beta, cutoff index) of the best cutoff; ties go to the higher one."""
+    best = (-1.0, 0)
+    for j, (t, f) in enumerate(zip(tp, flagged)):
+        score = f_beta(t, f, positives, beta)
+        if score >= best[0]:
+            best = (score, j)
+    return best
+
+
+def evaluate(matrix: FeatureMatrix, configs: list[Config], cutoffs: list[float],
+             beta: float = 1.0, use_numpy: bool | None = None) -> dict[str, object]:
+    """Sweep configs (the shipped weights are always included) and summarise."""
+    weights = signal_weights()
+    current: Config = tuple(weights[s] for s in SIGNALS)
+    configs = [current] + [c for c in configs if c != current]
+    tp, flagged = sweep(matrix, configs, cutoffs, use_numpy)
+    positives = sum(matrix.positives)
+    messages = matrix.messages()
+
+    current_f, current_j = _best(tp[0], flagged[0], positives, beta)
+    best_f, best_i, best_j = current_f, 0, current_j
+    for i in range(1, len(configs)):
+        score, j = _best(tp[i], flagged[i], positives, beta)
+        if score > best_f:
+            best_f, best_i, best_j = score, i, j
+    return {
+        "messages": messages,
+        "positives": positives,
+        "configurations": len(configs),
+        "beta": beta,
+        "current": {
+            "weights": dict(zip(SIGNALS, current)),
+            "threshold": cutoffs[current_j],
+            "f_beta": round(current_f, 4),
+            "curve": curve(tp[0], flagged[0], positives, messages, cutoffs),
+        },
+        "best": {
+            "weights": dict(zip(SIGNALS, configs[best_i])),
+            "threshold": cutoffs[best_j],
+            "f_beta": round(best_f, 4),
+            "curve": curve(tp[best_i], flagged[best_i], positives, messages, cutoffs),
+        },
+    }
+
+
+def render(result: dict[str, object], every: float = 0.05) -> str:
+    current = result["current"]
+    best = result["best"]
+    assert isinstance(current, dict) and isinstance(best, dict)
+    lines = [
+        f"{result['messages']} messages ({result['positives']} need clarification), "
+        f"{result['configurations']} weight configurations",
+        "",
+        "shipped weights: " + ", ".join(f"{k}={v:g}" for k, v in current["weights"].items()),
+        f"{'threshold':>9} {'precision':>9} {'recall':>7} {'flag rate':>9}",
+    ]
+    stride = max(1, round(every / THRESHOLD_STEP))
+    for i, point in enumerate(current["curve"]):
+        if i % stride == 0 or point["threshold"] == current["threshold"]:
+            marker = "  <- recommended" if point["threshold"] == current["threshold"] else ""
+            lines.append(
+                f"{point['threshold']:>9.2f} {point['precision']:>9.1%} "
+                f"{point['recall']:>7.1%} {point['flag_rate']:>9.1%}{marker}"
+            )
+    lines += [
+        "",
+        f"Ambiguity threshold: {current['threshold']:.2f}",
+        f"(F{result['beta']:g} {current['f_beta']:.3f}; best on the grid: "
+        + ", ".join(f"{k}={v:g}" for k, v in best["weights"].items())
+        + f" at {best['threshold']:.2f}, F{result['beta']:g} {best['f_beta']:.3f})",
+    ]
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Sweep thresholds and weights over a labeled corpus")
+    parser.add_argument("input", nargs="?", type=Path, default=None,
+                        help="labeled JSONL corpus (default: stdin, unless --features)")
+    parser.add_argument("--features", type=Path, default=None,
+                        help="load a feature file saved by --save-features instead of scoring")
+    parser.add_argument("--save-features", type=Path, default=None)
+    parser.add_argument("--text-field", default=None)
+    parser.add_argument("--label-field", default="label")
+    parser.add_argument("--grid", default=",".join(f"{v:g}" for v in DEFAULT_GRID),
+                        help="comma-separated weight values tried for every signal")
+    parser.add_argument("--beta", type=float, default=1.0,
+                        help="F-beta used to pick the threshold (<1 favours precision)")
+    parser.add_argument("--json", action="store_true", help="print the full result as JSON")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.features:
+        matrix = FeatureMatrix.from_json(args.features.read_text(encoding="utf-8"))
+        skipped = 0
+    elif args.input:
+        with open(args.input, encoding="utf-8") as f:
+            matrix, skipped = extract(f, args.text_field, args.label_field)
+    else:
+        matrix, skipped = extract(sys.stdin, args.text_field, args.label_field)
+    if args.save_features:
+        args.save_features.write_text(matrix.to_json(), encoding="utf-8")
+    extracted = time.perf_counter()
+
+    configs = weight_grid(float(v) for v in args.grid.split(","))
+    result = evaluate(matrix, configs, thresholds(), args.beta)
+    swept = time.perf_counter()
+
+    print(json.dumps(result, indent=2) if args.json else render(result))
+    print(
+        f"{matrix.messages()} messages ({len(matrix)} distinct rows, {skipped} skipped) "
+        f"in {extracted - started:.2f}s; {result['configurations']} configurations "
+        f"swept in {swept - extracted:.2f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Tests for the streaming JSONL batch scorer."""
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from batch_score import run
+from scorer import analyze
+
+MESSAGES = [
+    "Fix the bug in auth.py",
+    "you know like i want it to work better and also fix that thing and basically look at the other file too",
+    "Please update the README with the new API docs",
+]
+
+
+def _corpus() -> str:
+    lines = [json.dumps({"request_id": f"r{i}", "body": msg}) for i, msg in enumerate(MESSAGES * 5)]
+    lines.insert(3, "not json")
+    return "\n".join(lines) + "\n"
+
+
+def _run(workers: int) -> tuple[list[dict[str, object]], int, int]:
+    out = io.StringIO()
+    total, flagged = run(io.StringIO(_corpus()), out, workers=workers, chunk_size=4)
+    return [json.loads(line) for line in out.getvalue().splitlines()], total, flagged
+
+
+def test_scores_records_in_order() -> None:
+    records, total, flagged = _run(workers=1)
+    assert total == 16
+    assert flagged == 5
+    assert records[0] == {"id": "r0", "score": analyze(MESSAGES[0]).score, "signals": analyze(MESSAGES[0]).signals}
+    assert records[3] == {"id": 4, "error": "invalid record"}
+    assert [r["id"] for r in records if "score" in r] == [f"r{i}" for i in range(15)]
+
+
+def test_process_pool_matches_in_process() -> None:
+    assert _run(workers=2) == _run(workers=1)
+
+
+def test_cascade_reports_tiers_and_keeps_flags() -> None:
+    out = io.StringIO()
+    tiers: dict[int, int] = {}
+    total, flagged = run(io.StringIO(_corpus()), out, workers=1, chunk_size=4, cascade=True, tiers=tiers)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (total, flagged) == _run(workers=1)[1:]
+    assert sum(tiers.values()) == 15
+    assert tiers[0] == 5  # the README request never reaches the full scorer
+    assert {r["tier"] for r in records if "score" in r} == set(tiers)
@@ -0,0 +1,43 @@
+"""Tests for the benchmark suite's statistics and regression gate."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from bench import compare, percentile
+
+BUDGETS = {
+    "default": {"p95_ms": 100, "max_regression": 0.25},
+    "hooks": {"session-end": {"p95_ms": 300}},
+}
+
+
+def _results(p95: float, hook: str = "user-prompt-submit") -> dict:
+    return {"hooks": {hook: {"runs": 10, "p50_ms": p95 / 2, "p95_ms": p95, "p99_ms": p95}}}
+
+
+def test_percentile_nearest_rank() -> None:
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 95) == 95.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_compare_within_budget() -> None:
+    assert compare(_results(42.0), _results(40.0), BUDGETS) == []
+
+
+def test_compare_fails_on_regression() -> None:
+    failures = compare(_results(60.0), _results(40.0), BUDGETS)
+    assert len(failures) == 1
+    assert "regressed" in failures[0]
+
+
+def test_compare_fails_on_absolute_budget() -> None:
+    failures = compare(_results(120.0), {}, BUDGETS)
+    assert failures == ["user-prompt-submit: p95 120.0ms exceeds budget 100.0ms"]
+
+
+def test_compare_uses_per_hook_budget() -> None:
+    assert compare(_results(200.0, "session-end"), {}, BUDGETS) == []
@@ -0,0 +1,91 @@
+"""Tests for flag statistics and threshold recalibration."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from calibration import (
+    BORDERLINE,
+    HISTOGRAM_BUCKETS,
+    MAX_THRESHOLD,
+    CalibrationStats,
+    bucket,
+    is_borderline,
+    recalibrate,
+    settled_below,
+)
+
+
+def _judged(confirmed: int, dismissed: int) -> CalibrationStats:
+    stats = CalibrationStats()
+    for _ in range(confirmed):
+        stats.observe_outcome(dismissed=False)
+    for _ in range(dismissed):
+        stats.observe_outcome(dismissed=True)
+    return stats
+
+
+def test_bucket_bounds() -> None:
+    assert bucket(0.0) == 0
+    assert bucket(0.41) == 41
+    assert bucket(0.29) == 29
+    assert bucket(1.0) == HISTOGRAM_BUCKETS - 1
+
+
+def test_record_round_trip() -> None:
+    stats = CalibrationStats()
+    stats.observe(0.42, flagged=True)
+    stats.observe_outcome(dismissed=True)
+    restored = CalibrationStats.from_record(stats.to_record())
+    assert restored.raised == 1 and restored.dismissed == 1
+    assert restored.histogram[bucket(0.42)] == 1
+
+
+def test_decay_fades_old_sessions() -> None:
+    stats = _judged(10, 0)
+    stats.decay(0.5)
+    assert stats.confirmed == 5
+
+
+def test_no_change_until_enough_outcomes() -> None:
+    assert recalibrate(0.40, _judged(0, 2)) == 0.40
+
+
+def test_many_dismissals_raise_threshold_one_step() -> None:
+    assert recalibrate(0.40, _judged(2, 8)) == round(0.40 + BORDERLINE, 2)
+
+
+def test_few_dismissals_lower_threshold_only_with_mass_below() -> None:
+    stats = _judged(10, 0)
+    assert recalibrate(0.40, stats) == 0.40
+    stats.observe(0.39, flagged=False)
+    assert recalibrate(0.40, stats) == round(0.40 - BORDERLINE, 2)
+
+
+def test_scores_at_the_threshold_are_not_mass_below() -> None:
+    stats = _judged(10, 0)
+    for _ in range(10):
+        stats.observe(0.445, flagged=True)
+    assert stats.mass_below(0.44) == 0
+    assert recalibrate(0.44, stats) == 0.44
+    stats.observe(0.43, flagged=False)
+    assert stats.mass_below(0.44) == 1
+
+
+def test_threshold_is_clamped() -> None:
+    assert recalibrate(MAX_THRESHOLD, _judged(0, 10)) == MAX_THRESHOLD
+
+
+def test_is_borderline() -> None:
+    assert is_borderline(0.42, 0.40)
+    assert is_borderline(0.38, 0.40)
+    assert not is_borderline(0.45, 0.40)
+
+
+def test_settled_below_is_outside_the_window_recalibration_reads() -> None:
+    for threshold in (0.20, 0.37, 0.40, 0.55, 0.80):
+        floor = settled_below(threshold)
+        assert floor <= threshold - BORDERLINE
+        below = floor - 1e-6
+        assert not is_borderline(below, threshold)
+        assert bucket(below) < bucket(max(0.0, threshold - BORDERLINE))
@@ -0,0 +1,61 @@
+"""Tests for recording answers to flags."""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from confirm import main, read_pairs, record
+
+
+def test_each_answer_is_one_appended_line() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / "confirmed.json")
+        record(path, "fix it", "fix the auth bug", "confirmed")
+        record(path, "go ahead", "", "dismissed")
+        lines = Path(path).read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[1])["outcome"] == "dismissed"
+        assert [p["original"] for p in read_pairs(Path(path).read_text())] == ["fix it", "go ahead"]
+
+
+def test_reads_legacy_array_and_appended_lines() -> None:
+    legacy = json.dumps([{"original": "a", "interpreted": "b"}])
+    assert read_pairs(legacy) == [{"original": "a", "interpreted": "b"}]
+    appended = legacy + "\n" + json.dumps({"original": "c", "interpreted": "d"}) + "\n"
+    assert [p["original"] for p in read_pairs(appended)] == ["a", "c"]
+    assert read_pairs("not json {{{\n[1, 2]\n") == []
+
+
+def test_cli_takes_original_from_flag_file() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        flag = Path(tmpdir) / "flag.json"
+        confirmed = Path(tmpdir) / "confirmed.json"
+        flag.write_text(json.dumps({"original": "do the thing", "score": 0.5, "signals": []}))
+        args = ["--flag", str(flag), "--file", str(confirmed)]
+        assert main(["corrected", "run the linter", *args]) == 0
+        pair = read_pairs(confirmed.read_text())[0]
+        assert pair["original"] == "do the thing"
+        assert pair["interpreted"] == "run the linter"
+        assert pair["outcome"] == "corrected"
+
+        flag.unlink()
+        assert main(["confirmed", "run the linter", *args]) == 1
+        assert len(read_pairs(confirmed.read_text())) == 1
+
+
+def test_cli_finds_answered_flag_by_id_after_reply_is_flagged() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        flag = Path(tmpdir) / "flag.json"
+        confirmed = Path(tmpdir) / "confirmed.json"
+        # The reply was flagged in turn: the asked-about flag is now the previous one
+        Path(tmpdir, "flag.previous.json").write_text(json.dumps({"id": "0000abcd", "original": "do the thing"}))
+        flag.write_text(json.dumps({"id": "0000ffff", "original": "no, like, the other thing you know"}))
+        args = ["--flag", str(flag), "--file", str(confirmed)]
+        assert main(["corrected", "run the linter", "--id", "0000abcd", *args]) == 0
+        assert main(["dismissed", "--id", "0000ffff", *args]) == 0
+        assert [p["original"] for p in read_pairs(confirmed.read_text())] == [
+            "do the thing", "no, like, the other thing you know"]
+        assert main(["dismissed", "--id", "12345678", *args]) == 1
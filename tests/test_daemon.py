@@ -0,0 +1,83 @@
+"""Tests for the optional scorer daemon and the hook's client mode."""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from scorer import detect_signals, score_message
+from scorer_daemon import request, serve, socket_path
+from state import FILE_NAMES
+
+HOOK_PATH = Path(__file__).parent.parent / "hooks" / "user-prompt-submit.py"
+AMBIGUOUS = "you know like i want it to work better and also fix that thing and basically look at the other file too"
+
+
+def _start_server(path: Path) -> threading.Thread:
+    thread = threading.Thread(target=serve, args=(path, 2.0), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if request("", path) is not None:
+            break
+        time.sleep(0.01)
+    return thread
+
+
+def test_daemon_matches_in_process_scoring() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "scorer.sock"
+        _start_server(path)
+        reply = request(AMBIGUOUS, path)
+        assert reply is not None
+        assert reply["score"] == round(score_message(AMBIGUOUS), 4)
+        assert reply["signals"] == detect_signals(AMBIGUOUS)
+
+
+def test_request_returns_none_when_daemon_down() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        assert request("fix it", Path(tmpdir) / "missing.sock") is None
+
+
+def test_socket_lives_in_the_private_state_root(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.delenv("HUMAN_SPEAK_SOCKET", raising=False)
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", str(Path(tmpdir) / "state"))
+        assert socket_path() == Path(tmpdir) / "state" / "scorer.sock"
+        _start_server(socket_path())
+        assert request(AMBIGUOUS) is not None
+        assert (Path(tmpdir) / "state").stat().st_mode & 0o077 == 0
+
+
+def test_serve_leaves_a_file_it_does_not_own_alone() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "scorer.sock"
+        path.write_text("planted")
+        serve(path, 0.1)  # returns instead of unlinking or raising
+        assert path.read_text() == "planted"
+        assert request("fix it", path) is None
+
+
+def test_hook_falls_back_when_daemon_down() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        flag_file = Path(tmpdir, "test", FILE_NAMES["flag"])
+        env = os.environ.copy()
+        env["HUMAN_SPEAK_STATE_DIR"] = tmpdir
+        env["HUMAN_SPEAK_PROJECT_VOCAB"] = "0"
+        env["HUMAN_SPEAK_THRESHOLD"] = "0.4"
+        env["HUMAN_SPEAK_DAEMON"] = "1"
+        env["HUMAN_SPEAK_DAEMON_IDLE"] = "1"
+        env["HUMAN_SPEAK_SOCKET"] = str(Path(tmpdir) / "scorer.sock")
+        result = subprocess.run(
+            [sys.executable, str(HOOK_PATH)],
+            input=json.dumps({"user_message": AMBIGUOUS, "session_id": "test"}),
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        assert result.returncode == 0
+        assert flag_file.exists(), "Hook must score in-process when the daemon is unreachable"
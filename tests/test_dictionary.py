@@ -0,0 +1,61 @@
+"""Tests for the memory-mapped word set."""
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+import dictionary
+from dictionary import build, cached, english, fingerprint, load
+
+
+def test_build_and_load_roundtrip() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "words.u32"
+        assert build(["alpha", "Beta", "gamma", "alpha"], path) == 3
+        words = load(path)
+        assert words is not None
+        assert "alpha" in words
+        assert "beta" in words
+        assert "delta" not in words
+
+
+def test_load_missing_file_returns_none() -> None:
+    assert load(Path("/nonexistent/words.u32")) is None
+
+
+def test_bundled_english_dictionary() -> None:
+    words = english()
+    assert words is not None
+    assert "the" in words
+    assert "refactor" in words
+    assert "teh" not in words
+
+
+def test_cached_word_set_follows_a_replaced_file() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "words.u32"
+        build(["alpha"], path)
+        first = cached(str(path))
+        assert first is not None and "alpha" in first
+        assert cached(str(path)) is first
+        build(["beta"], path)
+        second = cached(str(path))
+        assert second is not None and "beta" in second and "alpha" not in second
+
+
+def test_word_set_files_are_little_endian(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "words.u32"
+        build(["alpha", "beta"], path)
+        keys = sorted(fingerprint(w) for w in ("alpha", "beta"))
+        assert path.read_bytes() == struct.pack("<2I", *keys)
+        # A big-endian host reads the same file back through a byteswap
+        monkeypatch.setattr(dictionary, "_SWAP", True)
+        path.write_bytes(struct.pack(">2I", *keys))
+        words = load(path)
+        assert words is not None and "alpha" in words and "beta" in words
+        build(["gamma"], path)
+        assert path.read_bytes() == struct.pack(">I", fingerprint("gamma"))
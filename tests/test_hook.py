@@ -5,16 +5,41 @@ import subprocess
 import sys
 import tempfile
 from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from intent_index import build, save
+from state import FILE_NAMES, path_for
 
 HOOK_PATH = Path(__file__).parent.parent / "hooks" / "user-prompt-submit.py"
-FLAG_FILE = Path("/tmp/human-speak-flag.json")
+SESSION_END_PATH = Path(__file__).parent.parent / "hooks" / "session-end.py"
+# Every run shares this state root, so nothing is left in the real one
+_STATE = tempfile.TemporaryDirectory()
+STATE_DIR = _STATE.name
+FLAG_FILE = Path(STATE_DIR, "test", FILE_NAMES["flag"])
+CONTEXT_FILE = Path(STATE_DIR, "test", FILE_NAMES["context"])
+STATS_FILE = Path(STATE_DIR, "test", FILE_NAMES["stats"])
 
 
-def _run_hook(message: str, threshold: str = "0.4") -> subprocess.CompletedProcess[str]:
-    """Run the hook script with the given message as stdin payload."""
-    payload = json.dumps({"user_message": message, "session_id": "test"})
+def _env(threshold: str = "0.4") -> dict:
     env = os.environ.copy()
+    env["HUMAN_SPEAK_STATE_DIR"] = STATE_DIR
+    env["HUMAN_SPEAK_PROJECT_VOCAB"] = "0"
     env["HUMAN_SPEAK_THRESHOLD"] = threshold
+    env["HUMAN_SPEAK_FEATURE_SAMPLE"] = "0"
+    env.pop("HUMAN_SPEAK_INDEX", None)
+    return env
+
+
+def _run_hook(
+    message: str, threshold: str = "0.4", index_path: Optional[str] = None
+) -> subprocess.CompletedProcess[str]:
+    """Run the hook script with the given message as stdin payload."""
+    payload = json.dumps({"user_message": message, "session_id": "test"})
+    env = _env(threshold)
+    if index_path:
+        env["HUMAN_SPEAK_INDEX"] = index_path
     return subprocess.run(
         [sys.executable, str(HOOK_PATH)],
         input=payload,
@@ -25,9 +50,10 @@ def _run_hook(message: str, threshold: str = "0.4") -> subprocess.CompletedProce
 
 
 def setup_function() -> None:
-    """Remove flag file before each test."""
-    if FLAG_FILE.exists():
-        FLAG_FILE.unlink()
+    """Remove flag and context files before each test."""
+    for path in (FLAG_FILE, CONTEXT_FILE):
+        if path.exists():
+            path.unlink()
 
 
 def test_clean_message_no_flag_created() -> None:
@@ -44,6 +70,68 @@ def test_ambiguous_message_creates_flag() -> None:
     assert FLAG_FILE.exists(), "Flag file should be created for ambiguous message"
 
 
+def test_borderline_score_is_logged_not_flagged() -> None:
+    # "Go ahead." scores 0.30, within BORDERLINE of 0.29
+    result = _run_hook("Go ahead.", threshold="0.29")
+    assert result.returncode == 0
+    assert result.stdout == ""
+    assert not FLAG_FILE.exists()
+    last = json.loads(STATS_FILE.read_text().splitlines()[-1])
+    assert (last["score"], last["flagged"], last["borderline"]) == (0.3, False, True)
+
+
+def test_stats_line_carries_hot_path_features(monkeypatch) -> None:
+    from calibration import message_key
+
+    message = f"Fix the parser in module_{os.getpid()}.py, it drops the last line"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = _env()
+        env["HUMAN_SPEAK_STATE_DIR"] = tmpdir
+        env["HUMAN_SPEAK_MEMO"] = "0"
+        subprocess.run([sys.executable, str(HOOK_PATH)], capture_output=True, text=True, env=env,
+                       input=json.dumps({"user_message": message, "session_id": "s"}))
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", tmpdir)
+        entry = json.loads(Path(path_for("stats", "s")).read_text())
+        assert entry["key"] == message_key(message)
+        assert len(entry["features"]) == 5
+        assert "model" not in entry
+
+
+def test_clean_message_can_become_a_negative_example(monkeypatch) -> None:
+    from profile_store import load_profile
+
+    message = "Please update the README with the new install steps."
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = _env()
+        env["HUMAN_SPEAK_STATE_DIR"] = tmpdir
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(Path(tmpdir) / "user-speak-profile.md")
+        env["HUMAN_SPEAK_FEATURE_SAMPLE"] = "1"
+        payload = json.dumps({"user_message": message, "session_id": "s"})
+        subprocess.run([sys.executable, str(HOOK_PATH)], capture_output=True, text=True, env=env,
+                       input=payload)
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", tmpdir)
+        entry = json.loads(Path(path_for("stats", "s")).read_text())
+        assert len(entry["features"]) == 5
+        assert not entry["flagged"] and "bound" not in entry
+
+        subprocess.run([sys.executable, str(SESSION_END_PATH)], capture_output=True, text=True,
+                       env=env, input=payload)
+        state = load_profile(env["HUMAN_SPEAK_PROFILE_PATH"])
+        assert state.examples == [(entry["features"], 0)]
+
+
+def test_new_flag_keeps_the_previous_one() -> None:
+    from calibration import message_key
+
+    first = "you know like i want it to work better and also fix that thing and basically look at the other file too"
+    second = "no like basically the other thing you know and also the tests and the docs and whatever else is broken right now"
+    _run_hook(first)
+    _run_hook(second)
+    previous = json.loads(Path(STATE_DIR, "test", FILE_NAMES["previous-flag"]).read_text())
+    assert previous["id"] == f"{message_key(first):08x}"
+    assert json.loads(FLAG_FILE.read_text())["id"] == f"{message_key(second):08x}"
+
+
 def test_flag_file_contains_expected_fields() -> None:
     _run_hook("you know like i want it to work better and also fix that thing and basically look at the other file too")
     data = json.loads(FLAG_FILE.read_text())
@@ -54,6 +142,20 @@ def test_flag_file_contains_expected_fields() -> None:
     assert isinstance(data["signals"], list)
 
 
+def test_flag_is_inlined_in_hook_output() -> None:
+    result = _run_hook("you know like i want it to work better and also fix that thing and basically look at the other file too")
+    output = json.loads(result.stdout)["hookSpecificOutput"]
+    assert output["hookEventName"] == "UserPromptSubmit"
+    context = output["additionalContext"]
+    assert context.startswith("human-speak flag: ")
+    inline, _ = json.JSONDecoder().raw_decode(context, len("human-speak flag: "))
+    assert inline == {k: v for k, v in json.loads(FLAG_FILE.read_text()).items() if k != "original"}
+
+
+def test_clean_message_prints_nothing() -> None:
+    assert _run_hook("Fix the bug in auth.py").stdout == ""
+
+
 def test_custom_threshold_respected() -> None:
     # With very low threshold, even a clean message should flag
     result = _run_hook("Fix the bug", threshold="0.0")
@@ -64,8 +166,7 @@ def test_custom_threshold_respected() -> None:
 
 def test_malformed_json_exits_cleanly() -> None:
     """Hook must not crash on bad input -- exit 0 silently."""
-    env = os.environ.copy()
-    env["HUMAN_SPEAK_THRESHOLD"] = "0.4"
+    env = _env()
     result = subprocess.run(
         [sys.executable, str(HOOK_PATH)],
         input="not valid json {{{{",
@@ -81,3 +182,86 @@ def test_empty_message_exits_cleanly() -> None:
     result = _run_hook("")
     assert result.returncode == 0
     assert not FLAG_FILE.exists()
+
+
+def test_confirmed_phrase_carries_known_interpretation() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index_path = str(Path(tmpdir) / "index.json")
+        save(build({"go ahead": "proceed with the plan"}), index_path)
+        result = _run_hook("Go ahead!", index_path=index_path)
+        assert result.returncode == 0
+        data = json.loads(FLAG_FILE.read_text())
+        assert data["interpretation"] == "proceed with the plan"
+        assert data["match"] == "exact"
+        last = json.loads(STATS_FILE.read_text().splitlines()[-1])
+        assert last["hit"] == "go ahead"
+
+
+def test_exact_phrase_rejected_at_tier_zero_is_scored_in_full() -> None:
+    phrase = "We should rename the config loader."
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index_path = str(Path(tmpdir) / "index.json")
+        save(build({phrase: "fix the flaky login test"}), index_path)
+        for _ in range(2):  # the second run must not be served a bound from the memo
+            setup_function()
+            result = _run_hook(phrase, index_path=index_path)
+            assert result.returncode == 0
+            data = json.loads(FLAG_FILE.read_text())
+            assert data["interpretation"] == "fix the flaky login test"
+            assert (data["score"], data["signals"]) == (0.0, [])
+            last = json.loads(STATS_FILE.read_text().splitlines()[-1])
+            assert last["score"] == 0.0 and "bound" not in last
+
+
+def test_near_match_is_only_a_hint() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index_path = str(Path(tmpdir) / "index.json")
+        save(build({"fix the login page": "fix the failing auth test"}), index_path)
+        # Scores below the threshold: a near hit alone raises no flag
+        result = _run_hook("Fix the login pages.", index_path=index_path)
+        assert result.returncode == 0
+        assert not FLAG_FILE.exists()
+        # Flagged on its own score: the near hit is a hint, not an interpretation
+        setup_function()
+        result = _run_hook("Fix the login pages.", threshold="0.1", index_path=index_path)
+        data = json.loads(FLAG_FILE.read_text())
+        assert "interpretation" not in data
+        assert data["hint"] == "fix the failing auth test"
+        assert data["match"] == "near"
+
+
+def test_huge_message_flag_is_bounded() -> None:
+    message = "you know like i want it to work better and basically " * 100000
+    result = _run_hook(message)
+    assert result.returncode == 0
+    data = json.loads(FLAG_FILE.read_text())
+    assert data["truncated"] is True
+    assert len(data["original"]) == 8 * 1024
+
+
+def test_repeated_message_is_served_from_memo(monkeypatch) -> None:
+    from score_memo import ScoreMemo, memo_key, memo_path
+
+    monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", STATE_DIR)
+    message = f"Fix the bug in memo_{os.getpid()}.py"
+    memo = ScoreMemo(memo_path())
+    try:
+        # A planted entry proves the hook read it instead of re-scoring
+        memo.put(memo_key(message, 0.4, os.environ.get("HUMAN_SPEAK_WEIGHTS")), 0.9, ["run-on"])
+    finally:
+        memo.close()
+    _run_hook(message)
+    data = json.loads(FLAG_FILE.read_text())
+    assert data["score"] == 0.9
+    assert data["signals"] == ["run-on"]
+
+
+def test_bare_imperative_resolved_by_previous_message() -> None:
+    assert _run_hook("fix it", threshold="0.25").returncode == 0
+    assert FLAG_FILE.exists(), "No context yet: 'fix it' has no target"
+
+    FLAG_FILE.unlink()
+    _run_hook("The login test in tests/auth_test.py fails on CI.", threshold="0.25")
+    FLAG_FILE.unlink(missing_ok=True)
+    _run_hook("fix it", threshold="0.25")
+    assert not FLAG_FILE.exists(), "The previous message names what to fix"
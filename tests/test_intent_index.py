@@ -0,0 +1,58 @@
+"""Tests for the confirmed-intent lookup index."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from intent_index import build, load, lookup, normalize, save
+
+MAPPINGS = {
+    "go ahead": "proceed with the plan",
+    "fix it": "fix the failing auth test",
+    "ship it": "merge the PR and deploy",
+}
+
+
+def test_normalize() -> None:
+    assert normalize("  Go   AHEAD!! ") == "go ahead"
+
+
+def test_exact_match_after_normalization() -> None:
+    hit = lookup(build(MAPPINGS), "Go ahead.")
+    assert hit == {"original": "go ahead", "interpretation": "proceed with the plan",
+                   "match": "exact", "similarity": 1.0}
+
+
+def test_near_match() -> None:
+    hit = lookup(build(MAPPINGS), "ok go ahead now")
+    assert hit is not None
+    assert hit["original"] == "go ahead"
+    assert hit["match"] == "near"
+
+
+def test_near_match_rejects_added_negation() -> None:
+    index = build(MAPPINGS)
+    assert lookup(index, "don't ship it") is None
+    assert lookup(index, "no, go ahead now") is None
+    assert lookup(index, "never fix it") is None
+    keep = build({"do not push": "keep the branch local"})
+    assert lookup(keep, "do not push it")["match"] == "near"  # type: ignore[index]
+
+
+def test_unrelated_message_misses() -> None:
+    index = build(MAPPINGS)
+    assert lookup(index, "please rename the config loader") is None
+    assert lookup(index, "go ahead " + "and do many other things " * 10) is None
+    assert lookup(index, "") is None
+
+
+def test_save_and_load() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / "index.json")
+        save(build(MAPPINGS), path)
+        index = load(path)
+        assert index is not None
+        assert lookup(index, "ship it")["interpretation"] == "merge the PR and deploy"  # type: ignore[index]
+        assert load(str(Path(tmpdir) / "missing.json")) is None
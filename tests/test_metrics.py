@@ -0,0 +1,66 @@
+"""Tests for opt-in hook instrumentation and the stats report."""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from metrics import Recorder, read_runs, recorder, report
+
+HOOK_PATH = Path(__file__).parent.parent / "hooks" / "user-prompt-submit.py"
+AMBIGUOUS = "you know like i want it to work better and also fix that thing and basically look at the other file too"
+
+
+def test_disabled_recorder_writes_nothing(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "metrics.jsonl"
+        monkeypatch.delenv("HUMAN_SPEAK_METRICS", raising=False)
+        monkeypatch.setenv("HUMAN_SPEAK_METRICS_FILE", str(path))
+        run = recorder("session-end")
+        run.mark("read")
+        run.finish()
+        assert not path.exists()
+
+
+def test_recorder_rotates_log(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "metrics.jsonl"
+        monkeypatch.setenv("HUMAN_SPEAK_METRICS_FILE", str(path))
+        monkeypatch.setattr("metrics.MAX_BYTES", 200)
+        for _ in range(10):
+            run = Recorder("session-end")
+            run.mark("read")
+            run.finish()
+        assert Path(f"{path}.1").exists()
+        assert path.stat().st_size <= 400
+        assert len(read_runs(str(path))) < 10
+
+
+def test_hook_records_stages_flags_and_errors() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "metrics.jsonl"
+        env = os.environ.copy()
+        env["HUMAN_SPEAK_METRICS"] = "1"
+        env["HUMAN_SPEAK_METRICS_FILE"] = str(path)
+        env["HUMAN_SPEAK_STATE_DIR"] = tmpdir
+        env["HUMAN_SPEAK_THRESHOLD"] = "0.4"
+        for payload in (json.dumps({"user_message": AMBIGUOUS, "session_id": "m"}), "not json"):
+            subprocess.run([sys.executable, str(HOOK_PATH)], input=payload,
+                           capture_output=True, text=True, env=env)
+        flagged, broken = read_runs(str(path))
+        assert flagged["flagged"] is True
+        assert flagged["tier"] in (1, 2)
+        assert {"read", "parse", "score", "flag"} <= set(flagged["stages"])  # type: ignore[arg-type]
+        assert broken["error"] == "JSONDecodeError"
+
+        text = report([flagged, broken])
+        assert "flag rate: 1/1" in text
+        assert "decided at tier: " in text
+        assert "JSONDecodeError x1" in text
+
+
+def test_report_without_runs() -> None:
+    assert "HUMAN_SPEAK_METRICS=1" in report([])
@@ -0,0 +1,55 @@
+"""Tests for the compiled profile cache."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from profile_cache import cache_path_for, compile_profile, load
+
+PROFILE = (
+    "# User Speak Profile\n\n## Calibration\nAmbiguity threshold: 0.35\n"
+    "Last updated: 2026-02-27\n\n## Confirmed Intent Mappings\n"
+    '- "go ahead" -> interpreted as: "proceed with the plan"\n'
+)
+
+
+def test_compile_then_load_hits() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = str(Path(tmpdir) / "user-speak-profile.md")
+        Path(profile).write_text(PROFILE)
+        assert load(profile) is None
+        compiled = compile_profile(profile)
+        assert compiled["threshold"] == 0.35
+        assert compiled["index"] and os.path.exists(str(compiled["index"]))
+        assert load(profile) == compiled
+
+
+def test_edit_invalidates_cache() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = str(Path(tmpdir) / "user-speak-profile.md")
+        Path(profile).write_text(PROFILE)
+        compile_profile(profile)
+        Path(profile).write_text(PROFILE.replace("0.35", "0.45") + "\n")
+        assert load(profile) is None
+        assert compile_profile(profile)["threshold"] == 0.45
+
+
+def test_missing_profile_compiles_to_defaults() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = str(Path(tmpdir) / "user-speak-profile.md")
+        compiled = compile_profile(profile)
+        assert compiled["threshold"] == 0.40
+        assert compiled["index"] is None
+        assert os.path.exists(cache_path_for(profile))
+        assert load(profile) == compiled
+
+
+def test_malformed_profile_is_marked() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = str(Path(tmpdir) / "user-speak-profile.md")
+        Path(profile).write_text("no threshold here")
+        compiled = compile_profile(profile)
+        assert compiled["malformed"] is True
+        assert compiled["threshold"] == 0.40
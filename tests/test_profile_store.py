@@ -0,0 +1,186 @@
+"""Tests for the append-only profile store."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from profile_store import (
+    MAX_MAPPINGS,
+    ProfileStore,
+    open_for_update,
+    records_from_markdown,
+    render_markdown,
+    store_path_for,
+    write_view,
+)
+
+
+def _mapping(original: str, interpreted: str) -> dict:
+    return {"kind": "mapping", "original": original, "interpreted": interpreted}
+
+
+def test_append_and_replay() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ProfileStore(str(Path(tmpdir) / "profile.jsonl"))
+        store.append([{"kind": "calibration", "threshold": 0.35, "updated": "2026-01-01"}])
+        store.append([_mapping("go ahead", "proceed"), _mapping("fix it", "fix the auth bug")])
+        store.append([_mapping("go ahead", "proceed with the plan")])
+        state = store.load()
+        assert state.threshold == 0.35
+        assert state.mappings == {"fix it": "fix the auth bug", "go ahead": "proceed with the plan"}
+        assert state.records == 4
+
+
+def test_keeps_most_recent_mappings() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ProfileStore(str(Path(tmpdir) / "profile.jsonl"))
+        store.append([_mapping(f"phrase {i}", f"action {i}") for i in range(MAX_MAPPINGS + 5)])
+        state = store.load()
+        assert len(state.mappings) == MAX_MAPPINGS
+        assert "phrase 0" not in state.mappings
+        assert f"phrase {MAX_MAPPINGS + 4}" in state.mappings
+
+
+def test_normalized_phrases_share_a_slot() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ProfileStore(str(Path(tmpdir) / "profile.jsonl"))
+        store.append([_mapping("go ahead", "proceed")] * 4)
+        store.append([_mapping("Go ahead!", "proceed with the plan")])
+        state = store.load()
+        assert state.mappings == {"Go ahead!": "proceed with the plan"}
+        assert state.usage["Go ahead!"][0] == 5
+
+
+def test_recurring_mappings_survive_one_off_phrases() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ProfileStore(str(Path(tmpdir) / "profile.jsonl"))
+        store.append([_mapping("ship it", "merge the PR")] * 3)
+        store.append([_mapping(f"phrase {i}", f"action {i}") for i in range(MAX_MAPPINGS * 2)])
+        state = store.load()
+        assert len(state.mappings) == MAX_MAPPINGS
+        assert "ship it" in state.mappings
+        assert f"phrase {MAX_MAPPINGS * 2 - 1}" in state.mappings
+
+
+def test_aging_lets_new_phrases_displace_stale_favourites() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ProfileStore(str(Path(tmpdir) / "profile.jsonl"))
+        store.append([_mapping("ship it", "merge the PR")] * 3)
+        store.append([_mapping(f"phrase {i}", f"action {i}") for i in range(MAX_MAPPINGS * 5)])
+        assert "ship it" not in store.load().mappings
+
+
+def test_compaction_keeps_hits_and_floor() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ProfileStore(str(Path(tmpdir) / "profile.jsonl"))
+        store.append([_mapping("ship it", "merge the PR")] * 3)
+        store.append([_mapping(f"phrase {i}", f"action {i}") for i in range(MAX_MAPPINGS + 5)])
+        state = store.load()
+        store.compact(state)
+        compacted = store.load()
+        assert compacted.usage == state.usage
+        assert compacted.mapping_floor == state.mapping_floor > 0
+        store.append([_mapping("new phrase", "new action")])
+        state.apply(_mapping("new phrase", "new action"))
+        assert store.load().mappings == state.mappings
+
+
+def test_compaction_preserves_state() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ProfileStore(str(Path(tmpdir) / "profile.jsonl"))
+        for i in range(100):
+            store.append([_mapping(f"phrase {i % 3}", f"action {i}")])
+        state = store.load()
+        assert store.needs_compaction(state)
+        store.compact(state)
+        compacted = store.load()
+        assert compacted.mappings == state.mappings
+        assert compacted.records == 4
+        assert not store.needs_compaction(compacted)
+
+
+def test_skips_torn_lines() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "profile.jsonl"
+        path.write_text('{"kind": "mapping", "original": "a", "interpreted": "b"}\n{"kind": "mapp')
+        assert ProfileStore(str(path)).load().mappings == {"a": "b"}
+
+
+def test_render_round_trips_through_markdown() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = ProfileStore(str(Path(tmpdir) / "profile.jsonl"))
+        store.append([
+            {"kind": "calibration", "threshold": 0.45, "updated": "2026-03-01"},
+            _mapping("go ahead", "proceed"),
+        ])
+        markdown = render_markdown(store.load())
+        assert "Ambiguity threshold: 0.45" in markdown
+        assert records_from_markdown(markdown) == [
+            {"kind": "calibration", "threshold": 0.45, "updated": "2026-03-01"},
+            _mapping("go ahead", "proceed"),
+        ]
+
+
+def test_legacy_markdown_profile_is_imported() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = Path(tmpdir) / "user-speak-profile.md"
+        profile.write_text(
+            "## Calibration\nAmbiguity threshold: 0.30\nLast updated: 2026-02-27\n\n"
+            "## Confirmed Intent Mappings\n"
+            '- "go ahead" -> interpreted as: "proceed"\n'
+        )
+        store, state = open_for_update(str(profile))
+        assert state.threshold == 0.30
+        assert state.mappings == {"go ahead": "proceed"}
+        assert store.path == store_path_for(str(profile))
+        assert store.load().mappings == {"go ahead": "proceed"}
+
+
+def test_hand_edited_threshold_is_folded_back() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = Path(tmpdir) / "user-speak-profile.md"
+        store = ProfileStore(store_path_for(str(profile)))
+        store.append([{"kind": "calibration", "threshold": 0.40, "updated": "2026-02-27"}])
+        profile.write_text(render_markdown(store.load()).replace("0.40", "0.55"))
+        _, state = open_for_update(str(profile))
+        assert state.threshold == 0.55
+        assert store.load().threshold == 0.55
+
+
+def test_hand_edits_survive_write_view() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = Path(tmpdir) / "user-speak-profile.md"
+        profile.write_text(
+            "## Communication Patterns\n- Often omits subjects\n\n"
+            "## Calibration\nAmbiguity threshold: 0.40\nLast updated: 2026-02-27\n"
+        )
+        _, state = open_for_update(str(profile))
+        write_view(str(profile), state)
+        assert "- Often omits subjects" in profile.read_text()
+
+        profile.write_text(profile.read_text().replace(
+            "- Often omits subjects", "- Often omits subjects\n- Dictates in run-ons",
+        ) + '- "ship it" -> interpreted as: "merge the PR"\n')
+        store, state = open_for_update(str(profile))
+        write_view(str(profile), state)
+        markdown = profile.read_text()
+        assert "- Often omits subjects\n- Dictates in run-ons\n" in markdown
+        assert '- "ship it" -> interpreted as: "merge the PR"' in markdown
+        assert store.load().mappings == {"ship it": "merge the PR"}
+        assert store.load().patterns == ["- Often omits subjects", "- Dictates in run-ons"]
+
+
+def test_unedited_view_imports_nothing() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile = Path(tmpdir) / "user-speak-profile.md"
+        store = ProfileStore(store_path_for(str(profile)))
+        store.append([
+            {"kind": "calibration", "threshold": 0.40, "updated": "2026-02-27"},
+            {"kind": "patterns", "lines": ["- Often omits subjects"]},
+            _mapping("go ahead", "proceed"),
+        ])
+        profile.write_text(render_markdown(store.load()))
+        _, state = open_for_update(str(profile))
+        assert state.records == 3
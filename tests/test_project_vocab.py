@@ -0,0 +1,123 @@
+"""Tests for the project identifier index."""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+import project_vocab
+from dictionary import load
+from project_vocab import project_root, update
+from scorer import analyze
+
+HOOK_PATH = Path(__file__).parent.parent / "hooks" / "session-start.py"
+MESSAGE = "please regenerate the kubeconfig and frobnicate the zorblat helper"
+
+
+def _project(root: Path) -> None:
+    (root / "src").mkdir()
+    (root / "src" / "deploy.py").write_text("def frobnicateZorblat(kubeconfig):\n    return kubeconfig\n")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "dep.js").write_text("const quuxbazzle = 1;\n")
+
+
+def test_indexes_identifiers_and_their_parts(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", str(Path(tmpdir) / "state"))
+        root = Path(tmpdir) / "project"
+        root.mkdir()
+        _project(root)
+        path, counts = update(str(root))
+        assert counts["files"] == 1
+        words = load(path)
+        assert words is not None
+        assert "frobnicateZorblat" in words
+        assert "zorblat" in words and "kubeconfig" in words
+        assert "quuxbazzle" not in words  # node_modules is skipped
+
+
+def test_reindex_reads_only_changed_files(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", str(Path(tmpdir) / "state"))
+        root = Path(tmpdir) / "project"
+        root.mkdir()
+        _project(root)
+        (root / "src" / "other.py").write_text("OLD_NAME = 1\n")
+        update(str(root))
+
+        _, counts = update(str(root))
+        assert (counts["read"], counts["reused"]) == (0, 2)
+
+        (root / "src" / "other.py").write_text("brand_new_name = 2\n")
+        path, counts = update(str(root))
+        assert (counts["read"], counts["reused"]) == (1, 1)
+        words = load(path)
+        assert words is not None
+        assert "brand_new_name" in words and "frobnicateZorblat" in words
+        assert "OLD_NAME" not in words
+
+
+def test_out_of_budget_files_wait_for_next_run(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", str(Path(tmpdir) / "state"))
+        root = Path(tmpdir) / "project"
+        root.mkdir()
+        _project(root)
+        _, counts = update(str(root), budget=0.0)
+        assert (counts["files"], counts["partial"]) == (0, 1)
+        _, counts = update(str(root))
+        assert (counts["files"], counts["read"], counts["partial"]) == (1, 1, 0)
+
+
+def test_cut_short_walk_keeps_words_it_did_not_reach(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", str(Path(tmpdir) / "state"))
+        root = Path(tmpdir) / "project"
+        root.mkdir()
+        _project(root)
+        update(str(root))
+        # The project root alone has more entries than this
+        monkeypatch.setattr(project_vocab, "MAX_ENTRIES", 1)
+        path, counts = update(str(root))
+        assert (counts["partial"], counts["read"], counts["files"]) == (1, 0, 1)
+        words = load(path)
+        assert words is not None and "kubeconfig" in words
+
+
+def test_vocabulary_words_are_not_typos(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", str(Path(tmpdir) / "state"))
+        root = Path(tmpdir) / "project"
+        root.mkdir()
+        _project(root)
+        path, _ = update(str(root))
+        assert "typo-density" in analyze(MESSAGE).signals
+        assert "typo-density" not in analyze(MESSAGE, vocabulary=path).signals
+
+
+def test_home_and_filesystem_root_are_not_indexed() -> None:
+    assert project_root({"cwd": os.sep}) is None
+    assert project_root({"cwd": os.path.expanduser("~")}) is None
+
+
+def test_session_start_exports_the_index() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir) / "project"
+        root.mkdir()
+        _project(root)
+        env_file = Path(tmpdir) / "claude.env"
+        env = os.environ.copy()
+        env["CLAUDE_ENV_FILE"] = str(env_file)
+        env["HUMAN_SPEAK_STATE_DIR"] = str(Path(tmpdir) / "state")
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(Path(tmpdir) / "user-speak-profile.md")
+        subprocess.run(
+            [sys.executable, str(HOOK_PATH)],
+            input=json.dumps({"session_id": "s", "cwd": str(root)}),
+            capture_output=True, text=True, env=env,
+        )
+        exports = dict(line.split("=", 1) for line in env_file.read_text().splitlines())
+        assert exports["HUMAN_SPEAK_VOCAB"].startswith(str(Path(tmpdir) / "state" / "vocab"))
+        assert os.path.exists(exports["HUMAN_SPEAK_VOCAB"])
@@ -0,0 +1,62 @@
+"""Tests for the fast-start hook dispatcher."""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from run import _import_times
+
+RUN_PATH = Path(__file__).parent.parent / "hooks" / "run.py"
+FLAG_FILE = Path("/tmp/human-speak-flag.json")
+_STATE = tempfile.TemporaryDirectory()
+AMBIGUOUS = "you know like i want it to work better and also fix that thing and basically look at the other file too"
+
+
+def _dispatch(*args: str, payload: str = "{}") -> subprocess.CompletedProcess[str]:
+    env = os.environ.copy()
+    env["HUMAN_SPEAK_THRESHOLD"] = "0.4"
+    env["HUMAN_SPEAK_STATE_DIR"] = _STATE.name
+    return subprocess.run(
+        [sys.executable, "-I", "-S", str(RUN_PATH), *args],
+        input=payload,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+def setup_function() -> None:
+    if FLAG_FILE.exists():
+        FLAG_FILE.unlink()
+
+
+def test_dispatches_to_hook_in_isolated_mode() -> None:
+    result = _dispatch("user-prompt-submit", payload=json.dumps({"user_message": AMBIGUOUS}))
+    assert result.returncode == 0
+    assert FLAG_FILE.exists()
+
+
+def test_load_only_does_not_run_main() -> None:
+    result = _dispatch("--load-only", "user-prompt-submit", payload=json.dumps({"user_message": AMBIGUOUS}))
+    assert result.returncode == 0
+    assert not FLAG_FILE.exists()
+
+
+def test_unknown_hook_exits_cleanly() -> None:
+    result = _dispatch("no-such-hook")
+    assert result.returncode == 0
+
+
+def test_import_times_keeps_top_level_imports() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       364 |        364 |     _json\n"
+        "import time:       569 |       1200 |   json.decoder\n"
+        "import time:       286 |       1851 | json\n"
+        "import time:       120 |        120 | scorer\n"
+    )
+    assert _import_times(stderr) == [("json", 1.851), ("scorer", 0.12)]
@@ -0,0 +1,79 @@
+"""Tests for the persistent score memo."""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+import score_memo
+from score_memo import WAYS, ScoreMemo, memo_key, open_memo
+
+
+def test_round_trip_across_opens() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "memo.bin")
+        key = memo_key("run the tests", 0.4, None)
+        memo = ScoreMemo(path)
+        assert memo.get(key) is None
+        memo.put(key, 0.125, ["filler-words", "run-on"])
+        memo.close()
+
+        memo = ScoreMemo(path)
+        assert memo.get(key) == (0.125, ["run-on", "filler-words"])
+        memo.close()
+
+
+def test_key_covers_threshold_weights_and_stripped_text() -> None:
+    base = memo_key("continue", 0.4, None)
+    assert memo_key("  continue\n", 0.4, None) == base
+    assert memo_key("continue", 0.5, None) != base
+    assert memo_key("continue", 0.4, "1,1,1,1,1,0") != base
+    assert memo_key("Continue", 0.4, None) != base
+
+
+def test_clock_keeps_referenced_entries() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        memo = ScoreMemo(os.path.join(tmpdir, "memo.bin"), buckets=1)
+        for key in range(1, WAYS + 1):
+            memo.put(key, key / 10, [])
+        assert memo.get(1) is not None  # sets its reference bit
+        memo.put(100, 0.5, [])
+        assert memo.get(1) is not None
+        assert memo.get(100) == (0.5, [])
+        assert sum(memo.get(key) is not None for key in range(2, WAYS + 1)) == WAYS - 2
+        memo.close()
+
+
+def test_unknown_signal_is_not_stored() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        memo = ScoreMemo(os.path.join(tmpdir, "memo.bin"))
+        memo.put(7, 0.9, ["something-new"])
+        assert memo.get(7) is None
+        memo.close()
+
+
+def test_torn_slot_reads_as_miss() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        memo = ScoreMemo(os.path.join(tmpdir, "memo.bin"), buckets=1)
+        memo.put(7, 0.9, ["run-on"])
+        memo._floats[score_memo._HEADER_WORDS + 2] = 0.1  # score changed, check not
+        assert memo.get(7) is None
+        memo.close()
+
+
+def test_stamp_change_empties_the_memo(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "memo.bin")
+        memo = ScoreMemo(path)
+        memo.put(7, 0.9, [])
+        memo.close()
+
+        monkeypatch.setattr(score_memo, "_stamp", lambda: 12345)
+        memo = ScoreMemo(path)
+        assert memo.get(7) is None
+        memo.close()
+
+
+def test_disabled_by_env(monkeypatch) -> None:
+    monkeypatch.setenv("HUMAN_SPEAK_MEMO", "0")
+    assert open_memo() is None
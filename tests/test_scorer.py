@@ -1,9 +1,16 @@
 """Tests for ambiguity scorer heuristics."""
 import sys
 import os
+from typing import Optional
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
 
-from scorer import score_message, detect_signals
+import pytest
+
+import scorer as scorer_module
+from scorer import (
+    Analysis, IncrementalScorer, Weights, analyze, cascade, count_fillers, score_message, detect_signals,
+    upper_bound,
+)
 
 
 def test_clean_message_scores_low() -> None:
@@ -71,3 +78,352 @@ def test_run_on_signal_long_sentence() -> None:
 def test_short_sentence_no_run_on() -> None:
     signals = detect_signals("Fix the auth bug.")
     assert "run-on" not in signals
+
+
+def test_analyze_matches_public_functions() -> None:
+    msg = "you know like go ahead and make it work better basically"
+    result = analyze(msg)
+    assert result.score == score_message(msg)
+    assert result.signals == detect_signals(msg)
+
+
+def test_analyze_counts_and_evidence() -> None:
+    result = analyze("Fix the auth bug. Then run the tests!")
+    assert result.word_count == 8
+    assert result.sentence_count == 2
+    assert result.evidence == {"missing-subject": "fix"}
+
+
+def test_analyze_empty_message() -> None:
+    result = analyze("   ")
+    assert result.score == 0.0
+    assert result.signals == []
+    assert result.word_count == 0
+
+
+def test_filler_requires_word_boundary() -> None:
+    signals = detect_signals("It is likely the tests rightly fail, factually speaking")
+    assert "filler-words" not in signals
+
+
+def test_count_fillers_multi_word_and_case() -> None:
+    counts = count_fillers("You know, I\nmean it is like, like, sort of broken")
+    assert counts == {"you know": 1, "i mean": 1, "like": 2, "sort of": 1}
+
+
+def test_filler_weight_scales_with_density() -> None:
+    sparse = "like this works. " + "The parser handles every case. " * 19
+    dense = "like like basically this."
+    assert 0.0 < score_message(sparse) < score_message(dense)
+    assert analyze(sparse).evidence["filler-words"] == {"counts": {"like": 1}, "density": round(1 / 98, 4)}
+
+
+def test_typo_density_detected() -> None:
+    result = analyze("pls fix teh auth bug in the loggin modul thx")
+    assert "typo-density" in result.signals
+    assert "teh" in result.evidence["typo-density"]["unknown"]  # type: ignore[index]
+
+
+# Routine technical prompts: none may be flagged at the default threshold
+CLEAN_PROMPTS = [
+    "Remove the deprecated middleware from the router.",
+    "Add pagination to the users endpoint.",
+    "Add retries with exponential backoff to the webhook client.",
+    "Update the changelog for the next release.",
+    "Move the scheduler into its own module.",
+    "Add a websocket handler for live notifications.",
+    "Rename the config loader and update its callers.",
+    "Write unit tests for the serializer.",
+    "Bump the dependency versions in the lockfile.",
+    "Add type hints to the parser and fix the mypy errors.",
+    "Refactor the authentication flow to use tokens instead of cookies.",
+    "Cache the results of the expensive database query.",
+    "Make the logger write timestamps in UTC.",
+    "Split the monolithic settings file into environment specific configs.",
+    "Add a healthcheck route that returns the build version.",
+    "Migrate the users table to add an email verification column.",
+    "Document the public functions in the utils package.",
+    "Fix the flaky integration test for the payments service.",
+    "Add a command line flag to disable telemetry.",
+    "Replace the hand rolled retry loop with the backoff library.",
+    "Handle timeouts when the upstream service is unavailable.",
+    "Paginate the search results and return a cursor.",
+    "Add an index on the created at column to speed up queries.",
+    "Deprecate the legacy endpoints and log a warning when they are called.",
+    "Set up continuous integration to run the linter and the tests.",
+    "Upgrade the frontend build to the latest bundler.",
+    "Serialize the response as JSON and set the content type header.",
+    "Validate the request payload before it reaches the handler.",
+    "Add rate limiting to the login endpoint.",
+    "Log the stack trace when the worker crashes.",
+    "Reduce the memory usage of the image thumbnailer.",
+    "Show a spinner while the dashboard is loading.",
+    "Store uploaded files in object storage instead of the local disk.",
+    "Add a migration that backfills the missing timestamps.",
+    "Throttle the notifications so users are not spammed.",
+    "Expose the metrics over a Prometheus compatible endpoint.",
+    "Make the async tasks idempotent so retries are safe.",
+    "Add localization for the onboarding screens.",
+    "Encrypt the secrets at rest and rotate the keys monthly.",
+    "Profile the slow startup and lazy load the plugins.",
+]
+
+
+def test_clean_prompt_corpus_stays_below_threshold() -> None:
+    for prompt in CLEAN_PROMPTS:
+        result = analyze(prompt)
+        assert result.score < 0.4, (prompt, result.signals, result.evidence)
+        assert "typo-density" not in result.signals, prompt
+
+
+def test_single_unknown_word_is_not_typo_density() -> None:
+    assert "typo-density" not in detect_signals("Wire the frobnicator into the main loop")
+    assert "typo-density" in detect_signals("Wire teh frobnicator into the mian loop")
+
+
+def test_typo_density_ignores_identifiers_and_paths() -> None:
+    signals = detect_signals("Update getUser in src/auth.py and the API config in README.md")
+    assert "typo-density" not in signals
+
+
+def test_typo_density_skipped_once_threshold_decided() -> None:
+    msg = "you know like pls fix teh loggin modul basically"
+    assert "typo-density" in detect_signals(msg)
+    # filler-words alone already crosses 0.3, so the dictionary is not consulted
+    assert "typo-density" not in analyze(msg, threshold=0.3).signals
+
+
+def test_huge_message_is_sampled() -> None:
+    line = "The server started on port eight and requests look fine so far. It is quiet.\n"
+    text = line * 70000  # ~5 MB pasted text
+    result = analyze(text, threshold=0.4)
+    assert result.sampled
+    assert result.signals == []
+    assert abs(result.word_count - len(text.split())) / len(text.split()) < 0.05
+
+
+def test_huge_pasted_log_is_structure_not_prose() -> None:
+    line = "2026-10-17 12:00:01 INFO server started on port 8080 request handled in 12 ms\n"
+    result = analyze(line * 70000)
+    assert result.sampled
+    assert result.signals == []
+    assert result.word_count == 0
+    assert result.structure["log_lines"] > 0
+
+
+def test_huge_message_keeps_leading_signals() -> None:
+    text = "go fix it you know " + "and basically it is like broken " * 200000
+    result = analyze(text)
+    assert result.sampled
+    assert result.score == 1.0
+    assert result.evidence["missing-subject"] == "go"
+
+
+def test_long_runs_that_are_not_paths_scan_in_linear_time() -> None:
+    import time
+
+    for run in ("a-" * 16000 + " x/y", "a." * 16000 + " x/y", "a-" * 16000 + "x.p"):
+        started = time.perf_counter()
+        result = analyze(run, time_budget=10.0)
+        assert time.perf_counter() - started < 1.0, run[:8]
+    assert result.structure == {}
+    assert analyze("see ../x/y and --out=/tmp/x or foo-bar.md").structure == {"paths": 3}
+
+
+def test_time_budget_still_returns_a_score() -> None:
+    text = "you know like it is broken and basically " * 100000
+    assert analyze(text, time_budget=0.0).signals[:2] == ["run-on", "filler-words"]
+
+
+def test_fenced_code_and_stack_trace_are_not_prose() -> None:
+    msg = (
+        "Why does this crash?\n"
+        "```python\n"
+        "def get_user(user_id): return db.query(User).filter(User.id == user_id).first() or raise_not_found(user_id)\n"
+        "```\n"
+        "Traceback (most recent call last):\n"
+        '  File "app/models.py", line 12, in get_user\n'
+        "AttributeError: 'NoneType' object has no attribute 'first'\n"
+    )
+    result = analyze(msg)
+    assert result.signals == []
+    assert result.word_count == 4
+    assert result.structure == {"code_blocks": 1, "code_lines": 1, "log_lines": 3}
+
+
+def test_indented_code_urls_and_paths_are_not_prose() -> None:
+    msg = (
+        "Please compare https://example.com/docs/setup with src/config/loader.py and `get_user`.\n"
+        "    for item in items: process(item, retries=3, backoff=exponential, timeout=30, verbose=True)\n"
+    )
+    result = analyze(msg)
+    assert "run-on" not in result.signals
+    assert result.structure == {"code_lines": 1, "urls": 1, "paths": 1, "inline_code": 1}
+
+
+def test_identifier_does_not_trigger_missing_subject() -> None:
+    assert "missing-subject" not in detect_signals("`get_user` returns None for admins.")
+    assert "missing-subject" not in detect_signals("get.user() returns None for admins")
+
+
+def test_referent_weakens_missing_subject() -> None:
+    alone = analyze("fix it")
+    resolved = analyze("fix it", referent=1.0)
+    older = analyze("fix it", referent=0.5)
+    assert resolved.signals == alone.signals == ["missing-subject"]
+    assert resolved.score < older.score < alone.score
+    assert alone.score == pytest.approx(0.30)
+
+
+CASCADE_MESSAGES = [
+    "Please update the README with the new API docs.",
+    "Fix the bug in auth.py",
+    "fix it",
+    "... fix it",
+    "The login test fails on main. Can you look into why?",
+    "pls fix teh auth bug in the loggin modul thx",
+    "you know like i want it to work better and also fix that thing and basically look at the other file too",
+    "what is the difference between a list and a tuple in python and when should i use each one of them",
+    "Run `pytest -k login` and tell me what fails",
+    "It crashes with\n    Traceback (most recent call last):\nany idea",
+    "basically",
+    "   ",
+]
+
+
+@pytest.mark.parametrize("weights", [None, Weights([0.5, -1.25, 2.0, 0.8, 3.5], -1.5)])
+def test_cascade_agrees_with_analyze_at_every_threshold(weights: Optional[Weights]) -> None:
+    for msg in CASCADE_MESSAGES:
+        for referent in (0.0, 0.5):
+            full = analyze(msg, weights=weights, referent=referent)
+            assert upper_bound(msg, weights, referent) >= full.score
+            for threshold in (0.2, 0.3, 0.35, 0.4, 0.6, 0.8):
+                fast = cascade(msg, threshold, weights=weights, referent=referent)
+                assert (fast.score >= threshold) == (full.score >= threshold), (msg, threshold)
+                if fast.tier:
+                    assert fast.score == analyze(msg, threshold, weights=weights, referent=referent).score
+
+
+def test_cascade_rejects_clean_message_at_tier_zero() -> None:
+    result = cascade("Please update the README with the new API docs.", 0.4)
+    assert result.tier == 0
+    assert result.signals == []
+    assert result.score == pytest.approx(0.30)  # only typo-density could fire
+    # A bare imperative could still add missing-subject: scored in full
+    assert cascade("Fix the login flow in the admin panel", 0.4).tier > 0
+    # floor keeps exact scores below the threshold
+    assert cascade("Please update the README with the new API docs.", 0.4, floor=0.2).tier > 0
+
+
+def test_analyze_reports_whether_the_dictionary_was_needed() -> None:
+    assert analyze("pls fix teh auth bug in the loggin modul thx").tier == 2
+    assert analyze("you know like pls fix teh loggin modul basically", threshold=0.3).tier == 1
+
+
+def _fed(
+    text: str, size: int, threshold: Optional[float] = None, weights: Optional[Weights] = None,
+    referent: float = 0.0,
+) -> IncrementalScorer:
+    scorer = IncrementalScorer(threshold, weights, referent)
+    for start in range(0, len(text), size):
+        scorer.feed(text[start:start + size])
+    return scorer
+
+
+def _same(a: Analysis, b: Analysis) -> bool:
+    return all(getattr(a, name) == getattr(b, name) for name in a.__slots__)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_incremental_scorer_matches_analyze(size: int) -> None:
+    texts = CASCADE_MESSAGES + [
+        "so you\nknow i mean the login page. fix it. sort\n\nof",
+        "Update `get_user` in src/auth.py\n```\nyou know like\n```\nand the INFO line\nINFO started",
+        "at the end of the day\nFile name check\n    indented code\nERROR: it broke, basically",
+        "Please check http://example.com/a?b=c and `unclosed code that runs on and on\nnext line",
+    ]
+    weights = Weights([0.5, -1.25, 2.0, 0.8, 3.5], -1.5)
+    for text in texts:
+        for threshold, referent, model in ((None, 0.0, None), (0.4, 0.5, None), (None, 0.0, weights)):
+            fed = _fed(text, size, threshold=threshold, referent=referent, weights=model)
+            expected = analyze(text, threshold, weights=model, referent=referent)
+            assert _same(fed.analysis(), expected), (text, size)
+            assert (fed.score(), fed.signals()) == (expected.score, expected.signals)
+
+
+def test_incremental_scorer_updates_as_dictation_arrives() -> None:
+    scorer = IncrementalScorer()
+    scorer.feed("fix the")
+    assert scorer.signals() == ["missing-subject"]
+    scorer.feed(" login page you")
+    assert "filler-words" not in scorer.signals()
+    scorer.feed(" know")  # a filler split across chunks
+    assert scorer.analysis().evidence["filler-words"] == {"counts": {"you know": 1}, "density": 0.1667}
+    assert scorer.analysis().word_count == 6
+
+
+def test_incremental_scorer_folds_finished_words() -> None:
+    scorer = IncrementalScorer()
+    for _ in range(500):
+        scorer.feed("please update the login page and ")
+    # Only the unfinished tail is kept for re-reading
+    assert len(scorer._pending) + len(scorer._line) < 64
+    assert _same(scorer.analysis(), analyze("please update the login page and " * 500))
+
+
+def test_incremental_scorer_samples_huge_input_like_analyze() -> None:
+    text = "the server started fine and nothing looks wrong so far " * 2000
+    fed = _fed(text, 4096)
+    whole = analyze(text)
+    assert fed.analysis().sampled
+    assert (fed.score(), fed.signals()) == (whole.score, whole.signals)
+    assert abs(fed.analysis().word_count - whole.word_count) <= whole.word_count * 0.05
+
+
+def test_incremental_scorer_keeps_a_bounded_sample() -> None:
+    scorer = IncrementalScorer()
+    for _ in range(20000):
+        scorer.feed("the server started fine and nothing looks wrong so far ")
+    assert scorer._head is not None
+    kept = sum(part.length for part in [scorer._head, *scorer._windows]) + len(scorer._capture or "")
+    assert not scorer._chunks
+    assert kept <= 2 * scorer_module._INSPECT_LIMIT
+    assert scorer.analysis().sampled
+
+
+def test_incremental_scorer_reads_only_new_windows_past_the_limit(monkeypatch) -> None:
+    scorer = IncrementalScorer()
+    for _ in range(2000):
+        scorer.feed("the server started fine and nothing looks wrong so far ")
+    scorer.analysis()
+    read = []
+    prose = scorer_module._prose
+    monkeypatch.setattr(scorer_module, "_prose", lambda text, structure: read.append(text) or prose(text, structure))
+    scorer.feed("and then it crashed ")
+    scorer.analysis()
+    # The head and the finished windows are not read again
+    assert sum(map(len, read)) <= scorer_module._INSPECT_LIMIT // scorer_module._SAMPLE_WINDOWS
+
+
+def test_incremental_scorer_decides_at_lines_early() -> None:
+    scorer = IncrementalScorer()
+    for char in "at the end of the day we should fix it ":
+        scorer.feed(char)
+    assert scorer._kind == "prose"
+    assert scorer._line == ""
+
+
+def test_incremental_scorer_feeds_long_frame_lines_linearly(monkeypatch) -> None:
+    decided = scorer_module._line_decided
+    checks = []
+    monkeypatch.setattr(
+        scorer_module, "_line_decided", lambda line, in_fence: checks.append(line) or decided(line, in_fence),
+    )
+    for line in ['File "' + "x" * 20000, "at x(" + "y" * 20000]:
+        checks.clear()
+        scorer = IncrementalScorer()
+        for char in line:
+            scorer.feed(char)
+        # Rechecked each time the line doubles, not on every character
+        assert len(checks) < 40
+        assert _same(scorer.analysis(), analyze(line))
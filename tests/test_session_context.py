@@ -0,0 +1,67 @@
+"""Tests for the rolling per-session context."""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from session_context import MAX_TERMS, MAX_TURNS, SessionContext, load, terms
+
+
+def test_terms_picks_paths_code_identifiers_and_nouns() -> None:
+    found = terms("the login test in tests/auth_test.py calls `make_user` and parseArgs()")
+    assert found == ["login", "tests/auth_test.py", "make_user", "parseArgs()"]
+
+
+def test_vague_nouns_are_not_referents() -> None:
+    assert terms("fix that thing and the other stuff") == []
+
+
+def test_terms_are_bounded() -> None:
+    text = " ".join(f"file{i}.py" for i in range(50))
+    assert len(terms(text)) == MAX_TERMS
+
+
+def test_long_runs_that_are_not_paths_scan_in_linear_time() -> None:
+    import time
+
+    for run in ("a-" * 2048, "a." * 2048, "a-" * 2047 + "x.p"):
+        started = time.perf_counter()
+        terms(run)
+        assert time.perf_counter() - started < 0.05, run[:8]
+    assert terms("see ../x/y and foo-bar.md") == ["../x/y", "foo-bar.md"]
+
+
+def test_referent_decays_with_age() -> None:
+    context = SessionContext()
+    assert context.referent() == 0.0
+    context.push("the parser in cli.py crashes")
+    assert context.referent() == 1.0
+    context.push("hmm")
+    context.push("ok")
+    assert context.referent() == 0.25
+    assert context.recent() == ["parser", "cli.py"]
+
+
+def test_deque_keeps_last_turns() -> None:
+    context = SessionContext()
+    context.push("see main.py")
+    for _ in range(MAX_TURNS):
+        context.push("yes")
+    assert len(context.turns) == MAX_TURNS
+    assert context.referent() == 0.0
+
+
+def test_round_trip_and_bad_files() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "context.json")
+        assert load(path).referent() == 0.0
+        context = SessionContext()
+        context.push("update config.toml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(context.dumps())
+        assert list(load(path).turns) == [["config.toml"]]
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("not json")
+        assert load(path).referent() == 0.0
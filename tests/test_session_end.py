@@ -80,3 +80,194 @@ def test_hook_exits_cleanly_on_bad_confirmed_file() -> None:
     CONFIRMED_FILE.write_text("not valid json {{{")
     result, _ = _run_hook(confirmed_pairs=None)
     assert result.returncode == 0
+
+
+def test_repeated_sessions_keep_earlier_mappings() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_path = Path(tmpdir) / "user-speak-profile.md"
+        env = os.environ.copy()
+        env["CLAUDE_PLUGIN_ROOT"] = str(PLUGIN_ROOT)
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(profile_path)
+        for original in ("go ahead", "fix it", "go ahead"):
+            CONFIRMED_FILE.write_text(json.dumps([{"original": original, "interpreted": f"do {original}"}]))
+            subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        content = profile_path.read_text()
+        assert content.count('- "go ahead"') == 1
+        assert '- "fix it" -> interpreted as: "do fix it"' in content
+        assert profile_path.with_suffix(".jsonl").exists()
+
+
+def test_dismissed_flags_raise_threshold() -> None:
+    stats_file = Path("/tmp/human-speak-stats.jsonl")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_path = Path(tmpdir) / "user-speak-profile.md"
+        env = os.environ.copy()
+        env["CLAUDE_PLUGIN_ROOT"] = str(PLUGIN_ROOT)
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(profile_path)
+        stats_file.write_text(
+            "".join(json.dumps({"score": 0.5, "flagged": True, "borderline": False}) + "\n"
+                    for _ in range(6))
+        )
+        CONFIRMED_FILE.write_text(json.dumps(
+            [{"original": f"do {i}", "interpreted": "x", "outcome": "dismissed"} for i in range(5)]
+            + [{"original": "go ahead", "interpreted": "proceed with the plan"}]
+        ))
+        subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        content = profile_path.read_text()
+        assert "Ambiguity threshold: 0.42" in content
+        assert '- "go ahead"' in content
+        assert '- "do 0"' not in content
+        assert not stats_file.exists()
+
+
+def test_tier_zero_bounds_do_not_lower_threshold() -> None:
+    stats_file = Path("/tmp/human-speak-stats.jsonl")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_path = Path(tmpdir) / "user-speak-profile.md"
+        env = os.environ.copy()
+        env["CLAUDE_PLUGIN_ROOT"] = str(PLUGIN_ROOT)
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(profile_path)
+        stats_file.write_text(
+            "".join(json.dumps({"score": 0.39, "flagged": False, "borderline": True, "bound": True})
+                    + "\n" for _ in range(6))
+        )
+        CONFIRMED_FILE.write_text(json.dumps(
+            [{"original": f"do {i}", "interpreted": "x"} for i in range(6)]
+        ))
+        subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        # Nothing really scored just under 0.40, so it stays put
+        assert "Ambiguity threshold: 0.40" in profile_path.read_text()
+
+
+def test_learns_from_recorded_answers() -> None:
+    sys.path.insert(0, str(PLUGIN_ROOT / "hooks"))
+    from confirm import record
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_path = Path(tmpdir) / "user-speak-profile.md"
+        env = os.environ.copy()
+        env["CLAUDE_PLUGIN_ROOT"] = str(PLUGIN_ROOT)
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(profile_path)
+        record(str(CONFIRMED_FILE), "fix it", "fix the auth bug", "confirmed")
+        record(str(CONFIRMED_FILE), "do the thing", "run the linter", "corrected")
+        record(str(CONFIRMED_FILE), "go ahead", "", "dismissed")
+        subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        content = profile_path.read_text()
+        assert '- "fix it" -> interpreted as: "fix the auth bug"' in content
+        assert '- "do the thing" -> interpreted as: "run the linter"' in content
+        assert '- "go ahead"' not in content
+        assert not CONFIRMED_FILE.exists()
+
+
+def test_session_end_only_removes_its_own_state(monkeypatch) -> None:
+    sys.path.insert(0, str(PLUGIN_ROOT / "hooks"))
+    from state import path_for
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", tmpdir)
+        env = os.environ.copy()
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(Path(tmpdir) / "user-speak-profile.md")
+        for session in ("one", "two"):
+            flag = Path(path_for("flag", session))
+            flag.parent.mkdir(parents=True, exist_ok=True)
+            flag.write_text("{}")
+        subprocess.run([sys.executable, str(HOOK_PATH)], input=json.dumps({"session_id": "one"}),
+                       capture_output=True, text=True, env=env)
+        assert not Path(path_for("flag", "one")).exists()
+        assert Path(path_for("flag", "two")).exists()
+
+
+def test_session_end_recompiles_profile_cache() -> None:
+    sys.path.insert(0, str(PLUGIN_ROOT / "hooks"))
+    from profile_cache import load
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_path = Path(tmpdir) / "user-speak-profile.md"
+        env = os.environ.copy()
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(profile_path)
+        CONFIRMED_FILE.write_text(json.dumps([{"original": "go ahead", "interpreted": "proceed"}]))
+        subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        cache = load(str(profile_path))
+        assert cache is not None
+        assert cache["index"]
+
+
+def test_answered_flags_train_weights() -> None:
+    sys.path.insert(0, str(PLUGIN_ROOT / "hooks"))
+    from profile_cache import load
+
+    rambling = "you know like i want it to work better and also fix that thing and basically look at the other file too"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_path = Path(tmpdir) / "user-speak-profile.md"
+        env = os.environ.copy()
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(profile_path)
+        CONFIRMED_FILE.write_text(json.dumps(
+            [{"original": rambling, "interpreted": "refactor"}] * 10
+            + [{"original": "go ahead", "interpreted": "proceed", "outcome": "dismissed"}] * 10
+        ))
+        subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        cache = load(str(profile_path))
+        assert cache is not None and cache["weights"]
+
+
+def test_unflagged_messages_become_negatives() -> None:
+    sys.path.insert(0, str(PLUGIN_ROOT / "hooks"))
+    from calibration import message_key
+    from profile_cache import load
+    from profile_store import load_profile
+
+    stats_file = Path("/tmp/human-speak-stats.jsonl")
+    rambling = "you know like i want it to work better and also fix that thing and basically look at the other file too"
+    logged = [1.0, 1.0, 0.0, 0.0, 0.9]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_path = Path(tmpdir) / "user-speak-profile.md"
+        env = os.environ.copy()
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(profile_path)
+        stats_file.write_text(
+            json.dumps({"score": 0.7, "flagged": True, "borderline": False,
+                        "key": message_key(rambling), "features": logged}) + "\n"
+            + "".join(json.dumps({"score": 0.0, "flagged": False, "borderline": False,
+                                  "key": i, "features": [0.0, 0.0, 0.0, 0.0, 0.1]}) + "\n"
+                      for i in range(10))
+        )
+        CONFIRMED_FILE.write_text(json.dumps([{"original": rambling, "interpreted": "refactor"}]))
+        subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        state = load_profile(str(profile_path))
+        # The answer reuses the hook's features; three unflagged lines are sampled
+        assert state.examples == [(logged, 1)] + [([0.0, 0.0, 0.0, 0.0, 0.1], 0)] * 3
+
+        for _ in range(6):
+            stats_file.write_text("".join(
+                json.dumps({"score": 0.0, "flagged": False, "borderline": False, "model": True,
+                            "key": i, "features": [0.0, 0.0, 0.0, 0.0, 0.1]}) + "\n"
+                for i in range(3))
+                + json.dumps({"score": 0.38, "flagged": False, "borderline": True, "model": True}) + "\n")
+            CONFIRMED_FILE.write_text(json.dumps([{"original": rambling, "interpreted": "refactor"}] * 3))
+            subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        cache = load(str(profile_path))
+        assert cache is not None and cache["weights"]
+        assert isinstance(cache["model_threshold"], float)
+        # Sessions scored by the model leave the fixed-score calibration alone
+        assert cache["threshold"] == 0.4
+
+
+def test_index_hits_count_toward_mapping_hits() -> None:
+    sys.path.insert(0, str(PLUGIN_ROOT / "hooks"))
+    from profile_store import load_profile
+
+    stats_file = Path("/tmp/human-speak-stats.jsonl")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_path = Path(tmpdir) / "user-speak-profile.md"
+        env = os.environ.copy()
+        env["HUMAN_SPEAK_PROFILE_PATH"] = str(profile_path)
+        CONFIRMED_FILE.write_text(json.dumps([{"original": "go ahead", "interpreted": "proceed"}]))
+        subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        line = {"score": 0.3, "flagged": False, "borderline": False}
+        stats_file.write_text(
+            "".join(json.dumps({**line, "hit": "go ahead"}) + "\n" for _ in range(2))
+            + json.dumps({**line, "hit": "never confirmed"}) + "\n"
+        )
+        subprocess.run([sys.executable, str(HOOK_PATH)], input="{}", capture_output=True, text=True, env=env)
+        state = load_profile(str(profile_path))
+        assert state.usage["go ahead"][0] == 3
+        assert list(state.mappings) == ["go ahead"]
@@ -30,6 +30,8 @@ def _run_hook(profile_content: Optional[str] = None) -> Tuple[subprocess.Complet
             env = os.environ.copy()
             env["CLAUDE_ENV_FILE"] = str(env_file)
             env["CLAUDE_PLUGIN_ROOT"] = str(PLUGIN_ROOT)
+            env["HUMAN_SPEAK_STATE_DIR"] = str(Path(tmpdir) / "state")
+            env["HUMAN_SPEAK_PROJECT_VOCAB"] = "0"
 
             result = subprocess.run(
                 [sys.executable, str(HOOK_PATH)],
@@ -41,6 +43,7 @@ def _run_hook(profile_content: Optional[str] = None) -> Tuple[subprocess.Complet
             env_contents = env_file.read_text()
             return result, env_contents
         finally:
+            (PLUGIN_ROOT / "memory" / "user-speak-profile.cache.json").unlink(missing_ok=True)
             if original_content is not None:
                 profile_path.write_text(original_content)
             elif profile_path.exists():
@@ -71,11 +74,31 @@ def test_hook_exits_cleanly_on_error() -> None:
     env = os.environ.copy()
     env.pop("CLAUDE_ENV_FILE", None)
     env.pop("CLAUDE_PLUGIN_ROOT", None)
-    result = subprocess.run(
-        [sys.executable, str(HOOK_PATH)],
-        input="{}",
-        capture_output=True,
-        text=True,
-        env=env,
-    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env["HUMAN_SPEAK_STATE_DIR"] = tmpdir
+        env["HUMAN_SPEAK_PROJECT_VOCAB"] = "0"
+        result = subprocess.run(
+            [sys.executable, str(HOOK_PATH)],
+            input="{}",
+            capture_output=True,
+            text=True,
+            env=env,
+        )
     assert result.returncode == 0
+
+
+def test_builds_intent_index_from_profile() -> None:
+    profile = (
+        "# User Speak Profile\n\n## Calibration\nAmbiguity threshold: 0.40\n"
+        "Last updated: 2026-02-27\n\n## Confirmed Intent Mappings\n"
+        '- "go ahead" -> interpreted as: "proceed with the plan"\n'
+    )
+    index_path = PLUGIN_ROOT / "memory" / "user-speak-profile.index.json"
+    try:
+        result, env_contents = _run_hook(profile)
+        assert result.returncode == 0
+        assert f"HUMAN_SPEAK_INDEX={index_path}" in env_contents
+        assert "proceed with the plan" in index_path.read_text()
+    finally:
+        if index_path.exists():
+            index_path.unlink()
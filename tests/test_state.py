@@ -0,0 +1,73 @@
+"""Tests for per-session state paths and atomic writes."""
+import os
+import sys
+import stat
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from state import LEGACY_PATHS, append_line, cleanup, path_for, session_dir, write_atomic
+
+
+def test_without_session_id_uses_legacy_paths() -> None:
+    assert path_for("flag", None) == LEGACY_PATHS["flag"]
+    assert path_for("confirmed", "") == LEGACY_PATHS["confirmed"]
+
+
+def test_session_ids_are_sanitized() -> None:
+    directory = session_dir("../../etc/passwd")
+    assert directory is not None
+    assert os.path.basename(directory) == "etcpasswd"
+
+
+def test_sessions_are_isolated(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", tmpdir)
+        write_atomic(path_for("flag", "a"), "A")
+        write_atomic(path_for("flag", "b"), "B")
+        append_line(path_for("stats", "a"), "{}")
+        append_line(path_for("stats", "a"), "{}")
+        assert Path(path_for("stats", "a")).read_text() == "{}\n{}\n"
+
+        cleanup("a")
+        assert not os.path.exists(str(session_dir("a")))
+        assert Path(path_for("flag", "b")).read_text() == "B"
+
+
+def test_symlinked_state_root_is_refused(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        target = Path(tmpdir) / "elsewhere"
+        target.mkdir(mode=0o700)
+        root = Path(tmpdir) / "root"
+        root.symlink_to(target)
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", str(root))
+        with pytest.raises(PermissionError):
+            write_atomic(path_for("flag", "a"), "A")
+        assert list(target.iterdir()) == []
+
+
+def test_open_state_dirs_are_tightened(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir) / "root"
+        root.mkdir(mode=0o755)
+        root.chmod(0o755)
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", str(root))
+        append_line(path_for("stats", "a"), "{}")
+        assert stat.S_IMODE(root.stat().st_mode) == 0o700
+        assert stat.S_IMODE(Path(str(session_dir("a"))).stat().st_mode) == 0o700
+
+
+def test_write_atomic_never_follows_a_planted_temp_file(monkeypatch) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HUMAN_SPEAK_STATE_DIR", tmpdir)
+        path = path_for("flag", "a")
+        victim = Path(tmpdir) / "victim"
+        victim.write_text("keep")
+        os.makedirs(os.path.dirname(path), mode=0o700)
+        os.symlink(victim, f"{path}.{os.getpid()}.tmp")
+        write_atomic(path, "A")
+        assert Path(path).read_text() == "A"
+        assert victim.read_text() == "keep"
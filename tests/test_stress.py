@@ -0,0 +1,13 @@
+"""Tests for the concurrent-session stress harness."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from stress import run
+
+
+def test_parallel_sessions_lose_no_updates() -> None:
+    result = run(sessions=4, concurrency=4)
+    assert result["problems"] == []
+    assert result["lost_updates"] == 0
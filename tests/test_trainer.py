@@ -0,0 +1,67 @@
+"""Tests for learned scorer weights and the logistic trainer."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from scorer import FEATURES, Weights, analyze
+from trainer import MIN_EXAMPLES, pick_threshold, ready, sample_negatives, train
+
+RAMBLING = "you know like i want it to work better and also fix that thing and basically look at the other file too"
+TERSE = "go ahead"
+
+
+def _examples() -> list:
+    # This user wants clarification for rambling messages but not terse imperatives
+    needed = analyze(RAMBLING).features
+    not_needed = analyze(TERSE).features
+    return [(needed, 1)] * 12 + [(not_needed, 0)] * 12
+
+
+def test_weights_round_trip() -> None:
+    weights = Weights([0.5, -1.25, 2.0, 0.0, 3.5], -1.5)
+    parsed = Weights.parse(weights.format())
+    assert parsed is not None
+    assert parsed.coefficients == weights.coefficients and parsed.bias == weights.bias
+
+
+def test_parse_rejects_stale_or_bad_weights() -> None:
+    assert Weights.parse(None) is None
+    assert Weights.parse("1,2,3") is None
+    assert Weights.parse(",".join(["x"] * (len(FEATURES) + 1))) is None
+
+
+def test_ready_needs_both_labels() -> None:
+    assert not ready([([0.0] * len(FEATURES), 1)] * MIN_EXAMPLES)
+    assert ready(_examples())
+
+
+def test_trained_weights_separate_examples() -> None:
+    weights = train(_examples(), use_numpy=False)
+    assert analyze(RAMBLING, weights=weights).score > 0.5
+    assert analyze(TERSE, weights=weights).score < 0.5
+
+
+def test_numpy_and_python_trainers_agree() -> None:
+    pytest.importorskip("numpy")
+    fast = train(_examples(), use_numpy=True)
+    slow = train(_examples(), use_numpy=False)
+    assert fast.coefficients == pytest.approx(slow.coefficients, abs=1e-6)
+    assert fast.bias == pytest.approx(slow.bias, abs=1e-6)
+
+
+def test_sample_negatives_spreads_over_the_session() -> None:
+    vectors = [[float(i)] * len(FEATURES) for i in range(10)]
+    assert sample_negatives(vectors[:2]) == [(vectors[0], 0), (vectors[1], 0)]
+    assert [v[0][0] for v in sample_negatives(vectors, 3)] == [0.0, 3.0, 6.0]
+
+
+def test_model_gets_its_own_threshold() -> None:
+    examples = _examples()
+    weights = train(examples, use_numpy=False)
+    threshold = pick_threshold(weights, examples)
+    assert 0.2 <= threshold <= 0.8
+    assert analyze(RAMBLING, weights=weights).score >= threshold
+    assert analyze(TERSE, weights=weights).score < threshold
@@ -0,0 +1,81 @@
+"""Tests for the calibration workbench."""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'hooks'))
+
+from calibration import is_borderline
+from scorer import analyze
+from workbench import (
+    FeatureMatrix,
+    evaluate,
+    extract,
+    sweep,
+    thresholds,
+    weight_grid,
+)
+
+CORPUS = [
+    ("you know like i want it to work better and also fix that thing and basically look at the other file too", 1),
+    ("fix it", 1),
+    ("do the thing", 0),
+    ("teh fucntion si brokne adn doesnt wrok rigth", 1),
+    ("Please update the README with the new API docs.", 0),
+    ("The login test in auth_test.py fails on CI.", 0),
+    ("like basically make it work you know", 1),
+]
+
+
+def _lines() -> list:
+    lines = [json.dumps({"prompt": text, "label": label}) for text, label in CORPUS * 3]
+    lines += [json.dumps({"prompt": "no label"}), "not json", ""]
+    return lines
+
+
+def test_extract_dedupes_rows_and_skips_unlabeled() -> None:
+    matrix, skipped = extract(_lines())
+    assert skipped == 2
+    assert matrix.messages() == len(CORPUS) * 3
+    assert len(matrix) <= len(CORPUS)
+
+
+def test_sweep_matches_the_scorer_at_every_threshold() -> None:
+    matrix, _ = extract(_lines())
+    cutoffs = thresholds()
+    current = evaluate(matrix, [], cutoffs)["current"]
+    for point in current["curve"]:
+        flagged = [
+            label for text, label in CORPUS
+            if analyze(text).score >= point["threshold"]
+            and not is_borderline(analyze(text).score, point["threshold"])
+        ]
+        assert point["flag_rate"] == round(len(flagged) / len(CORPUS), 4)
+        if flagged:
+            assert point["precision"] == round(sum(flagged) / len(flagged), 4)
+
+
+def test_recommends_a_threshold_inside_the_calibration_range() -> None:
+    matrix, _ = extract(_lines())
+    result = evaluate(matrix, weight_grid((0.0, 0.3, 0.6)), thresholds())
+    assert result["configurations"] == 3 ** 4 + 1
+    assert 0.2 <= result["current"]["threshold"] <= 0.8
+    assert result["best"]["f_beta"] >= result["current"]["f_beta"]
+
+
+def test_feature_file_round_trip() -> None:
+    matrix, _ = extract(_lines())
+    loaded = FeatureMatrix.from_json(matrix.to_json())
+    configs = weight_grid((0.0, 0.5))
+    assert sweep(loaded, configs, thresholds()) == sweep(matrix, configs, thresholds())
+
+
+def test_numpy_and_python_sweeps_agree() -> None:
+    pytest.importorskip("numpy")
+    matrix, _ = extract(_lines())
+    configs = weight_grid((0.0, 0.1, 0.2, 0.3))
+    cutoffs = thresholds()
+    assert sweep(matrix, configs, cutoffs, use_numpy=True) == \
+        sweep(matrix, configs, cutoffs, use_numpy=False)